@@ -1,11 +1,17 @@
 """Job streaming endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
+from ...config import get_settings
+from ...models.core import JobLogEntry
+from ...services.events import JobEvent
 from ...services.jobs import JobManager
-from ...services.runtime import job_manager
+from ...services.llm import get_llm_cache, get_llm_flights, get_llm_limiters
+from ...services.reference.cache import get_reference_cache
+from ...services.reference.resilience import get_provider_guards
+from ...services.runtime import compile_cache, compile_scheduler, job_manager
 
 router = APIRouter()
 
@@ -18,18 +24,79 @@ def get_job_repository():
     return job_manager.repository
 
 
+@router.get("/stats", summary="Live stream buffers, compile queue, compile cache, LLM queue, LLM cache, reference cache and reference provider statistics")
+async def get_stream_stats(manager: JobManager = Depends(get_job_manager)) -> dict:
+    llm_cache = get_llm_cache()
+    reference_cache = get_reference_cache()
+    return {
+        **manager.stats(),
+        "compile_queue": compile_scheduler.stats(),
+        "compile_cache": compile_cache.stats(),
+        "llm": get_llm_limiters().stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "llm_inflight": get_llm_flights().stats(),
+        "reference_cache": reference_cache.stats() if reference_cache else None,
+        "reference_providers": get_provider_guards().stats(),
+    }
+
+
 @router.get("/{job_id}")
 async def get_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
     job = manager.repository.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    if not job.logs:
+        job.logs = [entry.message for entry in manager.repository.read_logs(job_id)]
     return job
 
 
+@router.get("/{job_id}/logs", response_model=list[JobLogEntry])
+async def get_job_logs(
+    job_id: str,
+    after: int = Query(0, ge=0, description="Return entries with a sequence number greater than this"),
+    limit: int | None = Query(None, ge=1),
+    tail: int | None = Query(None, ge=1, description="Return only the last N entries"),
+    manager: JobManager = Depends(get_job_manager),
+) -> list[JobLogEntry]:
+    if not manager.repository.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if tail is not None:
+        return manager.repository.tail_logs(job_id, tail)
+    return manager.repository.read_logs(job_id, after_seq=after, limit=limit)
+
+
+def format_sse(event: JobEvent) -> str:
+    """Serialize a job event as an SSE frame; multi-line messages use several data fields."""
+
+    lines = [f"id: {event.seq}"] if event.seq is not None else []
+    lines.extend(f"data: {part}" for part in event.message.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def _parse_event_id(value: str | None) -> int:
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
+
+
 @router.get("/{job_id}/stream")
-async def stream_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+async def stream_job(
+    job_id: str,
+    last_event_id: str | None = Query(None, description="Resume after this event id (for clients that cannot set headers)"),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    manager: JobManager = Depends(get_job_manager),
+):
+    settings = get_settings()
+    after_seq = _parse_event_id(last_event_id_header or last_event_id)
+
     async def event_generator():
-        async for line in manager.stream(job_id):
-            yield f"data: {line}\n\n"
+        yield f"retry: {settings.sse_retry_ms}\n\n"
+        async for event in manager.stream(job_id, after_seq=after_seq, heartbeat=settings.sse_heartbeat_seconds):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=headers)
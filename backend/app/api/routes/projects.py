@@ -5,12 +5,13 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
 
-from ...config import project_storage_root
+from ...config import get_settings, project_storage_root
 from ...models.core import (
     ArtifactBundle,
     CitationDetectionResponse,
+    CompileEngine,
     CompileOptions,
     CompileResponse,
     FormatResponse,
@@ -19,40 +20,57 @@ from ...models.core import (
     Project,
     ProjectCreateRequest,
     ProjectCreateResponse,
+    ProjectListResponse,
+    ProjectSummary,
     ProjectStatus,
     ReferenceSearchResponse,
     Manuscript,
 )
 from ...services.bib_manager import BibManager
-from ...services.citation_detector import CitationDetector
+from ...services.citation_detector import CitationDetector, describe_slot
 from ...services.diff_engine import DiffEngine
 from ...services.ingest import ingest_manuscript
-from ...services.latex_builder import LatexBuilder, LatexCompilationError
+from ...services.latex_builder import AsyncLatexBuilder
 from ...services.preflight import PreflightGenerator
-from ...services.reference_retriever import ReferenceRetriever
+from ...services.reference_retriever import ReferenceRetriever, describe_update
 from ...services.renderer import render_main_tex
-from ...services.runtime import job_manager
-from ...services.storage import ProjectRepository
+from ...services.runtime import compile_cache, compile_scheduler, job_manager, preamble_formats
+from ...services.storage import BaseProjectRepository, create_project_repository
 from ...services.structure_analyzer import StructureAnalyzer
+from ...services.templates import TemplateRegistry
 from ...utils.id import generate_id
 from ...security import is_safe_latex
 
 router = APIRouter()
 
 
-def get_repo() -> ProjectRepository:
-    return ProjectRepository()
+def get_repo() -> BaseProjectRepository:
+    return create_project_repository()
 
 
-async def get_project(project_id: str, repo: ProjectRepository) -> Project:
+async def get_project(project_id: str, repo: BaseProjectRepository) -> Project:
     project = repo.get(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
+@router.get("/", response_model=ProjectListResponse)
+async def list_projects(
+    status: ProjectStatus | None = None,
+    template_id: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    repo: BaseProjectRepository = Depends(get_repo),
+) -> ProjectListResponse:
+    projects = repo.list_projects(status=status, template_id=template_id, limit=limit, offset=offset)
+    items = [ProjectSummary(id=p.id, template_id=p.template_id, status=p.status, created_at=p.created_at) for p in projects]
+    total = repo.count(status=status, template_id=template_id)
+    return ProjectListResponse(items=items, total=total, limit=limit, offset=offset)
+
+
 @router.post("/", response_model=ProjectCreateResponse)
-async def create_project(request: ProjectCreateRequest, repo: ProjectRepository = Depends(get_repo)) -> ProjectCreateResponse:
+async def create_project(request: ProjectCreateRequest, repo: BaseProjectRepository = Depends(get_repo)) -> ProjectCreateResponse:
     project_id = generate_id()
     manuscript = Manuscript(content=request.manuscript_text, filename=request.filename)
     ingest_result = ingest_manuscript(manuscript)
@@ -71,16 +89,24 @@ async def create_project(request: ProjectCreateRequest, repo: ProjectRepository
 
 
 @router.post("/{project_id}/detect-citations", response_model=CitationDetectionResponse)
-async def detect_citations(project_id: str, repo: ProjectRepository = Depends(get_repo)) -> CitationDetectionResponse:
+async def detect_citations(project_id: str, repo: BaseProjectRepository = Depends(get_repo)) -> CitationDetectionResponse:
     project = await get_project(project_id, repo)
 
     async def handler(job):
         detector = CitationDetector()
         job_manager.emit(job.id, "Starting citation detection")
-        result = await detector.detect(project.manuscript.content)
+        result = await detector.detect(
+            project.manuscript.content,
+            previous=project.citation_slots,
+            on_slot=lambda slot: job_manager.emit(job.id, describe_slot(slot)),
+        )
         project.citation_slots = result.slots
         repo.save(project)
-        job_manager.emit(job.id, f"Detected {len(result.slots)} candidate citations")
+        job_manager.emit(
+            job.id,
+            f"Detected {len(result.slots)} candidate citations "
+            f"({result.reused} unchanged sentences reused, {result.decided_by_rules} decided by rules)",
+        )
         return {"slots": [slot.dict() for slot in result.slots]}
 
     job = await job_manager.run_task(project_id, PipelineStage.citation_detection, handler)
@@ -88,16 +114,39 @@ async def detect_citations(project_id: str, repo: ProjectRepository = Depends(ge
 
 
 @router.post("/{project_id}/search-refs", response_model=ReferenceSearchResponse)
-async def search_references(project_id: str, repo: ProjectRepository = Depends(get_repo)) -> ReferenceSearchResponse:
+async def search_references(
+    project_id: str,
+    mode: str = Query("title", pattern="^(title|slots)$", description="title: one query; slots: one per citation slot"),
+    repo: BaseProjectRepository = Depends(get_repo),
+) -> ReferenceSearchResponse:
     project = await get_project(project_id, repo)
 
     async def handler(job):
         retriever = ReferenceRetriever()
-        query = project.normalized_json.get("title") if project.normalized_json else project.manuscript.content.split("\n", 1)[0]
-        job_manager.emit(job.id, f"Searching references with query: {query[:80]}")
-        result = await retriever.search(query)
         bib_manager = BibManager()
-        bib_db = bib_manager.deduplicate(result.references)
+        if mode == "slots":
+            job_manager.emit(job.id, f"Searching references for {len(project.citation_slots)} citation slots")
+            result = await retriever.search_slots(
+                project.citation_slots,
+                on_result=lambda group, found: job_manager.emit(
+                    job.id, f"{len(found)} candidates for {len(group.slots)} slot(s): {group.query[:80]}"
+                ),
+            )
+            for position, found in result.candidates.items():
+                keys = list(dict.fromkeys(bib_manager.normalize_key(reference) for reference in found))
+                project.citation_slots[position] = project.citation_slots[position].copy(update={"candidates": keys})
+            references = result.references
+        else:
+            query = project.normalized_json.get("title") if project.normalized_json else project.manuscript.content.split("\n", 1)[0]
+            job_manager.emit(job.id, f"Searching references with query: {query[:80]}")
+            stream = retriever.stream(query)
+            async for update in stream:
+                job_manager.emit(job.id, describe_update(update))
+            retrieval = stream.result()
+            if retrieval.cancelled:
+                job_manager.emit(job.id, f"Deadline reached; cancelled {', '.join(retrieval.cancelled)}")
+            references = retrieval.references
+        bib_db = bib_manager.deduplicate(references)
         project.references = bib_db.entries
         project_dir = project_storage_root() / project_id
         project_dir.mkdir(parents=True, exist_ok=True)
@@ -113,11 +162,18 @@ async def search_references(project_id: str, repo: ProjectRepository = Depends(g
 
 
 @router.post("/{project_id}/format", response_model=FormatResponse)
-async def format_project(project_id: str, repo: ProjectRepository = Depends(get_repo)) -> FormatResponse:
+async def format_project(project_id: str, repo: BaseProjectRepository = Depends(get_repo)) -> FormatResponse:
     project = await get_project(project_id, repo)
     analyzer = StructureAnalyzer()
-    result = await analyzer.analyze(project.manuscript.content)
-    normalized = result.normalized
+    analysis: dict = {}
+
+    async def handler(job):
+        result = await analyzer.analyze(project.manuscript.content, on_progress=lambda line: job_manager.emit(job.id, line))
+        analysis["normalized"] = result.normalized
+        return {"sections": len(result.normalized.get("sections") or [])}
+
+    job = await job_manager.run_inline(project_id, PipelineStage.structure, handler)
+    normalized = analysis["normalized"]
     main_tex = render_main_tex(normalized, project.template_id)
     project.normalized_json = normalized
     project.main_tex = main_tex
@@ -125,20 +181,28 @@ async def format_project(project_id: str, repo: ProjectRepository = Depends(get_
     repo.save(project)
     project_dir = project_storage_root() / project_id
     (project_dir / "normalized.json").write_text(json.dumps(normalized, indent=2), encoding="utf-8")
-    (project_dir / "main.tex").write_text(main_tex, encoding="utf-8")
+    # main.tex itself is written by the compile job, the only writer of the project's build files.
     diff_engine = DiffEngine()
     diff = diff_engine.compare(project.manuscript.content, main_tex)
     (project_dir / "changes.json").write_text(diff_engine.to_json(diff), encoding="utf-8")
     project.artifacts["changes"] = str(project_dir / "changes.json")
     repo.save(project)
-    return FormatResponse(project_id=project_id, normalized_json=normalized, main_tex=main_tex)
+    return FormatResponse(project_id=project_id, normalized_json=normalized, main_tex=main_tex, job_id=job.id)
+
+
+def _template_assets(template_id: str) -> list[Path]:
+    try:
+        return [TemplateRegistry().resolve_path(template_id)]
+    except KeyError:
+        return []
 
 
 @router.post("/{project_id}/compile", response_model=CompileResponse)
 async def compile_project(
     project_id: str,
     options: CompileOptions | None = Body(None),
-    repo: ProjectRepository = Depends(get_repo),
+    priority: int = Query(0, ge=-10, le=10, description="Higher values are compiled first"),
+    repo: BaseProjectRepository = Depends(get_repo),
 ) -> CompileResponse:
     project = await get_project(project_id, repo)
     if not project.main_tex:
@@ -148,22 +212,68 @@ async def compile_project(
     project_dir = project_storage_root() / project_id
     project_dir.mkdir(parents=True, exist_ok=True)
     main_tex_path = project_dir / "main.tex"
-    main_tex_path.write_text(project.main_tex, encoding="utf-8")
-    builder = LatexBuilder(project_dir)
-    engine = options.engine if options else CompileOptions().engine
-    try:
-        pdf_path = builder.compile(main_tex_path, engine)
-    except LatexCompilationError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    project.pdf_path = str(pdf_path)
-    project.artifacts.update({"pdf": str(pdf_path), "main_tex": str(main_tex_path)})
-    project.status = ProjectStatus.ready
-    repo.save(project)
-    return CompileResponse(project_id=project_id, pdf_path=str(pdf_path), main_tex_path=str(main_tex_path))
+    options = options or CompileOptions()
+    engine = options.engine
+    settings = get_settings()
+    builder = AsyncLatexBuilder(
+        project_dir,
+        timeout=settings.compile_timeout_seconds,
+        cache=compile_cache,
+        incremental=settings.compile_incremental,
+    )
+    extra_dirs = _template_assets(project.template_id)
+
+    async def handler(job):
+        # The scheduler runs one compile per project at a time, so only now is it safe to
+        # touch the project directory; use the latest formatted text, not the request's.
+        latest = repo.get(project_id) or project
+        if not latest.main_tex or not is_safe_latex(latest.main_tex):
+            raise ValueError("Unsafe or missing LaTeX content")
+        # Probe with the text actually compiled: restoring a cached PDF needs no build slot.
+        cached = await builder.probe_cache(main_tex_path, engine, options, extra_dirs, main_text=latest.main_tex)
+        main_tex_path.write_text(latest.main_tex, encoding="utf-8")
+        job_manager.emit(job.id, f"Compiling {main_tex_path.name} with {engine.value}")
+
+        async def _compile():
+            fmt = None
+            if settings.compile_incremental and settings.compile_preamble_formats and engine == CompileEngine.latexmk:
+                fmt = await preamble_formats.ensure(project.template_id)
+            return await builder.compile_async(
+                main_tex_path,
+                engine,
+                on_output=lambda line: job_manager.emit(job.id, line),
+                options=options,
+                extra_dirs=extra_dirs,
+                preamble_format=fmt,
+            )
+
+        if cached is not None:
+            pdf_path = await _compile()
+        else:
+            async with compile_scheduler.build_slot(job, priority):
+                pdf_path = await _compile()
+        latest = repo.get(project_id) or latest
+        latest.pdf_path = str(pdf_path)
+        latest.artifacts.update({"pdf": str(pdf_path), "main_tex": str(main_tex_path)})
+        latest.status = ProjectStatus.ready
+        repo.save(latest)
+        job_manager.emit(job.id, f"PDF written to {pdf_path}")
+        return {"pdf_path": str(pdf_path), "main_tex_path": str(main_tex_path)}
+
+    # The job first waits for its project only; the handler takes a build slot on a cache miss.
+    job, _joined = await compile_scheduler.submit(
+        project_id,
+        handler,
+        engine=engine.value,
+        priority=priority,
+        options_key=options.json(),
+        needs_slot=False,
+    )
+    return CompileResponse(project_id=project_id, pdf_path=None, main_tex_path=str(main_tex_path), job_id=job.id)
 
 
 @router.post("/{project_id}/preflight", response_model=PreflightResponse)
-async def preflight(project_id: str, repo: ProjectRepository = Depends(get_repo)) -> PreflightResponse:
+async def preflight(project_id: str, repo: BaseProjectRepository = Depends(get_repo)) -> PreflightResponse:
     project = await get_project(project_id, repo)
     generator = PreflightGenerator()
     report = generator.run(project)
@@ -175,6 +285,6 @@ async def preflight(project_id: str, repo: ProjectRepository = Depends(get_repo)
 
 
 @router.get("/{project_id}/artifacts", response_model=ArtifactBundle)
-async def get_artifacts(project_id: str, repo: ProjectRepository = Depends(get_repo)) -> ArtifactBundle:
+async def get_artifacts(project_id: str, repo: BaseProjectRepository = Depends(get_repo)) -> ArtifactBundle:
     project = await get_project(project_id, repo)
     return ArtifactBundle(project_id=project_id, files=project.artifacts)
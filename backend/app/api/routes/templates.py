@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 
+from ...config import get_settings
 from ...models.core import TemplateSpec
+from ...services.runtime import preamble_formats
 from ...services.templates import TemplateRegistry
 from ...services.templates.registry import TemplateMetadata
 
@@ -50,4 +52,7 @@ async def import_template(
             assets_path=identifier,
         )
     )
+    if get_settings().compile_preamble_formats:
+        # Dump the preamble once now so the first compile of this template is already warm.
+        await preamble_formats.ensure(metadata.identifier)
     return TemplateSpec(**metadata.dict())
@@ -17,8 +17,58 @@ _ENV_VAR_MAP: Dict[str, str] = {
     "openalex_base": "OPENALEX_BASE",
     "ncbi_api_key": "NCBI_API_KEY",
     "arxiv_base": "ARXIV_BASE",
+    "reference_max_concurrency": "REFERENCE_MAX_CONCURRENCY",
+    "reference_provider_concurrency": "REFERENCE_PROVIDER_CONCURRENCY",
+    "reference_query_similarity": "REFERENCE_QUERY_SIMILARITY",
+    "reference_cache_enabled": "REFERENCE_CACHE_ENABLED",
+    "reference_cache_path": "REFERENCE_CACHE_PATH",
+    "reference_cache_ttl_seconds": "REFERENCE_CACHE_TTL_SECONDS",
+    "reference_offline": "REFERENCE_OFFLINE",
+    "reference_search_deadline_seconds": "REFERENCE_SEARCH_DEADLINE_SECONDS",
+    "reference_rate_limits": "REFERENCE_RATE_LIMITS",
+    "reference_max_retries": "REFERENCE_MAX_RETRIES",
+    "reference_retry_backoff_seconds": "REFERENCE_RETRY_BACKOFF_SECONDS",
+    "reference_retry_max_backoff_seconds": "REFERENCE_RETRY_MAX_BACKOFF_SECONDS",
+    "reference_breaker_failures": "REFERENCE_BREAKER_FAILURES",
+    "reference_breaker_reset_seconds": "REFERENCE_BREAKER_RESET_SECONDS",
     "allowed_tex_commands": "ALLOWED_TEX_COMMANDS",
     "texlive_profile": "TEXLIVE_PROFILE",
+    "compile_max_concurrency": "COMPILE_MAX_CONCURRENCY",
+    "compile_timeout_seconds": "COMPILE_TIMEOUT_SECONDS",
+    "http_max_connections_per_host": "HTTP_MAX_CONNECTIONS_PER_HOST",
+    "http_max_keepalive_per_host": "HTTP_MAX_KEEPALIVE_PER_HOST",
+    "http_keepalive_expiry_seconds": "HTTP_KEEPALIVE_EXPIRY_SECONDS",
+    "http2_enabled": "HTTP2_ENABLED",
+    "compile_incremental": "COMPILE_INCREMENTAL",
+    "compile_preamble_formats": "COMPILE_PREAMBLE_FORMATS",
+    "compile_cache_dir": "COMPILE_CACHE_DIR",
+    "compile_cache_max_bytes": "COMPILE_CACHE_MAX_BYTES",
+    "storage_backend": "STORAGE_BACKEND",
+    "sqlite_path": "SQLITE_PATH",
+    "event_bus": "EVENT_BUS",
+    "event_buffer_size": "EVENT_BUFFER_SIZE",
+    "event_overflow_policy": "EVENT_OVERFLOW_POLICY",
+    "sse_heartbeat_seconds": "SSE_HEARTBEAT_SECONDS",
+    "sse_retry_ms": "SSE_RETRY_MS",
+    "llm_provider": "LLM_PROVIDER",
+    "ollama_base_url": "OLLAMA_BASE_URL",
+    "ollama_model": "OLLAMA_MODEL",
+    "lmstudio_base_url": "LMSTUDIO_BASE_URL",
+    "lmstudio_model": "LMSTUDIO_MODEL",
+    "llm_max_concurrency": "LLM_MAX_CONCURRENCY",
+    "llm_max_waiting": "LLM_MAX_WAITING",
+    "llm_concurrency_overrides": "LLM_CONCURRENCY_OVERRIDES",
+    "llm_streaming": "LLM_STREAMING",
+    "llm_chunk_tokens": "LLM_CHUNK_TOKENS",
+    "citation_batch_sentences": "CITATION_BATCH_SENTENCES",
+    "citation_batch_overlap": "CITATION_BATCH_OVERLAP",
+    "citation_rules_enabled": "CITATION_RULES_ENABLED",
+    "citation_rules_need_score": "CITATION_RULES_NEED_SCORE",
+    "citation_rules_skip_score": "CITATION_RULES_SKIP_SCORE",
+    "llm_cache_enabled": "LLM_CACHE_ENABLED",
+    "llm_cache_dir": "LLM_CACHE_DIR",
+    "llm_cache_ttl_seconds": "LLM_CACHE_TTL_SECONDS",
+    "llm_cache_max_bytes": "LLM_CACHE_MAX_BYTES",
 }
 
 load_dotenv()
@@ -32,19 +82,51 @@ class Settings(BaseModel):
         "/workspace/paper/.manuweaver",
         description="Root directory for project storage",
     )
+    storage_backend: str = Field("json", description="Project/job storage backend: json or sqlite")
+    sqlite_path: str | None = Field(None, description="SQLite database file (defaults to <storage_root>/manuweaver.db)")
     cors_allow_origins: List[str] = Field(default_factory=lambda: ["*"])
     redis_url: str = Field("redis://redis:6379/0")
+    event_bus: str = Field("memory", description="Job event bus: memory (single process) or redis")
+    event_buffer_size: int = Field(1000, description="Undelivered events buffered per SSE subscriber")
+    event_overflow_policy: str = Field("coalesce", description="Full buffer policy: drop_oldest or coalesce")
+    sse_heartbeat_seconds: float = Field(15.0, description="Idle interval before an SSE keep-alive comment")
+    sse_retry_ms: int = Field(3000, description="Reconnect delay advertised to SSE clients")
 
     openai_api_key: str | None = None
     crossref_mailto: str | None = None
     openalex_base: str = Field("https://api.openalex.org")
     ncbi_api_key: str | None = None
     arxiv_base: str = Field("http://export.arxiv.org/api")
+    reference_max_concurrency: int = Field(8, description="Provider requests in flight across a per-slot reference search")
+    reference_provider_concurrency: int = Field(2, description="Requests in flight to any one provider during a per-slot search")
+    reference_query_similarity: float = Field(90.0, description="token_sort_ratio above which two slot queries are searched once")
+    reference_cache_enabled: bool = Field(True, description="Persist provider responses and DOI metadata in SQLite")
+    reference_cache_path: str | None = Field(None, description="Reference cache database; defaults to <storage>/reference-cache.db")
+    reference_cache_ttl_seconds: float = Field(7 * 24 * 3600, description="Age after which a cached provider response is refetched")
+    reference_offline: bool = Field(False, description="Answer reference searches from the cache only, without network calls")
+    reference_search_deadline_seconds: float = Field(30.0, description="Time after which providers still searching are cancelled")
+    reference_rate_limits: str | None = Field(None, description="Per-provider requests per second overriding published limits")
+    reference_max_retries: int = Field(3, description="Retries of a provider request after a 429, 5xx or transport error")
+    reference_retry_backoff_seconds: float = Field(0.5, description="Base of the jittered exponential retry backoff")
+    reference_retry_max_backoff_seconds: float = Field(10.0, description="Longest wait before one retry, Retry-After included")
+    reference_breaker_failures: int = Field(5, description="Consecutive failed calls after which a provider is skipped")
+    reference_breaker_reset_seconds: float = Field(60.0, description="How long a provider is skipped before a trial call")
+
+    http_max_connections_per_host: int = Field(10, description="Connection cap of each pooled per-origin HTTP client")
+    http_max_keepalive_per_host: int = Field(5, description="Idle keep-alive connections kept per origin")
+    http_keepalive_expiry_seconds: float = Field(30.0, description="How long idle pooled connections stay open")
+    http2_enabled: bool = Field(True, description="Negotiate HTTP/2 when the h2 package is installed")
 
     allowed_tex_commands: str = Field(
         "\\usepackage,\\begin,\\end,\\cite,\\citep,\\citet,\\parencite,\\ref,\\label"
     )
     texlive_profile: str | None = None
+    compile_max_concurrency: int = Field(2, description="Maximum simultaneous latexmk/tectonic builds")
+    compile_timeout_seconds: float = Field(300.0, description="Wall-clock limit for one latexmk/tectonic run")
+    compile_incremental: bool = Field(True, description="Keep .aux/.bbl/.fls state in a per-project build directory")
+    compile_preamble_formats: bool = Field(True, description="Dump template preambles into precompiled pdflatex formats")
+    compile_cache_dir: str | None = Field(None, description="Compile cache location; defaults to <storage>/compile-cache")
+    compile_cache_max_bytes: int = Field(1 << 30, description="Size above which least recently used cached builds are evicted")
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -56,14 +138,27 @@ class Settings(BaseModel):
             if value is None:
                 continue
             overrides[field_name] = value
-
-
+        return cls(**overrides)
 
     llm_provider: str = Field("stub", env="LLM_PROVIDER")
     ollama_base_url: str = Field("http://localhost:11434", env="OLLAMA_BASE_URL")
     ollama_model: str = Field("llama3", env="OLLAMA_MODEL")
     lmstudio_base_url: str = Field("http://localhost:1234/v1", env="LMSTUDIO_BASE_URL")
     lmstudio_model: str = Field("llama3", env="LMSTUDIO_MODEL")
+    llm_max_concurrency: int = Field(4, env="LLM_MAX_CONCURRENCY")
+    llm_max_waiting: int = Field(64, env="LLM_MAX_WAITING")
+    llm_concurrency_overrides: str | None = Field(None, env="LLM_CONCURRENCY_OVERRIDES")
+    llm_streaming: bool = Field(True, env="LLM_STREAMING")
+    llm_chunk_tokens: int = Field(6000, env="LLM_CHUNK_TOKENS")
+    citation_batch_sentences: int = Field(40, env="CITATION_BATCH_SENTENCES")
+    citation_batch_overlap: int = Field(2, env="CITATION_BATCH_OVERLAP")
+    citation_rules_enabled: bool = Field(True, env="CITATION_RULES_ENABLED")
+    citation_rules_need_score: float = Field(2.0, env="CITATION_RULES_NEED_SCORE")
+    citation_rules_skip_score: float = Field(-1.5, env="CITATION_RULES_SKIP_SCORE")
+    llm_cache_enabled: bool = Field(True, env="LLM_CACHE_ENABLED")
+    llm_cache_dir: str | None = Field(None, env="LLM_CACHE_DIR")
+    llm_cache_ttl_seconds: float = Field(7 * 24 * 3600, env="LLM_CACHE_TTL_SECONDS")
+    llm_cache_max_bytes: int = Field(256 << 20, env="LLM_CACHE_MAX_BYTES")
 
 
 
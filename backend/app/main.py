@@ -10,6 +10,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .config import Settings, get_settings
 from .api.routes import templates, projects, jobs, health
+from .services.http_pool import get_http_pool
+from .services.runtime import job_manager
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,12 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     async def _startup() -> None:  # pragma: no cover - simple logging hook
         logger.info("Starting ManuWeaver backend")
         Path(settings.storage_root).mkdir(parents=True, exist_ok=True)
+        get_http_pool()
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:  # pragma: no cover - resource cleanup hook
+        await job_manager.bus.close()
+        await get_http_pool().aclose()
 
     return app
 
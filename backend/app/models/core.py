@@ -30,6 +30,9 @@ class CitationSlot(BaseModel):
     query_terms: list[str]
     confidence: float
     status: str = Field("pending", description="pending|confirmed|rejected|manual_review")
+    sentence_hash: str | None = None
+    offset: int | None = Field(None, description="Character offset of the sentence in the manuscript")
+    candidates: list[str] = Field(default_factory=list, description="Keys of references retrieved for this slot")
 
 
 class Reference(BaseModel):
@@ -94,6 +97,12 @@ class JobStatus(str, Enum):
     failed = "failed"
 
 
+class JobLogEntry(BaseModel):
+    seq: int = Field(..., description="1-based position of the line in the job log")
+    timestamp: datetime
+    message: str
+
+
 class CompileJob(BaseModel):
     id: str
     project_id: str
@@ -133,6 +142,20 @@ class ProjectCreateResponse(BaseModel):
     created_at: datetime
 
 
+class ProjectSummary(BaseModel):
+    id: str
+    template_id: str
+    status: ProjectStatus
+    created_at: datetime
+
+
+class ProjectListResponse(BaseModel):
+    items: list[ProjectSummary]
+    total: int
+    limit: int
+    offset: int
+
+
 class CitationDetectionResponse(BaseModel):
     project_id: str
     slots: list[CitationSlot]
@@ -1,48 +1,238 @@
-"""Citation need detection service."""
+"""Citation need detection service.
+
+A compiled rule engine first decides the obvious sentences (prior-work cues, dataset
+names, "et al.", self-references, existing citations); only the ambiguous rest is sent
+to the LLM. Those sentences are classified in batches of ``CITATION_BATCH_SENTENCES``, each preceded by
+``CITATION_BATCH_OVERLAP`` sentences of context from the previous batch. Up to
+``LLM_MAX_CONCURRENCY`` batches run at once and are merged back in document order.
+"""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-import re
+import logging
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from pydantic import ValidationError
 
+from .citation_rules import CitationRuleEngine, RuleScore
 from .llm.client import LLMClient
+from .sentence_index import get_sentence_index
+from ..config import get_settings
 from ..constants.prompts import citation_need_prompt_v1
 from ..models.core import CitationSlot
 
+SlotCallback = Callable[[CitationSlot], None]
+
+logger = logging.getLogger(__name__)
+
+
+def sentence_hash(sentence: str) -> str:
+    """Whitespace-insensitive content hash used to recognise unchanged sentences."""
+
+    return hashlib.sha256(" ".join(sentence.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def describe_slot(slot: CitationSlot) -> str:
+    """One job-log line for a classified sentence."""
+
+    verdict = "needs citation" if slot.need_citation else "no citation needed"
+    return f"Sentence classified ({verdict}): {slot.sentence[:80]}"
+
+
 @dataclass
 class CitationDetectionResult:
     slots: List[CitationSlot]
+    decided_by_rules: int = 0
+    reused: int = 0
+
+
+@dataclass
+class SentenceBatch:
+    """Sentences sent to the model together; only ``core`` sentences produce slots."""
+
+    index: int
+    start: int
+    context: List[str]
+    core: List[str]
+
+    @property
+    def sentences(self) -> List[str]:
+        return self.context + self.core
+
+
+def make_batches(sentences: List[str], size: int, overlap: int = 0) -> List[SentenceBatch]:
+    """Split ``sentences`` into batches of ``size``, each preceded by ``overlap`` sentences of context."""
+
+    if size <= 0 or len(sentences) <= size:
+        return [SentenceBatch(index=1, start=0, context=[], core=list(sentences))]
+    batches: List[SentenceBatch] = []
+    for number, start in enumerate(range(0, len(sentences), size), start=1):
+        context = sentences[max(0, start - overlap) : start]
+        batches.append(SentenceBatch(index=number, start=start, context=context, core=sentences[start : start + size]))
+    return batches
+
+
+def _parse_slot(item: Any) -> CitationSlot | None:
+    """``item`` as a slot, or ``None`` when the model left out or mangled a field."""
+
+    if not isinstance(item, dict):
+        return None
+    try:
+        return CitationSlot(**item)
+    except (ValidationError, TypeError):
+        return None
+
+
+def _match_items(batch: SentenceBatch, response: List[Any]) -> List[CitationSlot | None]:
+    """Pair the model's items with the batch's core sentences, by text or else by position.
+
+    Items that do not validate as a :class:`CitationSlot` count as unmatched.
+    """
+
+    items = [item for item in response if isinstance(item, dict)]
+    parsed = [_parse_slot(item) for item in items]
+    by_sentence = {slot.sentence.strip(): slot for slot in parsed if slot is not None}
+    positional = len(items) == len(batch.sentences)
+    matched: List[CitationSlot | None] = []
+    for offset, sentence in enumerate(batch.core):
+        slot = by_sentence.get(sentence.strip())
+        if slot is None and positional:
+            slot = parsed[len(batch.context) + offset]
+        matched.append(slot)
+    return matched
 
 
 class CitationDetector:
-    def __init__(self, client: LLMClient | None = None) -> None:
+    def __init__(
+        self,
+        client: LLMClient | None = None,
+        batch_sentences: int | None = None,
+        batch_overlap: int | None = None,
+        max_attempts: int = 2,
+        rules: CitationRuleEngine | None = None,
+        max_concurrent_batches: int | None = None,
+    ) -> None:
+        settings = get_settings()
         self.client = client or LLMClient()
+        self.rules = rules or CitationRuleEngine()
+        self.use_rules = rules is not None or settings.citation_rules_enabled
+        self.batch_sentences = batch_sentences if batch_sentences is not None else settings.citation_batch_sentences
+        self.batch_overlap = batch_overlap if batch_overlap is not None else settings.citation_batch_overlap
+        self.max_attempts = max(1, max_attempts)
+        # Stay within the limiter's running slots: batches beyond its waiting queue would be rejected.
+        self.max_concurrent_batches = max(1, max_concurrent_batches or settings.llm_max_concurrency)
+
+    async def detect(
+        self,
+        text: str,
+        on_slot: SlotCallback | None = None,
+        previous: List[CitationSlot] | None = None,
+    ) -> CitationDetectionResult:
+        """Classify the sentences of ``text``; ``on_slot`` sees each slot as the model streams it.
 
-    @staticmethod
-    def _split_sentences(text: str) -> List[str]:
-        sentences = re.split(r"(?<=[.!?])\s+", text.strip())
-        return [s for s in sentences if s]
+        Slots from ``previous`` whose sentence hash still occurs are carried over with
+        their status (and new offset) instead of being classified again. Sentences the
+        rules cannot decide are classified in concurrent batches; a batch whose request
+        fails or whose reply cannot be used is retried once and then falls back to the
+        rule scores without affecting the other batches.
+        """
 
-    async def detect(self, text: str) -> CitationDetectionResult:
-        sentences = self._split_sentences(text)
-        payload = citation_need_prompt_v1.format(sentences=json.dumps(sentences, ensure_ascii=False))
-        response = await self.client.complete_json(payload)
+        known: Dict[str, Deque[CitationSlot]] = defaultdict(deque)
+        for slot in previous or []:
+            # Slots saved before hashes were recorded are matched by their sentence text.
+            known[slot.sentence_hash or sentence_hash(slot.sentence)].append(slot)
+        slots: List[CitationSlot | None] = []
+        fresh: List[str] = []
+        hashes: List[str] = []
+        index = get_sentence_index(text)
+        for sentence in index:
+            digest = sentence_hash(sentence.text)
+            hashes.append(digest)
+            if known[digest]:
+                slots.append(known[digest].popleft().copy(update={"sentence_hash": digest, "offset": sentence.start}))
+            else:
+                slots.append(None)
+                fresh.append(sentence.text)
+        classified, decided_by_rules = await self._classify(fresh, on_slot)
+        new_slots = iter(classified)
+        for sentence in index:
+            if slots[sentence.index] is None:
+                slots[sentence.index] = next(new_slots).copy(
+                    update={"sentence": sentence.text, "sentence_hash": hashes[sentence.index], "offset": sentence.start}
+                )
+        return CitationDetectionResult(slots=slots, decided_by_rules=decided_by_rules, reused=len(index) - len(fresh))
+
+    async def _classify(
+        self, sentences: List[str], on_slot: SlotCallback | None
+    ) -> Tuple[List[CitationSlot], int]:
+        scores = self.rules.score(sentences)
+        if not self.use_rules:
+            for score in scores:
+                score.need_citation = None
+        pending = [score for score in scores if not score.decided]
+        batches = make_batches([score.sentence for score in pending], self.batch_sentences, self.batch_overlap)
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def _bounded(batch: SentenceBatch) -> List[CitationSlot]:
+            async with semaphore:
+                return await self._detect_batch(batch, pending[batch.start : batch.start + len(batch.core)], on_slot)
+
+        results = await asyncio.gather(*(_bounded(batch) for batch in batches))
+        classified = iter(slot for batch_slots in results for slot in batch_slots)
         slots: List[CitationSlot] = []
-        if isinstance(response, list):
-            for item in response:
-                slots.append(CitationSlot(**item))
-        else:
-            for sentence in sentences:
-                need = any(keyword in sentence.lower() for keyword in ["study", "dataset", "we propose", "%"])
-                slots.append(
-                    CitationSlot(
-                        sentence=sentence,
-                        need_citation=need,
-                        reasons=["heuristic keyword match"] if need else ["general statement"],
-                        query_terms=sentence.split()[:5],
-                        confidence=0.4 if need else 0.2,
-                        status="pending",
-                    )
+        for score in scores:
+            if score.decided:
+                slot = score.to_slot()
+                if on_slot is not None:
+                    on_slot(slot)
+            else:
+                slot = next(classified)
+            slots.append(slot)
+        return slots, len(scores) - len(pending)
+
+    async def _detect_batch(
+        self, batch: SentenceBatch, fallback: List[RuleScore], on_slot: SlotCallback | None
+    ) -> List[CitationSlot]:
+        if not batch.core:
+            return []
+        payload = citation_need_prompt_v1.replace("{sentences}", json.dumps(batch.sentences, ensure_ascii=False))
+        core = {sentence.strip() for sentence in batch.core}
+        reported: set[str] = set()
+
+        def _on_item(key: str | None, item: Any) -> None:
+            # Context sentences are classified (and reported) by their own batch; invalid
+            # items are reported later, once retried or replaced by the rule fallback.
+            slot = _parse_slot(item) if key is None else None
+            sentence = slot.sentence.strip() if slot is not None else ""
+            if sentence in core and sentence not in reported:
+                reported.add(sentence)
+                on_slot(slot)
+
+        matched: List[CitationSlot | None] = [None] * len(batch.core)
+        for attempt in range(self.max_attempts):
+            try:
+                response = await self.client.complete_json(
+                    payload,
+                    prompt_version="citation_need_prompt_v1",
+                    use_cache=attempt == 0,
+                    on_item=_on_item if on_slot is not None and attempt == 0 else None,
                 )
-        return CitationDetectionResult(slots=slots)
+            except Exception as exc:
+                logger.warning("Citation batch %d attempt %d failed: %s", batch.index, attempt + 1, exc)
+                continue
+            if isinstance(response, list):
+                matched = _match_items(batch, response)
+                if all(item is not None for item in matched):
+                    break
+        slots: List[CitationSlot] = []
+        for sentence, score, item in zip(batch.core, fallback, matched):
+            slot = score.to_slot(need_citation=score.score > 0) if item is None else item
+            if on_slot is not None and sentence.strip() not in reported:
+                reported.add(sentence.strip())
+                on_slot(slot)
+            slots.append(slot)
+        return slots
@@ -1,25 +1,75 @@
-"""Apply confirmed citations into structured JSON."""
+"""Apply confirmed citations into structured JSON.
+
+Confirmed slots are located in one pass over each section's sentence index (exact
+sentence matches), with a single compiled multi-pattern scan as the fallback for
+sentences the segmentation does not reproduce. Each occurrence receives at most one
+citation per slot, and every touched section is rebuilt once; untouched sections
+are shared with the input rather than copied.
+"""
 from __future__ import annotations
 
-from copy import deepcopy
-from typing import Any, Dict, Iterable, List
+import re
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Tuple
 
 from ..models.core import CitationSlot, Reference
+from .sentence_index import build_sentence_index
+
+Insertion = Tuple[int, str]
+
+
+def _rebuild(content: str, insertions: List[Insertion]) -> str:
+    parts: List[str] = []
+    last = 0
+    for end, citation in sorted(insertions):
+        if content.startswith(citation, end):
+            continue  # applied by an earlier run
+        parts.append(content[last:end])
+        parts.append(citation)
+        last = end
+    parts.append(content[last:])
+    return "".join(parts)
 
 
 class CitationInserter:
+    @staticmethod
+    def _citation(slot: CitationSlot, ref_map: Dict[str, Reference]) -> str:
+        key = slot.reasons[0] if slot.reasons else slot.sentence[:10]
+        ref = ref_map.get(key)
+        return f" \\citep{{{ref.key if ref else key}}}"
+
     def apply(self, normalized: Dict[str, Any], citations: Iterable[CitationSlot], references: Iterable[Reference]) -> Dict[str, Any]:
-        result = deepcopy(normalized)
         ref_map = {ref.key: ref for ref in references}
-        slots = list(citations)
-        for section in result.get("sections", []):
-            content = section.get("content", "")
-            for slot in slots:
-                if slot.need_citation and slot.status == "confirmed":
-                    key = slot.reasons[0] if slot.reasons else slot.sentence[:10]
-                    ref = ref_map.get(key)
-                    citation_cmd = f"\\citep{{{ref.key if ref else key}}}"
-                    if slot.sentence in content:
-                        content = content.replace(slot.sentence, f"{slot.sentence} {citation_cmd}")
-            section["content"] = content
+        pending: Dict[str, Deque[str]] = defaultdict(deque)
+        for slot in citations:
+            if slot.need_citation and slot.status == "confirmed":
+                pending[slot.sentence.strip()].append(self._citation(slot, ref_map))
+
+        sections = normalized.get("sections", [])
+        contents = [section.get("content", "") for section in sections]
+        insertions: Dict[int, List[Insertion]] = defaultdict(list)
+        used: Dict[int, set[int]] = defaultdict(set)
+        if pending:
+            for number, content in enumerate(contents):
+                for sentence in build_sentence_index(content):
+                    queue = pending.get(sentence.text)
+                    if queue:
+                        insertions[number].append((sentence.end, queue.popleft()))
+                        used[number].add(sentence.end)
+        leftovers = {text: queue for text, queue in pending.items() if queue and text}
+        if leftovers:
+            pattern = re.compile("|".join(re.escape(text) for text in sorted(leftovers, key=len, reverse=True)))
+            for number, content in enumerate(contents):
+                for match in pattern.finditer(content):
+                    queue = leftovers[match.group()]
+                    if queue and match.end() not in used[number]:
+                        insertions[number].append((match.end(), queue.popleft()))
+                        used[number].add(match.end())
+
+        result = dict(normalized)
+        if "sections" in normalized:
+            result["sections"] = [
+                {**section, "content": _rebuild(contents[number], insertions[number])} if number in insertions else section
+                for number, section in enumerate(sections)
+            ]
         return result
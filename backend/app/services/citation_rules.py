@@ -0,0 +1,136 @@
+"""Rule-based first stage for citation need detection.
+
+All cue patterns are compiled into one alternation and matched in a single pass
+over the whole manuscript; each match is attributed to its sentence by offset.
+Sentences whose score clears ``need_score`` or falls to ``skip_score`` are decided
+here, and only the ambiguous remainder is sent to the LLM.
+"""
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence
+
+from ..config import get_settings
+from ..models.core import CitationSlot
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    pattern: str
+    weight: float
+    reason: str
+
+
+_DATASETS = (
+    r"ImageNet|COCO|MNIST|CIFAR-?10{1,2}|SQuAD|GLUE|SuperGLUE|WikiText|Penn Treebank|LibriSpeech|"
+    r"Kinetics|PubMed|UK Biobank|MIMIC(?:-I{1,3}V?)?|WMT\d*|CelebA|Cityscapes|ShapeNet"
+)
+
+RULES: Sequence[Rule] = (
+    Rule("et_al", r"(?i:\bet\s+al\b\.?)", 2.5, "mentions other authors"),
+    Rule(
+        "prior_work",
+        r"(?i:\b(?:previous|prior|recent|earlier|existing)\s+(?:work|studies|research|approaches|methods|literature)\b"
+        r"|\b(?:has|have)\s+been\s+(?:shown|demonstrated|reported|proposed|applied|explored|studied)\b"
+        r"|\bstudies\s+(?:show|suggest|found|have|indicate|report)\w*\b"
+        r"|\baccording\s+to\b|\bit\s+is\s+(?:well[- ])?known\b|\bwidely\s+(?:used|adopted|studied)\b"
+        r"|\bstate[- ]of[- ]the[- ]art\b|\b(?:proposed|introduced|developed)\s+(?:by|to)\b|\breported\b)",
+        2.0,
+        "refers to prior work",
+    ),
+    Rule("dataset_name", rf"\b(?:{_DATASETS})\b", 2.0, "names a dataset"),
+    Rule("named_resource", r"\b[A-Z][\w-]*\s+(?i:dataset|corpus|benchmark|database)\b", 1.5, "names a dataset"),
+    Rule("percentage", r"\d+(?:\.\d+)?\s?%|(?i:\bpercent\b)", 1.0, "states a percentage"),
+    Rule("year", r"\b(?:19|20)\d{2}\b", 1.0, "mentions a year"),
+    Rule("quantity", r"\b\d{1,3}(?:,\d{3})+\b|\b\d+\.\d+\b", 0.5, "states a quantity"),
+    Rule("resource_word", r"(?i:\b(?:dataset|corpus|benchmark|survey)s?\b)", 0.5, "mentions a resource"),
+    Rule(
+        "self_reference",
+        r"(?i:\bin\s+this\s+(?:paper|work|article|study|section)\b"
+        r"|\bwe\s+(?:propose|present|introduce|describe|thank|leave|now)\b"
+        r"|\bour\s+(?:method|approach|model|contributions?|results|code|experiments?)\b"
+        r"|\b(?:the\s+)?remainder\s+of\s+this\b)",
+        -2.0,
+        "describes this manuscript",
+    ),
+    Rule(
+        "internal_reference",
+        r"(?i:\b(?:fig(?:ure)?s?|tables?|sections?|eqs?|equations?|appendix)\.?\s*\(?\d)",
+        -1.5,
+        "refers to this manuscript",
+    ),
+    Rule("already_cited", r"\\cite\w*\{|\[\d+(?:\s*[,\u2013-]\s*\d+)*\]|\[@[\w:.-]+", -4.0, "already cited"),
+)
+
+
+@dataclass
+class RuleScore:
+    sentence: str
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+    need_citation: bool | None = None
+
+    @property
+    def decided(self) -> bool:
+        return self.need_citation is not None
+
+    def to_slot(self, need_citation: bool | None = None) -> CitationSlot:
+        """Slot for this sentence; ``need_citation`` overrides the decision for fallbacks."""
+
+        need = self.need_citation if need_citation is None else need_citation
+        need = bool(need)
+        return CitationSlot(
+            sentence=self.sentence,
+            need_citation=need,
+            reasons=list(self.reasons) or ["general statement"],
+            query_terms=self.sentence.split()[:5],
+            confidence=min(0.95, 0.5 + abs(self.score) / 10) if self.decided else (0.4 if need else 0.2),
+            status="pending",
+        )
+
+
+class CitationRuleEngine:
+    def __init__(
+        self,
+        rules: Sequence[Rule] = RULES,
+        need_score: float | None = None,
+        skip_score: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.rules = list(rules)
+        self.need_score = need_score if need_score is not None else settings.citation_rules_need_score
+        self.skip_score = skip_score if skip_score is not None else settings.citation_rules_skip_score
+        self._pattern = re.compile("|".join(f"(?P<r{index}>{rule.pattern})" for index, rule in enumerate(self.rules)))
+
+    def score(self, sentences: Iterable[str]) -> List[RuleScore]:
+        """Score every sentence with one scan over the joined text."""
+
+        scores = [RuleScore(sentence=sentence) for sentence in sentences]
+        starts: List[int] = []
+        offset = 0
+        for item in scores:
+            starts.append(offset)
+            offset += len(item.sentence) + 1
+        text = "\n".join(item.sentence for item in scores)
+        # Each rule counts at most once per sentence.
+        seen: Dict[int, set[int]] = {}
+        for match in self._pattern.finditer(text):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            rule_index = int(match.lastgroup[1:])
+            fired = seen.setdefault(index, set())
+            if rule_index in fired:
+                continue
+            fired.add(rule_index)
+            rule = self.rules[rule_index]
+            scores[index].score += rule.weight
+            if rule.reason not in scores[index].reasons:
+                scores[index].reasons.append(rule.reason)
+        for item in scores:
+            if item.score >= self.need_score:
+                item.need_citation = True
+            elif item.score <= self.skip_score:
+                item.need_citation = False
+        return scores
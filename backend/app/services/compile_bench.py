@@ -0,0 +1,82 @@
+"""Measure cold versus warm LaTeX build times for a small edit.
+
+Usage::
+
+    python -m backend.app.services.compile_bench path/to/project --template IEEEtran --edits 3
+
+The project directory (containing ``main.tex`` and its inputs) is copied to a
+temporary directory for every mode so the runs do not share state.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from ..models.core import CompileEngine
+from .latex_builder import AsyncLatexBuilder
+from .templates.formats import PreambleFormat, PreambleFormatStore
+
+MODES = ("cold", "incremental", "incremental+format")
+
+
+def _small_edit(main_tex: Path, number: int) -> None:
+    source = main_tex.read_text(encoding="utf-8")
+    marker = "\\end{document}"
+    main_tex.write_text(source.replace(marker, f"Edit {number}.\n\n{marker}", 1), encoding="utf-8")
+
+
+async def _measure(project: Path, mode: str, edits: int, fmt: PreambleFormat | None) -> List[float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp) / "project"
+        shutil.copytree(project, workdir, ignore=shutil.ignore_patterns("build", "*.aux", "*.fdb_latexmk", "*.fls"))
+        main_tex = workdir / "main.tex"
+        incremental = mode != "cold"
+        builder = AsyncLatexBuilder(workdir, incremental=incremental)
+        preamble_format = fmt if mode == "incremental+format" else None
+        # The first build primes the build directory; only the edits are timed.
+        await builder.compile_async(main_tex, CompileEngine.latexmk, preamble_format=preamble_format)
+        timings = []
+        for number in range(1, edits + 1):
+            _small_edit(main_tex, number)
+            if not incremental:
+                for path in workdir.glob("main.*"):
+                    if path.suffix != ".tex":
+                        path.unlink()
+            started = time.perf_counter()
+            await builder.compile_async(main_tex, CompileEngine.latexmk, preamble_format=preamble_format)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+
+async def run_benchmark(project: Path, template_id: str | None, edits: int) -> Dict[str, List[float]]:
+    fmt = None
+    if template_id:
+        with tempfile.TemporaryDirectory() as formats_root:
+            fmt = await PreambleFormatStore(Path(formats_root)).ensure(template_id)
+            if fmt is not None:
+                return {mode: await _measure(project, mode, edits, fmt) for mode in MODES}
+    return {mode: await _measure(project, mode, edits, fmt) for mode in MODES[:2]}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare cold and warm LaTeX build times after small edits")
+    parser.add_argument("project", type=Path, help="Directory containing main.tex")
+    parser.add_argument("--template", default=None, help="Template whose preamble format should be benchmarked")
+    parser.add_argument("--edits", type=int, default=3)
+    args = parser.parse_args(argv)
+    results = asyncio.run(run_benchmark(args.project, args.template, args.edits))
+    baseline = statistics.median(results["cold"])
+    for mode, timings in results.items():
+        median = statistics.median(timings)
+        print(f"{mode:<20} median={median:.2f}s  speedup={baseline / median:.1f}x  runs={', '.join(f'{t:.2f}' for t in timings)}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    raise SystemExit(main())
@@ -0,0 +1,212 @@
+"""Content-addressed cache of compiled PDFs and compiler logs.
+
+A cache key is the SHA-256 of every build input (``main.tex``, bibliography, class and
+style files, figures, template assets) together with the engine and
+:class:`CompileOptions`. Artifacts are stored once per content hash under
+``objects/`` and referenced from small entry documents under ``entries/``; the
+entry's mtime records its last use, and the least recently used entries are evicted
+when the store grows past ``max_bytes``.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+from ..config import get_settings, project_storage_root
+from ..models.core import CompileEngine, CompileOptions
+
+BUILD_DIRNAME = "build"
+INPUT_SUFFIXES = {".tex", ".bib", ".bst", ".cls", ".sty", ".bbx", ".cbx", ".png", ".jpg", ".jpeg", ".eps", ".svg", ".pdf"}
+_CHUNK = 1 << 16
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    pdf: str
+    log: str
+    size: int
+    created_at: float
+
+
+def _hash_file(digest: "hashlib._Hash", path: Path) -> None:
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK), b""):
+            digest.update(chunk)
+
+
+def collect_inputs(workdir: Path, main_tex: Path, extra_dirs: Sequence[Path] = ()) -> List[Path]:
+    """Files that can influence the build, excluding the compiler's own outputs and ``build/``."""
+
+    outputs = {workdir / f"{main_tex.stem}.pdf"}
+    build_dir = workdir / BUILD_DIRNAME
+    files = [
+        p
+        for p in workdir.rglob("*")
+        if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES and p not in outputs and not p.is_relative_to(build_dir)
+    ]
+    for directory in extra_dirs:
+        if directory.is_dir():
+            files.extend(p for p in directory.rglob("*") if p.is_file())
+    return sorted(set(files))
+
+
+class CompileCache:
+    def __init__(self, root: Path | None = None, max_bytes: int | None = None) -> None:
+        settings = get_settings()
+        self.root = root or (Path(settings.compile_cache_dir) if settings.compile_cache_dir else project_storage_root(settings) / "compile-cache")
+        self.max_bytes = max_bytes if max_bytes is not None else settings.compile_cache_max_bytes
+        self.objects = self.root / "objects"
+        self.entries = self.root / "entries"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.entries.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(
+        self,
+        workdir: Path,
+        main_tex: Path,
+        engine: CompileEngine,
+        options: CompileOptions | None = None,
+        extra_dirs: Sequence[Path] = (),
+        main_text: str | None = None,
+    ) -> str:
+        """Hash of every build input; ``main_text`` stands in for ``main_tex`` not yet written."""
+
+        digest = hashlib.sha256()
+        digest.update(f"engine={engine.value}\n".encode("utf-8"))
+        digest.update(f"main={main_tex.name}\n".encode("utf-8"))
+        digest.update((options or CompileOptions(engine=engine)).json().encode("utf-8"))
+        roots = [workdir, *extra_dirs]
+        inputs = collect_inputs(workdir, main_tex, extra_dirs)
+        if main_text is not None and main_tex not in inputs:
+            inputs = sorted([*inputs, main_tex])
+        for path in inputs:
+            root = next((r for r in roots if path.is_relative_to(r)), path.parent)
+            digest.update(b"\0" + str(path.relative_to(root)).encode("utf-8") + b"\0")
+            if main_text is not None and path == main_tex:
+                digest.update(main_text.encode("utf-8"))
+            else:
+                _hash_file(digest, path)
+        return digest.hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries / f"{key}.json"
+
+    def _put_object(self, data_path: Path | None = None, data: bytes | None = None) -> str:
+        digest = hashlib.sha256()
+        if data_path is not None:
+            _hash_file(digest, data_path)
+        else:
+            digest.update(data or b"")
+        name = digest.hexdigest()
+        target = self._object_path(name)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".tmp{os.getpid()}")
+            if data_path is not None:
+                shutil.copyfile(data_path, tmp)
+            else:
+                tmp.write_bytes(data or b"")
+            os.replace(tmp, target)
+        return name
+
+    def peek(self, key: str) -> CacheEntry | None:
+        """Return the entry for ``key`` without touching counters or recency."""
+
+        try:
+            entry = CacheEntry(**json.loads(self._entry_path(key).read_text(encoding="utf-8")))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+        if not self._object_path(entry.pdf).exists():
+            return None
+        return entry
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        entry = self.peek(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        os.utime(self._entry_path(key))  # mark as recently used
+        self.hits += 1
+        return entry
+
+    def restore(self, entry: CacheEntry, pdf_path: Path) -> Path:
+        tmp = pdf_path.with_suffix(".pdf.tmp")
+        shutil.copyfile(self._object_path(entry.pdf), tmp)
+        os.replace(tmp, pdf_path)
+        return pdf_path
+
+    def read_log(self, entry: CacheEntry) -> List[str]:
+        path = self._object_path(entry.log)
+        if not path.exists():
+            return []
+        return path.read_text(encoding="utf-8").splitlines()
+
+    def store(self, key: str, pdf_path: Path, log_lines: Iterable[str]) -> CacheEntry:
+        log_bytes = "\n".join(log_lines).encode("utf-8")
+        with self._lock:
+            entry = CacheEntry(
+                key=key,
+                pdf=self._put_object(data_path=pdf_path),
+                log=self._put_object(data=log_bytes),
+                size=pdf_path.stat().st_size + len(log_bytes),
+                created_at=time.time(),
+            )
+            self._entry_path(key).write_text(json.dumps(entry.__dict__), encoding="utf-8")
+            self._evict()
+        return entry
+
+    def _load_entries(self) -> List[tuple[float, Path, CacheEntry]]:
+        loaded = []
+        for path in self.entries.glob("*.json"):
+            try:
+                loaded.append((path.stat().st_mtime, path, CacheEntry(**json.loads(path.read_text(encoding="utf-8")))))
+            except (FileNotFoundError, json.JSONDecodeError, TypeError):
+                continue
+        return loaded
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.objects.rglob("*") if p.is_file())
+
+    def _evict(self) -> None:
+        sizes = {p.name: p.stat().st_size for p in self.objects.rglob("*") if p.is_file()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        entries = sorted(self._load_entries(), key=lambda item: item[0])
+        refcounts: Dict[str, int] = {}
+        for _, _, entry in entries:
+            for digest in (entry.pdf, entry.log):
+                refcounts[digest] = refcounts.get(digest, 0) + 1
+        for _, path, entry in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            for digest in (entry.pdf, entry.log):
+                refcounts[digest] -= 1
+            for digest in {entry.pdf, entry.log}:
+                if refcounts[digest] <= 0 and digest in sizes:
+                    self._object_path(digest).unlink(missing_ok=True)
+                    total -= sizes.pop(digest)
+
+    def stats(self) -> dict:
+        return {
+            "entries": sum(1 for _ in self.entries.glob("*.json")),
+            "bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,179 @@
+"""Bounded scheduling of LaTeX compile jobs.
+
+Compile requests become regular jobs through :class:`JobManager`, but the handler of
+each job first waits for one of ``max_concurrency`` build slots. Waiting jobs are
+served by priority (higher first) and then in FIFO order. At most one compile per
+project runs at a time, since builds share the project directory; later requests for
+a busy project wait behind it. While a compile is still waiting, further requests
+for the same project, engine and options join that job instead of queueing another
+build. Jobs submitted with ``needs_slot=False`` only wait for their project; a
+handler that then finds it has to build after all (no cached PDF for the text it is
+about to compile) takes a slot with :meth:`CompileScheduler.build_slot`.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set, Tuple
+
+from ..models.core import CompileJob, PipelineStage
+from .jobs import JobManager
+
+CompileHandler = Callable[[CompileJob], Awaitable[dict | None]]
+
+
+@dataclass(order=True)
+class _Ticket:
+    sort_key: Tuple[int, int]
+    job_id: str = field(compare=False)
+    dedup_key: Tuple[str, str, str] = field(compare=False)
+    needs_slot: bool = field(compare=False, default=True)
+    holds_project: bool = field(compare=False, default=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    granted: asyncio.Future = field(compare=False, default=None)  # type: ignore[assignment]
+    last_position: int | None = field(compare=False, default=None)
+
+
+class CompileScheduler:
+    def __init__(self, job_manager: JobManager, max_concurrency: int = 2) -> None:
+        self.job_manager = job_manager
+        self.max_concurrency = max(max_concurrency, 1)
+        self._waiting: List[_Ticket] = []
+        self._queued_jobs: Dict[Tuple[str, str, str], CompileJob] = {}
+        self._active_projects: Set[str] = set()
+        self._running = 0
+        self._counter = itertools.count()
+
+    async def submit(
+        self,
+        project_id: str,
+        handler: CompileHandler,
+        engine: str = "latexmk",
+        priority: int = 0,
+        options_key: str = "",
+        needs_slot: bool = True,
+    ) -> Tuple[CompileJob, bool]:
+        """Queue a compile job; returns ``(job, joined)`` where ``joined`` marks a deduplicated request.
+
+        ``options_key`` identifies the compile options; requests only join a queued job
+        whose options are identical.
+        """
+
+        dedup_key = (project_id, engine, options_key)
+        existing = self._queued_jobs.get(dedup_key)
+        if existing is not None:
+            self.job_manager.emit(existing.id, "Another compile request for this project joined the queued job")
+            return existing, True
+
+        async def _scheduled(job: CompileJob) -> dict | None:
+            ticket = await self._acquire(job, dedup_key, priority, needs_slot)
+            try:
+                return await handler(job)
+            finally:
+                self._release(ticket)
+
+        job = await self.job_manager.run_task(project_id, PipelineStage.compile, _scheduled)
+        # Register synchronously so that a duplicate submitted before the job's task starts still joins it.
+        self._queued_jobs[dedup_key] = job
+        return job, False
+
+    @asynccontextmanager
+    async def build_slot(self, job: CompileJob, priority: int = 0) -> AsyncIterator[None]:
+        """Hold a build slot inside a running job submitted with ``needs_slot=False``."""
+
+        ticket = await self._acquire(job, (job.project_id, "", ""), priority, needs_slot=True, holds_project=True)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    async def _acquire(
+        self,
+        job: CompileJob,
+        dedup_key: Tuple[str, str, str],
+        priority: int,
+        needs_slot: bool,
+        holds_project: bool = False,
+    ) -> _Ticket:
+        ticket = _Ticket(
+            sort_key=(-priority, next(self._counter)),
+            job_id=job.id,
+            dedup_key=dedup_key,
+            needs_slot=needs_slot,
+            holds_project=holds_project,
+        )
+        ticket.granted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, ticket)
+        self._dispatch()
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                self._release(ticket)
+            else:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._forget(ticket)
+                self._report_positions()
+            raise
+        waited = time.monotonic() - ticket.enqueued_at
+        if needs_slot:
+            self.job_manager.emit(job.id, f"Compile slot acquired after waiting {waited:.1f}s ({self._running}/{self.max_concurrency} running)")
+        else:
+            self.job_manager.emit(job.id, f"Project directory available after waiting {waited:.1f}s")
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        if ticket.needs_slot:
+            self._running = max(self._running - 1, 0)
+        if not ticket.holds_project:
+            self._active_projects.discard(ticket.dedup_key[0])
+        self._dispatch()
+
+    def _forget(self, ticket: _Ticket) -> None:
+        queued = self._queued_jobs.get(ticket.dedup_key)
+        if queued is not None and queued.id == ticket.job_id:
+            del self._queued_jobs[ticket.dedup_key]
+
+    def _dispatch(self) -> None:
+        granted: List[_Ticket] = []
+        for ticket in sorted(self._waiting):
+            project_id = ticket.dedup_key[0]
+            if not ticket.holds_project and project_id in self._active_projects:
+                continue  # one build per project directory at a time
+            if ticket.needs_slot:
+                if self._running >= self.max_concurrency:
+                    continue
+                self._running += 1
+            if not ticket.holds_project:
+                self._active_projects.add(project_id)
+            granted.append(ticket)
+        if granted:
+            self._waiting = [ticket for ticket in self._waiting if ticket not in granted]
+            heapq.heapify(self._waiting)
+        for ticket in granted:
+            self._forget(ticket)
+            ticket.granted.set_result(None)
+        self._report_positions()
+
+    def _report_positions(self) -> None:
+        for position, ticket in enumerate(sorted(self._waiting), start=1):
+            if ticket.last_position != position:
+                ticket.last_position = position
+                self.job_manager.emit(
+                    ticket.job_id,
+                    f"Queued for compilation: position {position} of {len(self._waiting)} ({self._running}/{self.max_concurrency} running)",
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "running": self._running,
+            "waiting": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "oldest_wait_seconds": max((now - ticket.enqueued_at for ticket in self._waiting), default=0.0),
+        }
@@ -0,0 +1,320 @@
+"""Job event buses used to fan out live job logs to SSE subscribers.
+
+The in-memory bus only reaches subscribers in the current process. The Redis bus
+writes every event to a per-job Redis Stream so that any API worker can follow a job
+that is executed by another worker or by a Celery process.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict, List, Set
+
+from ..config import Settings, get_settings
+
+COMPLETE_SENTINEL = "__COMPLETE__"
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscriber buffer does with the oldest undelivered event."""
+
+    drop_oldest = "drop_oldest"
+    coalesce = "coalesce"
+
+
+@dataclass
+class JobEvent:
+    job_id: str
+    message: str
+    seq: int | None = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.message == COMPLETE_SENTINEL
+
+
+class Subscription:
+    """Handle for receiving events of a single job.
+
+    Events published after :meth:`BaseEventBus.subscribe` returns are guaranteed to be
+    delivered, which lets callers replay stored history afterwards without gaps.
+    """
+
+    async def get(self, timeout: float | None = None) -> JobEvent | None:
+        """Wait for the next event, returning ``None`` if ``timeout`` elapses first."""
+
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+
+class BaseEventBus:
+    def publish(self, event: JobEvent) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, job_id: str) -> Subscription:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber counts and buffer depths held by this process."""
+
+        return {}
+
+    async def close(self) -> None:
+        return None
+
+
+class _MemorySubscription(Subscription):
+    """Bounded per-subscriber buffer.
+
+    When ``maxsize`` undelivered events are queued the oldest one is discarded. With
+    :attr:`OverflowPolicy.coalesce` the discarded lines are reported to the reader as a
+    single "lines skipped" marker; the terminal event is never discarded.
+    """
+
+    def __init__(self, bus: "InMemoryEventBus", job_id: str, maxsize: int, policy: OverflowPolicy) -> None:
+        self._bus = bus
+        self.job_id = job_id
+        self.maxsize = max(maxsize, 1)
+        self.policy = policy
+        self.dropped = 0
+        self._skipped = 0
+        self._events: Deque[JobEvent] = deque()
+        self._ready = asyncio.Event()
+
+    @property
+    def depth(self) -> int:
+        return len(self._events)
+
+    def put(self, event: JobEvent) -> None:
+        if len(self._events) >= self.maxsize and not event.is_terminal:
+            self._events.popleft()
+            self.dropped += 1
+            self._bus.dropped_events += 1
+            if self.policy == OverflowPolicy.coalesce:
+                self._skipped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> JobEvent | None:
+        if not self._events and not self._skipped:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._skipped:
+            skipped, self._skipped = self._skipped, 0
+            return JobEvent(job_id=self.job_id, message=f"... {skipped} log lines skipped (slow consumer) ...")
+        return self._events.popleft()
+
+    async def close(self) -> None:
+        self._events.clear()
+        self._bus._unsubscribe(self)
+
+
+class InMemoryEventBus(BaseEventBus):
+    """Process-local fan-out; used in tests and single-worker deployments.
+
+    Buffers exist only while a subscriber is connected and are evicted as soon as the
+    last subscriber of a job disconnects, so finished jobs and streams for unknown job
+    ids leave nothing behind.
+    """
+
+    def __init__(self, buffer_size: int = 1000, overflow_policy: OverflowPolicy | str = OverflowPolicy.coalesce) -> None:
+        self.buffer_size = buffer_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.dropped_events = 0
+        self._subscribers: Dict[str, Set[_MemorySubscription]] = defaultdict(set)
+
+    def publish(self, event: JobEvent) -> None:
+        for subscription in list(self._subscribers.get(event.job_id, ())):
+            subscription.put(event)
+
+    async def subscribe(self, job_id: str) -> Subscription:
+        subscription = _MemorySubscription(self, job_id, self.buffer_size, self.overflow_policy)
+        self._subscribers[job_id].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: _MemorySubscription) -> None:
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [sub.depth for subs in self._subscribers.values() for sub in subs]
+        return {
+            "backend": "memory",
+            "jobs": len(self._subscribers),
+            "subscribers": len(depths),
+            "buffered_events": sum(depths),
+            "max_depth": max(depths, default=0),
+            "buffer_size": self.buffer_size,
+            "overflow_policy": self.overflow_policy.value,
+            "dropped_events": self.dropped_events,
+        }
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, bus: "RedisEventBus", job_id: str, last_id: str) -> None:
+        self._bus = bus
+        self.job_id = job_id
+        self._last_id = last_id
+        self._pending: List[JobEvent] = []
+
+    async def get(self, timeout: float | None = None) -> JobEvent | None:
+        if not self._pending:
+            # BLOCK 0 waits forever; otherwise block for the remaining timeout.
+            block = 0 if timeout is None else max(int(timeout * 1000), 1)
+            response = await self._bus.async_client.xread({self._bus.stream_key(self.job_id): self._last_id}, block=block, count=100)
+            for _stream, entries in response or []:
+                for entry_id, fields in entries:
+                    self._last_id = entry_id
+                    self._pending.append(self._bus.decode(self.job_id, fields))
+        if not self._pending:
+            return None
+        return self._pending.pop(0)
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    async def close(self) -> None:
+        self._pending.clear()
+        self._bus.subscriptions.discard(self)
+
+
+class RedisEventBus(BaseEventBus):
+    """Cross-process bus on top of Redis Streams (``XADD``/``XREAD``).
+
+    :meth:`publish` never blocks the event loop: on a running loop events go to an
+    outbox that a single background task writes with the asyncio client, in order and
+    in pipelined batches. Without a loop (Celery workers) the synchronous client writes
+    them directly. If Redis is slow the outbox holds up to ``outbox_size`` events and
+    then drops new log lines (never the terminal event). Streams are capped with
+    ``MAXLEN ~`` and expire after ``ttl_seconds`` of inactivity; stored job logs remain
+    the source of truth for replay.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        stream_maxlen: int = 1000,
+        ttl_seconds: int = 86400,
+        prefix: str = "manuweaver:jobs",
+        sync_client: Any = None,
+        async_client: Any = None,
+        outbox_size: int = 10000,
+    ) -> None:
+        self.url = url
+        self.stream_maxlen = stream_maxlen
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.outbox_size = max(outbox_size, 1)
+        self.dropped_events = 0
+        self._outbox: Deque[JobEvent] = deque()
+        self._drainer: asyncio.Task | None = None
+        if sync_client is None or async_client is None:
+            import redis
+            import redis.asyncio as aioredis
+
+            sync_client = sync_client or redis.Redis.from_url(url, decode_responses=True)
+            async_client = async_client or aioredis.Redis.from_url(url, decode_responses=True)
+        self.sync_client = sync_client
+        self.async_client = async_client
+        self.subscriptions: Set[_RedisSubscription] = set()
+
+    def stream_key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}:events"
+
+    @staticmethod
+    def decode(job_id: str, fields: Dict[str, str]) -> JobEvent:
+        seq = fields.get("seq")
+        return JobEvent(job_id=job_id, message=fields.get("message", ""), seq=int(seq) if seq else None)
+
+    def _queue(self, pipe: Any, event: JobEvent) -> None:
+        key = self.stream_key(event.job_id)
+        fields = {"message": event.message, "seq": "" if event.seq is None else str(event.seq)}
+        pipe.xadd(key, fields, maxlen=self.stream_maxlen, approximate=True)
+        pipe.expire(key, self.ttl_seconds)
+
+    def publish(self, event: JobEvent) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pipe = self.sync_client.pipeline(transaction=False)
+            self._queue(pipe, event)
+            pipe.execute()
+            return
+        if len(self._outbox) >= self.outbox_size:
+            self.dropped_events += 1
+            if not event.is_terminal:
+                return
+            self._outbox.popleft()
+        self._outbox.append(event)
+        if self._drainer is None or self._drainer.done() or self._drainer.get_loop() is not loop:
+            self._drainer = loop.create_task(self._drain())
+
+    async def _drain(self, batch_size: int = 100) -> None:
+        while self._outbox:
+            batch = [self._outbox.popleft() for _ in range(min(batch_size, len(self._outbox)))]
+            pipe = self.async_client.pipeline(transaction=False)
+            for event in batch:
+                self._queue(pipe, event)
+            try:
+                await pipe.execute()
+            except Exception as exc:
+                self.dropped_events += len(batch)
+                logger.warning("Dropped %d job events: Redis publish failed: %s", len(batch), exc)
+
+    async def flush(self) -> None:
+        """Wait until events published from this loop have been written to Redis."""
+
+        loop = asyncio.get_running_loop()
+        while self._drainer is not None and not self._drainer.done() and self._drainer.get_loop() is loop:
+            await asyncio.shield(self._drainer)
+
+    async def subscribe(self, job_id: str) -> Subscription:
+        await self.flush()
+        # Start from the newest existing entry so nothing published after this call is missed.
+        latest = await self.async_client.xrevrange(self.stream_key(job_id), count=1)
+        last_id = latest[0][0] if latest else "0-0"
+        subscription = _RedisSubscription(self, job_id, last_id)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [sub.depth for sub in self.subscriptions]
+        return {
+            "backend": "redis",
+            "jobs": len({sub.job_id for sub in self.subscriptions}),
+            "subscribers": len(depths),
+            "buffered_events": sum(depths),
+            "max_depth": max(depths, default=0),
+            "stream_maxlen": self.stream_maxlen,
+            "outbox": len(self._outbox),
+            "dropped_events": self.dropped_events,
+        }
+
+    async def close(self) -> None:
+        await self.flush()
+        self.sync_client.close()
+        await self.async_client.aclose()
+
+
+def create_event_bus(settings: Settings | None = None) -> BaseEventBus:
+    """Instantiate the event bus selected by ``EVENT_BUS``."""
+
+    settings = settings or get_settings()
+    if (settings.event_bus or "memory").lower() == "redis":
+        return RedisEventBus(settings.redis_url)
+    return InMemoryEventBus(settings.event_buffer_size, settings.event_overflow_policy)
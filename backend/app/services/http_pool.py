@@ -0,0 +1,95 @@
+"""Application-scoped pool of keep-alive HTTP clients.
+
+Providers and the LLM client borrow one ``httpx.AsyncClient`` per origin instead of
+opening a client (and a fresh TCP/TLS handshake) for every request. Each origin gets
+its own connection limits, so one slow API cannot exhaust the sockets of another,
+and HTTP/2 is negotiated when the optional ``h2`` package is installed.
+
+Clients are bound to the event loop that created them. The API process has a
+single loop; Celery workers run tasks on one loop per worker process (see
+:mod:`backend.app.tasks.celery_app`), so connections are reused across tasks there
+as well.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import Settings, get_settings
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpClientPool:
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        max_keepalive_per_host: int = 5,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.timeout = timeout
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self.created = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "HttpClientPool":
+        settings = settings or get_settings()
+        return cls(
+            max_connections_per_host=settings.http_max_connections_per_host,
+            max_keepalive_per_host=settings.http_max_keepalive_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            http2=settings.http2_enabled,
+        )
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        """Shared client for the origin of ``url``; must be called from a running event loop."""
+
+        origin = _origin(url)
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(origin)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+        # A client created on another (usually already closed) loop cannot be reused here.
+        client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=self.timeout)
+        self._clients[origin] = (loop, client)
+        self.created += 1
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        loop = asyncio.get_running_loop()
+        for owner, client in clients.values():
+            if owner is loop:
+                await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "origins": sorted(self._clients),
+            "clients_created": self.created,
+            "http2": self.http2,
+            "max_connections_per_host": self.limits.max_connections,
+            "max_keepalive_per_host": self.limits.max_keepalive_connections,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_http_pool() -> HttpClientPool:
+    """Return the process-wide HTTP client pool."""
+
+    return HttpClientPool.from_settings()
@@ -2,29 +2,71 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
-from typing import AsyncGenerator, Awaitable, Callable
+from typing import AsyncGenerator, Awaitable, Callable, Iterator
 
-from ..models.core import CompileJob, JobStatus, PipelineStage
-from .storage import JobRepository
+from ..models.core import CompileJob, JobLogEntry, JobStatus, PipelineStage
+from .events import COMPLETE_SENTINEL, BaseEventBus, JobEvent, create_event_bus
+from .storage import BaseJobRepository, create_job_repository
+
+FINISHED_STATUSES = (JobStatus.completed, JobStatus.failed)
 
 
 class JobManager:
-    def __init__(self, repository: JobRepository | None = None) -> None:
-        self.repository = repository or JobRepository()
-        self._queues: dict[str, asyncio.Queue[str]] = defaultdict(asyncio.Queue)
-
-    async def stream(self, job_id: str) -> AsyncGenerator[str, None]:
-        queue = self._queues[job_id]
-        job = self.repository.get(job_id)
-        if job:
-            for line in job.logs:
-                yield line
+    def __init__(self, repository: BaseJobRepository | None = None, bus: BaseEventBus | None = None) -> None:
+        self.repository = repository or create_job_repository()
+        self.bus = bus or create_event_bus()
+
+    async def stream(
+        self,
+        job_id: str,
+        after_seq: int = 0,
+        heartbeat: float | None = None,
+        replay_batch: int = 500,
+    ) -> AsyncGenerator[JobEvent | None, None]:
+        """Yield the job's log events with ``seq > after_seq``, then follow live events.
+
+        Stored history is replayed in batches of ``replay_batch`` lines. When
+        ``heartbeat`` is set, ``None`` is yielded after that many idle seconds so the
+        caller can keep the connection alive. The terminal event carries no ``seq``.
+        """
+
+        # Subscribe before replaying stored logs so no line falls between the two.
+        subscription = await self.bus.subscribe(job_id)
+        try:
+            last_seq = max(after_seq, 0)
+            for entry in self._stored_entries(job_id, last_seq, replay_batch):
+                last_seq = entry.seq
+                yield JobEvent(job_id=job_id, message=entry.message, seq=entry.seq)
+            job = self.repository.get(job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                # Lines written between the replay and the status check are still on disk.
+                for entry in self._stored_entries(job_id, last_seq, replay_batch):
+                    yield JobEvent(job_id=job_id, message=entry.message, seq=entry.seq)
+                yield JobEvent(job_id=job_id, message=COMPLETE_SENTINEL)
+                return
+            while True:
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    if heartbeat is not None:
+                        yield None
+                    continue
+                if event.seq is not None:
+                    if event.seq <= last_seq:
+                        continue
+                    last_seq = event.seq
+                yield event
+                if event.is_terminal:
+                    break
+        finally:
+            await subscription.close()
+
+    def _stored_entries(self, job_id: str, after_seq: int, batch: int) -> Iterator[JobLogEntry]:
         while True:
-            line = await queue.get()
-            yield line
-            if line == "__COMPLETE__":
-                break
+            entries = self.repository.read_logs(job_id, after_seq=after_seq, limit=batch)
+            yield from entries
+            if len(entries) < batch:
+                return
+            after_seq = entries[-1].seq
 
     async def run_task(
         self,
@@ -33,23 +75,52 @@ class JobManager:
         handler: Callable[[CompileJob], Awaitable[dict | None]],
     ) -> CompileJob:
         job = self.repository.create(project_id=project_id, stage=stage)
-        queue = self._queues[job.id]
         self.repository.mark_status(job.id, JobStatus.running)
 
         async def _runner() -> None:
             try:
                 result = await handler(job)
                 self.repository.mark_status(job.id, JobStatus.completed, result=result)
-                queue.put_nowait("__COMPLETE__")
             except Exception as exc:  # pragma: no cover - defensive logging
+                self.emit(job.id, f"ERROR: {exc}")
                 self.repository.mark_status(job.id, JobStatus.failed, error=str(exc))
-                queue.put_nowait(f"ERROR: {exc}")
-                queue.put_nowait("__COMPLETE__")
+            self.complete(job.id)
 
         asyncio.create_task(_runner())
         return job
 
+    async def run_inline(
+        self,
+        project_id: str,
+        stage: PipelineStage,
+        handler: Callable[[CompileJob], Awaitable[dict | None]],
+    ) -> CompileJob:
+        """Like :meth:`run_task`, but await ``handler`` in the caller and re-raise its errors.
+
+        Used by endpoints that answer synchronously yet still publish progress to a job log.
+        """
+
+        job = self.repository.create(project_id=project_id, stage=stage)
+        self.repository.mark_status(job.id, JobStatus.running)
+        try:
+            result = await handler(job)
+        except Exception as exc:
+            self.emit(job.id, f"ERROR: {exc}")
+            self.repository.mark_status(job.id, JobStatus.failed, error=str(exc))
+            raise
+        finally:
+            self.complete(job.id)
+        self.repository.mark_status(job.id, JobStatus.completed, result=result)
+        return job
+
     def emit(self, job_id: str, message: str) -> None:
-        queue = self._queues[job_id]
-        queue.put_nowait(message)
-        self.repository.append_log(job_id, message)
+        seq = self.repository.append_log(job_id, message)
+        self.bus.publish(JobEvent(job_id=job_id, message=message, seq=seq))
+
+    def stats(self) -> dict:
+        return self.bus.stats()
+
+    def complete(self, job_id: str) -> None:
+        """Tell subscribers in every process that no further lines will follow."""
+
+        self.bus.publish(JobEvent(job_id=job_id, message=COMPLETE_SENTINEL))
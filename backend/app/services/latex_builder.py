@@ -1,11 +1,22 @@
 """LaTeX compilation helpers."""
 from __future__ import annotations
 
+import asyncio
+import os
 import shutil
 import subprocess
+import time
 from pathlib import Path
+from typing import List, Sequence
 
-from ..models.core import CompileEngine
+from ..models.core import CompileEngine, CompileOptions
+from .compile_cache import BUILD_DIRNAME, CacheEntry, CompileCache
+from .process_runner import CommandResult, CommandTimeoutError, LineCallback, run_command
+from .templates.formats import PreambleFormat
+
+
+# Files latexmk leaves next to main.tex that an in-place build does not need afterwards.
+INTERMEDIATE_SUFFIXES = (".aux", ".log", ".fls", ".fdb_latexmk", ".out", ".toc", ".bbl", ".blg", ".xdv", ".synctex.gz")
 
 
 class LatexCompilationError(RuntimeError):
@@ -21,28 +32,187 @@ class LatexBuilder:
             return self._compile_with_tectonic(main_tex)
         return self._compile_with_latexmk(main_tex, engine)
 
-    def _compile_with_latexmk(self, main_tex: Path, engine: CompileEngine) -> Path:
-        command = [
+    @staticmethod
+    def build_command(main_tex: Path, engine: CompileEngine) -> List[str]:
+        if engine == CompileEngine.tectonic:
+            return ["tectonic", str(main_tex.name)]
+        return [
             "latexmk",
-            "-pdf" if engine != CompileEngine.tectonic else "-pdf",
+            "-pdf",
             "-interaction=nonstopmode",
             "-halt-on-error",
             str(main_tex.name),
         ]
-        process = subprocess.run(command, cwd=self.workdir, capture_output=True)
-        if process.returncode != 0:
-            raise LatexCompilationError(process.stderr.decode("utf-8"))
+
+    def _pdf_path(self, main_tex: Path) -> Path:
         pdf_path = self.workdir / f"{main_tex.stem}.pdf"
         if not pdf_path.exists():
             raise LatexCompilationError("PDF not generated")
         return pdf_path
 
+    def _compile_with_latexmk(self, main_tex: Path, engine: CompileEngine) -> Path:
+        command = self.build_command(main_tex, engine)
+        process = subprocess.run(command, cwd=self.workdir, capture_output=True)
+        if process.returncode != 0:
+            raise LatexCompilationError(process.stderr.decode("utf-8"))
+        return self._pdf_path(main_tex)
+
     def _compile_with_tectonic(self, main_tex: Path) -> Path:
-        command = ["tectonic", str(main_tex.name)]
+        command = self.build_command(main_tex, CompileEngine.tectonic)
         process = subprocess.run(command, cwd=self.workdir, capture_output=True)
         if process.returncode != 0:
             raise LatexCompilationError(process.stderr.decode("utf-8"))
-        pdf_path = self.workdir / f"{main_tex.stem}.pdf"
-        if not pdf_path.exists():
-            raise LatexCompilationError("PDF not generated")
+        return self._pdf_path(main_tex)
+
+
+class AsyncLatexBuilder(LatexBuilder):
+    """Non-blocking builder that runs latexmk/tectonic as an asyncio subprocess.
+
+    Compiler output is forwarded line by line to ``on_output`` (typically
+    ``JobManager.emit``). Timeouts and task cancellation kill the compiler. With a
+    :class:`CompileCache`, builds whose inputs are unchanged reuse the stored PDF.
+
+    With ``incremental=True`` intermediate files (``.aux``, ``.bbl``, ``.fls``,
+    ``.fdb_latexmk``) live in a persistent ``build/`` directory, so latexmk only reruns
+    the passes a small edit actually needs. A :class:`PreambleFormat` passed to
+    :meth:`compile_async` replaces the template preamble with a precompiled format.
+    In-place builds remove those files after a successful run unless
+    ``CompileOptions.clean_intermediate`` is off.
+    """
+
+    def __init__(
+        self,
+        workdir: Path,
+        timeout: float | None = None,
+        cache: CompileCache | None = None,
+        incremental: bool = False,
+    ) -> None:
+        super().__init__(workdir)
+        self.timeout = timeout
+        self.cache = cache
+        self.incremental = incremental
+        self.build_dir = workdir / BUILD_DIRNAME
+
+    def incremental_command(self, source: Path, engine: CompileEngine, jobname: str, fmt: PreambleFormat | None = None) -> List[str]:
+        source_arg = os.path.relpath(source, self.workdir)
+        if engine == CompileEngine.tectonic:
+            return ["tectonic", "--keep-intermediates", "--keep-logs", "--outdir", BUILD_DIRNAME, source_arg]
+        command = [
+            "latexmk",
+            "-pdf",
+            "-interaction=nonstopmode",
+            "-halt-on-error",
+            f"-outdir={BUILD_DIRNAME}",
+            f"-jobname={jobname}",
+        ]
+        if fmt is not None:
+            command.append(f"-pdflatex=pdflatex -fmt={fmt.fmt_path.with_suffix('')} %O %S")
+        command.append(source_arg)
+        return command
+
+    def _plan(self, main_tex: Path, engine: CompileEngine, fmt: PreambleFormat | None) -> tuple[List[str], Path | None]:
+        """Command to run and, for incremental builds, the PDF it leaves in ``build/``."""
+
+        if not self.incremental:
+            return self.build_command(main_tex, engine), None
+        self.build_dir.mkdir(exist_ok=True)
+        source = main_tex
+        if fmt is not None:
+            # The format already holds the preamble; typeset only what follows it.
+            source = self.build_dir / f"{main_tex.stem}.body.tex"
+            body = fmt.body(main_tex.read_text(encoding="utf-8"))
+            if not source.exists() or source.read_text(encoding="utf-8") != body:
+                source.write_text(body, encoding="utf-8")
+        return self.incremental_command(source, engine, main_tex.stem, fmt), self.build_dir / f"{main_tex.stem}.pdf"
+
+    def _usable_format(self, main_tex: Path, engine: CompileEngine, fmt: PreambleFormat | None) -> PreambleFormat | None:
+        if fmt is None or not self.incremental or engine != CompileEngine.latexmk:
+            return None
+        if not fmt.fmt_path.exists() or not fmt.matches(main_tex.read_text(encoding="utf-8")):
+            return None
+        return fmt
+
+    async def probe_cache(
+        self,
+        main_tex: Path,
+        engine: CompileEngine,
+        options: CompileOptions | None = None,
+        extra_dirs: Sequence[Path] = (),
+        main_text: str | None = None,
+    ) -> CacheEntry | None:
+        """Check for a cached build without recording a hit or miss.
+
+        ``main_text`` is the content ``main_tex`` will have, so a request can probe
+        before it is allowed to write into the project directory.
+        """
+
+        if self.cache is None:
+            return None
+        key = await asyncio.to_thread(self.cache.key_for, self.workdir, main_tex, engine, options, extra_dirs, main_text)
+        return self.cache.peek(key)
+
+    async def compile_async(
+        self,
+        main_tex: Path,
+        engine: CompileEngine,
+        on_output: LineCallback | None = None,
+        options: CompileOptions | None = None,
+        extra_dirs: Sequence[Path] = (),
+        preamble_format: PreambleFormat | None = None,
+    ) -> Path:
+        emit = on_output or (lambda line: None)
+        key = None
+        if self.cache is not None:
+            key = await asyncio.to_thread(self.cache.key_for, self.workdir, main_tex, engine, options, extra_dirs)
+            entry = self.cache.lookup(key)
+            if entry is not None:
+                emit(f"Build inputs unchanged; reusing cached PDF ({key[:12]})")
+                return await asyncio.to_thread(self.cache.restore, entry, self.workdir / f"{main_tex.stem}.pdf")
+
+        lines: List[str] = []
+
+        def _capture(line: str) -> None:
+            lines.append(line)
+            emit(line)
+
+        fmt = self._usable_format(main_tex, engine, preamble_format)
+        started = time.perf_counter()
+        result = await self._run(main_tex, engine, fmt, _capture)
+        if result.returncode != 0 and fmt is not None and "format file" in result.tail().lower():
+            # A format dumped by a different TeX build cannot be loaded; fall back to the full preamble.
+            emit(f"Preamble format {fmt.template_id} is unusable; rebuilding with the full preamble")
+            fmt = None
+            result = await self._run(main_tex, engine, None, _capture)
+        if result.returncode != 0:
+            raise LatexCompilationError(result.tail())
+        mode = "incremental" if self.incremental else "in place"
+        if fmt is not None:
+            mode += f", preamble format {fmt.template_id}"
+        emit(f"Build finished in {time.perf_counter() - started:.2f}s ({mode})")
+        pdf_path = self._pdf_path(main_tex)
+        if not self.incremental and (options or CompileOptions(engine=engine)).clean_intermediate:
+            # Incremental builds keep theirs in build/ on purpose; that is what makes them fast.
+            self._clean_intermediates(main_tex)
+        if self.cache is not None and key is not None:
+            await asyncio.to_thread(self.cache.store, key, pdf_path, lines)
         return pdf_path
+
+    def _clean_intermediates(self, main_tex: Path) -> None:
+        for suffix in INTERMEDIATE_SUFFIXES:
+            (self.workdir / f"{main_tex.stem}{suffix}").unlink(missing_ok=True)
+
+    async def _run(self, main_tex: Path, engine: CompileEngine, fmt: PreambleFormat | None, on_line: LineCallback) -> CommandResult:
+        command, built_pdf = self._plan(main_tex, engine, fmt)
+        try:
+            result = await run_command(command, cwd=self.workdir, timeout=self.timeout, on_line=on_line)
+        except CommandTimeoutError as exc:
+            raise LatexCompilationError(f"{exc}\n{exc.output}".strip()) from exc
+        except FileNotFoundError as exc:
+            raise LatexCompilationError(f"{command[0]} is not installed") from exc
+        if result.returncode == 0 and built_pdf is not None and built_pdf.exists():
+            # Publish the PDF next to main.tex, where artifacts and the compile cache expect it.
+            target = self.workdir / built_pdf.name
+            tmp = target.with_suffix(".pdf.tmp")
+            shutil.copyfile(built_pdf, tmp)
+            os.replace(tmp, target)
+        return result
@@ -1,4 +1,19 @@
 """LLM abstraction layer."""
+from .cache import LLMResponseCache, get_llm_cache
 from .client import LLMClient
+from .limiter import LLMQueueFullError, LimiterRegistry, get_llm_limiters
+from .singleflight import SingleFlight, get_llm_flights
+from .streaming import IncrementalJSONParser, StreamingJSONError
 
-__all__ = ["LLMClient"]
+__all__ = [
+    "IncrementalJSONParser",
+    "LLMClient",
+    "LLMQueueFullError",
+    "LLMResponseCache",
+    "LimiterRegistry",
+    "SingleFlight",
+    "StreamingJSONError",
+    "get_llm_cache",
+    "get_llm_flights",
+    "get_llm_limiters",
+]
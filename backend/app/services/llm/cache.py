@@ -0,0 +1,121 @@
+"""On-disk cache of raw LLM responses.
+
+Entries are keyed by provider, model, prompt version and a hash of the full prompt,
+so a reformat of an unchanged manuscript is answered without inference. Entries
+expire after ``ttl_seconds``; once the cache grows past ``max_bytes`` the least
+recently used entries (by file mtime) are removed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+from ...config import Settings, get_settings, project_storage_root
+
+
+class LLMResponseCache:
+    def __init__(self, root: Path, ttl_seconds: float | None = None, max_bytes: int = 256 << 20) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "LLMResponseCache":
+        settings = settings or get_settings()
+        root = Path(settings.llm_cache_dir) if settings.llm_cache_dir else project_storage_root(settings) / "llm-cache"
+        ttl = settings.llm_cache_ttl_seconds if settings.llm_cache_ttl_seconds > 0 else None
+        return cls(root, ttl_seconds=ttl, max_bytes=settings.llm_cache_max_bytes)
+
+    @staticmethod
+    def key_for(provider: str, model: str, prompt_version: str | None, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        identity = "\0".join([provider.lower(), model, prompt_version or "unversioned", prompt_hash])
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if self.ttl_seconds is not None and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            self.expired += 1
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used
+        self.hits += 1
+        return entry.get("response")
+
+    def put(self, key: str, response: str, **metadata: Any) -> None:
+        path = self._path(key)
+        data = json.dumps({"created_at": time.time(), "response": response, **metadata}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            if self._size is not None:
+                self._size += len(data) - previous
+            if self.size_bytes() > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if self._size is not None:
+            self._size -= size
+
+    def size_bytes(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+        return self._size
+
+    def _evict(self) -> None:
+        entries = sorted((p.stat().st_mtime, p) for p in self.root.glob("*/*.json"))
+        for _, path in entries:
+            if self.size_bytes() <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMResponseCache | None:
+    """Return the process-wide response cache, or ``None`` when ``LLM_CACHE_ENABLED`` is off."""
+
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMResponseCache.from_settings(settings)
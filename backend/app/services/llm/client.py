@@ -3,34 +3,183 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
-
+import logging
 import re
-from typing import Any, Dict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List
 
 import httpx
 
 from ...config import Settings, get_settings
+from ..http_pool import HttpClientPool, get_http_pool
+from .cache import LLMResponseCache, get_llm_cache
+from .limiter import ConcurrencyLimiter, LimiterRegistry, get_llm_limiters
+from .singleflight import SingleFlight, get_llm_flights
+from .streaming import IncrementalJSONParser, ItemCallback, StreamingJSONError, replay_items
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 60.0
 
 
 class LLMClient:
     """LLM client supporting stub, Ollama, and LM Studio backends."""
 
-    def __init__(self, settings: Settings | None = None) -> None:
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        pool: HttpClientPool | None = None,
+        limiters: LimiterRegistry | None = None,
+        cache: LLMResponseCache | None = None,
+        flights: SingleFlight | None = None,
+    ) -> None:
         self.settings = settings or get_settings()
+        self.pool = pool
+        self.limiters = limiters
+        self.cache = cache if cache is not None else (get_llm_cache() if self.settings.llm_cache_enabled else None)
+        self.flights = flights
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        return (self.pool or get_http_pool()).client(url)
+
+    def _model(self, provider: str) -> str:
+        return self.settings.ollama_model if provider == "ollama" else self.settings.lmstudio_model
+
+    def _limiter(self, provider: str) -> ConcurrencyLimiter:
+        return (self.limiters or get_llm_limiters()).get(provider, self._model(provider))
+
+    async def complete_json(
+        self,
+        prompt: str,
+        prompt_version: str | None = None,
+        use_cache: bool = True,
+        on_item: ItemCallback | None = None,
+    ) -> Any:
+        """Run ``prompt`` and parse the JSON in the reply.
+
+        Raw replies that parse are cached per provider, model, ``prompt_version`` and prompt hash;
+        ``use_cache=False`` forces fresh inference (the new reply still refreshes the cache).
+        Concurrent calls with the same key share a single provider request.
+
+        With ``on_item`` the reply is streamed (unless ``LLM_STREAMING`` is off) and every
+        completed array element is reported as ``on_item(key, element)`` while the model
+        is still generating. If the stream cannot be parsed incrementally, the complete
+        reply is parsed as usual and its remaining elements are reported at the end.
+        """
 
-    async def complete_json(self, prompt: str) -> Dict[str, Any] | None:
         provider = (self.settings.llm_provider or "stub").lower()
-        async with self._lock:
-            if provider == "ollama":
+        if provider not in ("ollama", "lmstudio"):
+            result = self._parse_stub(prompt)
+            if on_item is not None and result is not None:
+                replay_items(result, on_item)
+            return result
+        model = self._model(provider)
+        key = LLMResponseCache.key_for(provider, model, prompt_version, prompt)
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(key)
+            parsed = self._parse_json_output(cached) if cached is not None else None
+            if parsed is not None:
+                if on_item is not None:
+                    replay_items(parsed, on_item)
+                return parsed
+        streamed = False
+
+        def _lead():
+            # Only the caller that starts the shared request sees its elements live.
+            nonlocal streamed
+            streamed = on_item is not None and self.settings.llm_streaming
+            return self._infer(provider, prompt, key, prompt_version, on_item if streamed else None)
+
+        text = await (self.flights or get_llm_flights()).run(key, _lead)
+        parsed = self._parse_json_output(text)
+        if on_item is not None and not streamed and parsed is not None:
+            replay_items(parsed, on_item)
+        return parsed
+
+    async def _infer(
+        self,
+        provider: str,
+        prompt: str,
+        key: str,
+        prompt_version: str | None,
+        on_item: ItemCallback | None = None,
+    ) -> str:
+        async with self._limiter(provider).slot():
+            if on_item is not None:
+                text = await self._stream(provider, prompt, on_item)
+            elif provider == "ollama":
                 text = await self._call_ollama(prompt)
-                return self._parse_json_output(text)
-            if provider == "lmstudio":
+            else:
                 text = await self._call_lmstudio(prompt)
-                return self._parse_json_output(text)
-            return self._parse_stub(prompt)
+        # Only replies that parse are worth replaying; a malformed one would be served for the whole TTL.
+        if self.cache is not None and self._parse_json_output(text) is not None:
+            self.cache.put(key, text, provider=provider, model=self._model(provider), prompt_version=prompt_version)
+        return text
+
+    async def _stream(self, provider: str, prompt: str, on_item: ItemCallback) -> str:
+        parser: IncrementalJSONParser | None = IncrementalJSONParser()
+        parts: List[str] = []
+        reported = 0
+        fragments = self._stream_ollama(prompt) if provider == "ollama" else self._stream_lmstudio(prompt)
+        async with aclosing(fragments):
+            async for fragment in fragments:
+                parts.append(fragment)
+                if parser is None:
+                    continue
+                try:
+                    for element_key, element in parser.feed(fragment):
+                        reported += 1
+                        on_item(element_key, element)
+                except StreamingJSONError as exc:
+                    # Keep reading: the complete reply may still parse (e.g. prose around a fence).
+                    logger.info("Streaming parse of %s reply stopped: %s", provider, exc)
+                    parser = None
+        text = "".join(parts)
+        if parser is None:
+            parsed = self._parse_json_output(text)
+            if parsed is not None:
+                replay_items(parsed, on_item, skip=reported)
+        return text
+
+    async def _stream_ollama(self, prompt: str) -> AsyncIterator[str]:
+        url = f"{self.settings.ollama_base_url.rstrip('/')}/api/generate"
+        payload = {
+            "model": self.settings.ollama_model,
+            "prompt": prompt,
+            "stream": True,
+        }
+        async with self._client(url).stream("POST", url, json=payload, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    async def _stream_lmstudio(self, prompt: str) -> AsyncIterator[str]:
+        url = f"{self.settings.lmstudio_base_url.rstrip('/')}/chat/completions"
+        payload = {
+            "model": self.settings.lmstudio_model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+            "stream": True,
+        }
+        async with self._client(url).stream("POST", url, json=payload, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
 
     async def _call_ollama(self, prompt: str) -> str:
         url = f"{self.settings.ollama_base_url.rstrip('/')}/api/generate"
@@ -39,10 +188,9 @@ class LLMClient:
             "prompt": prompt,
             "stream": False,
         }
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        response = await self._client(url).post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
         return data.get("response", "")
 
     async def _call_lmstudio(self, prompt: str) -> str:
@@ -52,10 +200,9 @@ class LLMClient:
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0,
         }
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        response = await self._client(url).post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
         choices = data.get("choices", [])
         if not choices:
             return ""
@@ -0,0 +1,134 @@
+"""Concurrency limits for LLM backends, keyed by provider and model.
+
+Each ``(provider, model)`` pair admits ``max_concurrency`` requests at once; further
+callers wait in FIFO order. When ``max_waiting`` callers are already queued, new
+ones are rejected with :class:`LLMQueueFullError` instead of piling up.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, Tuple
+
+from ...config import Settings, get_settings
+
+
+class LLMQueueFullError(RuntimeError):
+    pass
+
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrency: int, max_waiting: int) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_waiting = max(max_waiting, 0)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the seconds spent queued."""
+
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return 0.0
+        if len(self._waiters) >= self.max_waiting:
+            self.rejected += 1
+            raise LLMQueueFullError(f"{len(self._waiters)} LLM requests already waiting")
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; pass it on.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; ``active`` stays unchanged.
+                waiter.set_result(None)
+                return
+        self.active = max(self.active - 1, 0)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        waited = await self.acquire()
+        try:
+            yield waited
+        finally:
+            self.completed += 1
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": self.total_wait_seconds / self.completed if self.completed else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+def parse_overrides(spec: str | None) -> Dict[str, int]:
+    """Parse ``"ollama:llama3=2,lmstudio=1"`` into ``{"ollama:llama3": 2, "lmstudio": 1}``."""
+
+    overrides: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            overrides[name.strip().lower()] = int(value)
+    return overrides
+
+
+class LimiterRegistry:
+    def __init__(self, max_concurrency: int = 4, max_waiting: int = 64, overrides: Dict[str, int] | None = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.overrides = overrides or {}
+        self._limiters: Dict[Tuple[str, str], ConcurrencyLimiter] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "LimiterRegistry":
+        settings = settings or get_settings()
+        return cls(settings.llm_max_concurrency, settings.llm_max_waiting, parse_overrides(settings.llm_concurrency_overrides))
+
+    def get(self, provider: str, model: str) -> ConcurrencyLimiter:
+        key = (provider.lower(), model.lower())
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limit = self.overrides.get(f"{key[0]}:{key[1]}", self.overrides.get(key[0], self.max_concurrency))
+            limiter = self._limiters[key] = ConcurrencyLimiter(limit, self.max_waiting)
+        return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        return {f"{provider}:{model}": limiter.stats() for (provider, model), limiter in self._limiters.items()}
+
+
+@lru_cache(maxsize=1)
+def get_llm_limiters() -> LimiterRegistry:
+    """Return the process-wide limiter registry shared by every :class:`LLMClient`."""
+
+    return LimiterRegistry.from_settings()
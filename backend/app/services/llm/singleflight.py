@@ -0,0 +1,70 @@
+"""Coalescing of identical in-flight LLM requests.
+
+Concurrent callers with the same key share one provider call and all receive its
+result or exception. The call runs in its own task: a caller that is cancelled only
+stops waiting, and the shared call is cancelled once no caller is waiting for it.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        call = self._calls.get(key)
+        if call is None or call.task.done() or call.task.get_loop() is not loop:
+            call = _Call(task=loop.create_task(factory()))
+            call.task.add_done_callback(lambda task, key=key, call=call: self._forget(key, call))
+            self._calls[key] = call
+            self.started += 1
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Forget the call now: until the task finishes unwinding, a new caller
+                # would otherwise join it and inherit a cancellation it never asked for.
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.task.done() and not call.task.cancelled():
+            call.task.exception()  # retrieved here so an abandoned failure is not logged as unhandled
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_flights() -> SingleFlight:
+    """Return the process-wide in-flight request table shared by every :class:`LLMClient`."""
+
+    return SingleFlight()
@@ -0,0 +1,181 @@
+"""Incremental JSON parsing of streamed LLM output.
+
+:class:`IncrementalJSONParser` is fed text fragments as they arrive and reports every
+completed element of the top-level array, or of an array stored directly under a
+key of the top-level object (``{"sections": [...]}``), as soon as its closing
+bracket is seen. Prose before the JSON is skipped, and an opening Markdown fence
+restarts parsing inside the fenced block, so brackets in a preamble ("Sure [see
+below]:") do not hide the real reply. Structural errors raise
+:class:`StreamingJSONError`; the caller then stops streaming and parses the complete
+reply instead.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Iterator, List, Tuple
+
+ItemCallback = Callable[[str | None, Any], None]
+
+_CLOSERS = {"}": "{", "]": "["}
+
+
+class StreamingJSONError(ValueError):
+    pass
+
+
+class IncrementalJSONParser:
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.finished = False
+        self._root_key: str | None = None
+        self._key_start: int | None = None
+        self._expect_key = False
+        self._element_start: int | None = None
+        self._element_depth = 0
+        self._element_key: str | None = None
+        self._fenced = False
+
+    def _reset(self) -> None:
+        """Forget everything parsed so far; used when a fenced block starts."""
+
+        self._stack = []
+        self._in_string = self._escape = self._started = self.finished = False
+        self._root_key = self._key_start = self._element_start = self._element_key = None
+        self._expect_key = False
+        self._element_depth = 0
+
+    def feed(self, fragment: str) -> List[Tuple[str | None, Any]]:
+        """Consume ``fragment`` and return the ``(key, element)`` pairs it completed."""
+
+        if self.finished and self._fenced:
+            return []
+        self._text += fragment
+        items: List[Tuple[str | None, Any]] = []
+        text = self._text
+        while self._pos < len(text):
+            char = text[self._pos]
+            if char == "`" and not self._in_string:
+                if len(text) - self._pos < 3:
+                    break  # wait for the rest of a possible fence
+                if text.startswith("```", self._pos):
+                    if self._fenced:
+                        if not self.finished:
+                            raise StreamingJSONError(f"fence closed before the JSON ended at offset {self._pos}")
+                        break
+                    newline = text.find("\n", self._pos)
+                    if newline < 0:
+                        break  # the info string ("json") is still arriving
+                    self._reset()
+                    self._fenced = True
+                    self._pos = newline + 1
+                    continue
+            if self.finished:
+                # Unfenced JSON already ended; only a later fence can restart parsing.
+                self._pos += 1
+                continue
+            if not self._started:
+                if char in "{[":
+                    self._started = True
+                    self._open(char)
+                self._pos += 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_key()
+                self._pos += 1
+                continue
+            if char == '"':
+                self._in_string = True
+                if self._expect_key and len(self._stack) == 1:
+                    self._key_start = self._pos + 1
+                self._maybe_start_element()
+            elif char in "{[":
+                self._maybe_start_element()
+                self._open(char)
+            elif char in "}]":
+                if not self._stack or self._stack[-1] != _CLOSERS[char]:
+                    raise StreamingJSONError(f"unexpected {char!r} at offset {self._pos}")
+                if self._element_start is not None and len(self._stack) == self._element_depth:
+                    # A scalar element ends where its array does.
+                    items.append(self._finish_element(self._pos))
+                self._stack.pop()
+                if self._element_start is not None and len(self._stack) == self._element_depth:
+                    items.append(self._finish_element(self._pos + 1))
+                if not self._stack:
+                    self.finished = True
+            elif char == "," and len(self._stack) == 1 and self._stack[0] == "{":
+                self._expect_key = True
+                self._root_key = None
+            elif char == ",":
+                if self._element_start is not None and len(self._stack) == self._element_depth:
+                    items.append(self._finish_element(self._pos))
+            elif not char.isspace():
+                self._maybe_start_element()
+            self._pos += 1
+        return items
+
+    def _open(self, char: str) -> None:
+        self._stack.append(char)
+        if len(self._stack) == 1 and char == "{":
+            self._expect_key = True
+
+    def _close_key(self) -> None:
+        if self._key_start is not None:
+            self._root_key = self._text[self._key_start : self._pos]
+            self._key_start = None
+            self._expect_key = False
+
+    def _collecting(self) -> bool:
+        """Whether the current container is an array whose elements are reported."""
+
+        if not self._stack or self._stack[-1] != "[":
+            return False
+        return len(self._stack) == 1 or (len(self._stack) == 2 and self._stack[0] == "{")
+
+    def _maybe_start_element(self) -> None:
+        if self._element_start is None and self._collecting() and self._key_start is None:
+            self._element_start = self._pos
+            self._element_depth = len(self._stack)
+            self._element_key = self._root_key if len(self._stack) == 2 else None
+
+    def _finish_element(self, end: int) -> Tuple[str | None, Any]:
+        raw = self._text[self._element_start : end].strip()
+        self._element_start = None
+        try:
+            return self._element_key, json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise StreamingJSONError(f"malformed element: {exc}") from exc
+
+
+def iter_items(value: Any) -> Iterator[Tuple[str | None, Any]]:
+    """Yield the ``(key, element)`` pairs the parser would report for a parsed reply."""
+
+    if isinstance(value, list):
+        for item in value:
+            yield None, item
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if isinstance(child, list):
+                for item in child:
+                    yield key, item
+
+
+def replay_items(value: Any, on_item: ItemCallback, skip: int = 0) -> None:
+    """Report the elements of an already parsed reply, e.g. one served from the cache.
+
+    ``skip`` leaves out the first elements, which a failed stream already reported.
+    """
+
+    for index, (key, item) in enumerate(iter_items(value)):
+        if index >= skip:
+            on_item(key, item)
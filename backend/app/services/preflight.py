@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Iterable, List
 
 from ..models.core import PreflightIssue, PreflightReport, Project
+from .sentence_index import get_sentence_index
 
 
 class PreflightGenerator:
@@ -29,8 +30,24 @@ class PreflightGenerator:
                     context={},
                 )
             )
+        index = get_sentence_index(project.manuscript.content)
+        stale = [
+            slot.sentence
+            for slot in project.citation_slots
+            if slot.need_citation and slot.status == "confirmed" and not index.find(slot.sentence)
+        ]
+        if stale:
+            issues.append(
+                PreflightIssue(
+                    code="stale_citation_slots",
+                    severity="warning",
+                    message=f"{len(stale)} confirmed citation(s) refer to sentences no longer in the manuscript",
+                    context={"sentences": stale[:10]},
+                )
+            )
         summary = {
             "sections": len(project.normalized_json.get("sections", [])) if project.normalized_json else 0,
+            "sentences": len(index),
             "references": len(project.references),
         }
         return PreflightReport(
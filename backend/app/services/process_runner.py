@@ -0,0 +1,105 @@
+"""Asyncio subprocess execution with timeouts, cancellation and line streaming."""
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Sequence
+
+LineCallback = Callable[[str], None]
+
+
+class CommandTimeoutError(RuntimeError):
+    def __init__(self, command: Sequence[str], timeout: float, output: str) -> None:
+        super().__init__(f"{command[0]} timed out after {timeout:g}s")
+        self.command = list(command)
+        self.timeout = timeout
+        self.output = output
+
+
+@dataclass
+class CommandResult:
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    lines: List[str] = field(default_factory=list)
+
+    def tail(self, count: int = 40) -> str:
+        """Last ``count`` output lines, for error messages."""
+
+        if self.lines:
+            return "\n".join(self.lines[-count:])
+        return (self.stderr or self.stdout).decode("utf-8", errors="replace")
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    try:
+        # The command runs in its own session, so this also stops children such as pdflatex.
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def run_command(
+    command: Sequence[str],
+    cwd: Path | None = None,
+    input: bytes | None = None,
+    timeout: float | None = None,
+    on_line: LineCallback | None = None,
+) -> CommandResult:
+    """Run ``command`` without blocking the event loop.
+
+    With ``on_line`` set, stderr is merged into stdout and every decoded output line
+    is passed to the callback as soon as it is produced; otherwise stdout and stderr
+    are captured separately. On timeout or cancellation the process group is killed
+    before the exception propagates.
+    """
+
+    streaming = on_line is not None
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=str(cwd) if cwd else None,
+        stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT if streaming else asyncio.subprocess.PIPE,
+        start_new_session=True,
+        limit=1 << 20,
+    )
+    lines: List[str] = []
+    chunks: List[bytes] = []
+
+    async def _communicate() -> tuple[bytes, bytes]:
+        if not streaming:
+            stdout, stderr = await process.communicate(input)
+            return stdout or b"", stderr or b""
+        if input is not None and process.stdin is not None:
+            process.stdin.write(input)
+            await process.stdin.drain()
+            process.stdin.close()
+        assert process.stdout is not None
+        async for raw in process.stdout:
+            chunks.append(raw)
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            lines.append(line)
+            on_line(line)
+        await process.wait()
+        return b"".join(chunks), b""
+
+    try:
+        stdout, stderr = await asyncio.wait_for(_communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill(process)
+        await process.wait()
+        raise CommandTimeoutError(command, timeout or 0, "\n".join(lines[-40:])) from None
+    except BaseException:
+        _kill(process)
+        await process.wait()
+        raise
+    return CommandResult(returncode=process.returncode or 0, stdout=stdout, stderr=stderr, lines=lines)
@@ -0,0 +1,160 @@
+"""Persistent cache of reference provider responses.
+
+Two tables in an embedded SQLite database (``REFERENCE_CACHE_PATH``):
+
+* ``provider_queries`` – the records each provider returned for a normalized query,
+  served again until ``REFERENCE_CACHE_TTL_SECONDS`` have passed.
+* ``doi_metadata`` – one merged metadata record per DOI, fed by every provider.
+  Cached and fresh records are completed from it (authors, year, venue, url), so a
+  DOI resolved once by any provider is known to all of them.
+
+With ``REFERENCE_OFFLINE`` the retriever answers from this cache only, including
+entries older than the TTL (counted as stale hits).
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ...config import get_settings, project_storage_root
+from ..storage.sqlite import SQLiteDatabase, open_database
+from .dedup import normalize_doi
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_queries (
+    provider TEXT NOT NULL,
+    query TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    records TEXT NOT NULL,
+    PRIMARY KEY (provider, query)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS doi_metadata (
+    doi TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT_QUERY = """
+INSERT INTO provider_queries (provider, query, created_at, records) VALUES (?, ?, ?, ?)
+ON CONFLICT(provider, query) DO UPDATE SET created_at = excluded.created_at, records = excluded.records
+"""
+
+UPSERT_DOI = """
+INSERT INTO doi_metadata (doi, updated_at, data) VALUES (?, ?, ?)
+ON CONFLICT(doi) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data
+"""
+
+METADATA_FIELDS = ("title", "authors", "year", "venue", "url", "doi")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ReferenceCache:
+    def __init__(self, path: Path, ttl_seconds: float = 7 * 24 * 3600) -> None:
+        self.db: SQLiteDatabase = open_database(path, SCHEMA)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.offline_misses = 0
+        self.stale_hits = 0
+        self.doi_hits = 0
+
+    def get_query(self, provider: str, query: str, allow_stale: bool = False) -> List[Dict[str, Any]] | None:
+        """Cached records for ``provider`` and ``query`` (completed from the DOI store), if fresh.
+
+        With ``allow_stale`` an expired entry is still returned, for offline mode.
+        """
+
+        key = normalize_query(query)
+        row = self.db.fetchone(
+            "SELECT created_at, records FROM provider_queries WHERE provider = ? AND query = ?", (provider, key)
+        )
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds and time.time() - row[0] > self.ttl_seconds:
+                if not allow_stale:
+                    self.expired += 1
+                    self.misses += 1
+                    return None
+                self.stale_hits += 1
+            self.hits += 1
+        return self.enrich(json.loads(row[1]))
+
+    def put_query(self, provider: str, query: str, records: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(UPSERT_QUERY, (provider, normalize_query(query), now, json.dumps(records)))
+            for record in records:
+                doi = normalize_doi(record.get("doi"))
+                if not doi:
+                    continue
+                row = conn.execute("SELECT data FROM doi_metadata WHERE doi = ?", (doi,)).fetchone()
+                merged = json.loads(row[0]) if row else {}
+                for field in METADATA_FIELDS:
+                    if record.get(field) and not merged.get(field):
+                        merged[field] = record[field]
+                sources = set(merged.get("sources", [])) | ({record["source"]} if record.get("source") else set())
+                merged["sources"] = sorted(sources)
+                conn.execute(UPSERT_DOI, (doi, now, json.dumps(merged)))
+
+    def get_doi(self, doi: str) -> Dict[str, Any] | None:
+        key = normalize_doi(doi)
+        row = self.db.fetchone("SELECT data FROM doi_metadata WHERE doi = ?", (key,)) if key else None
+        return json.loads(row[0]) if row else None
+
+    def enrich(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill fields missing from ``records`` with what the DOI store knows."""
+
+        enriched = []
+        for record in records:
+            metadata = self.get_doi(record["doi"]) if record.get("doi") else None
+            if metadata:
+                missing = {field: metadata[field] for field in METADATA_FIELDS if metadata.get(field) and not record.get(field)}
+                if missing:
+                    with self._lock:
+                        self.doi_hits += 1
+                    record = {**record, **missing}
+            enriched.append(record)
+        return enriched
+
+    def record_offline_miss(self) -> None:
+        with self._lock:
+            self.offline_misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        queries = self.db.fetchone("SELECT COUNT(*) FROM provider_queries")
+        dois = self.db.fetchone("SELECT COUNT(*) FROM doi_metadata")
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "offline_misses": self.offline_misses,
+            "stale_hits": self.stale_hits,
+            "doi_enrichments": self.doi_hits,
+            "queries": queries[0] if queries else 0,
+            "dois": dois[0] if dois else 0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_reference_cache() -> ReferenceCache | None:
+    """Return the process-wide provider cache, or ``None`` when it is disabled."""
+
+    settings = get_settings()
+    if not settings.reference_cache_enabled:
+        return None
+    path = Path(settings.reference_cache_path) if settings.reference_cache_path else project_storage_root(settings) / "reference-cache.db"
+    return ReferenceCache(path, ttl_seconds=settings.reference_cache_ttl_seconds)
@@ -0,0 +1,162 @@
+"""Incremental duplicate detection for provider records.
+
+:class:`ReferenceIndex` keeps an exact index of normalized DOIs and buckets titles
+by blocking keys (their longest distinctive tokens), so an incoming record is only
+compared with references that share a bucket. Each bucket is scored in one batched
+rapidfuzz call: ``process.cdist`` when numpy is available, ``process.extract``
+otherwise. Buckets that grow past ``max_block_size`` stop being used as keys
+because a token that common no longer discriminates.
+"""
+from __future__ import annotations
+
+import importlib.util
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List
+
+from rapidfuzz import fuzz, process
+
+from ...models.core import Reference
+
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+_STOPWORDS = frozenset(
+    {"about", "after", "among", "between", "from", "into", "over", "through", "towards", "under", "using", "with", "without"}
+)
+_BLOCK_TOKENS = 3
+
+RecordConverter = Callable[[dict], Reference]
+
+
+def normalize_title(title: str) -> str:
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def normalize_doi(doi: str | None) -> str | None:
+    if not doi:
+        return None
+    doi = re.sub(r"^(?:https?://(?:dx\.)?doi\.org/|doi:)", "", doi.strip().lower())
+    return doi or None
+
+
+def blocking_keys(normalized: str) -> List[str]:
+    """The longest distinctive tokens of a normalized title (or the title itself if it has none)."""
+
+    distinctive = {token for token in normalized.split() if len(token) >= 4 and token not in _STOPWORDS}
+    tokens = sorted(distinctive, key=lambda token: (-len(token), token))
+    return tokens[:_BLOCK_TOKENS] or ([normalized] if normalized else [])
+
+
+def merge_record(existing: Reference, record: dict) -> None:
+    scores = [s for s in (existing.score, record.get("score")) if s is not None]
+    if scores:
+        existing.score = max(scores)
+    existing.source = ",".join(sorted(set(filter(None, [*(existing.source or "").split(","), record.get("source")]))))
+    if record.get("doi") and not existing.doi:
+        existing.doi = record.get("doi")
+    if record.get("url") and not existing.url:
+        existing.url = record.get("url")
+
+
+class ReferenceIndex:
+    def __init__(self, to_reference: RecordConverter, threshold: float = 85.0, max_block_size: int = 2000) -> None:
+        self.to_reference = to_reference
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.references: List[Reference] = []
+        self._titles: List[str] = []
+        self._dois: Dict[str, int] = {}
+        self._blocks: Dict[str, List[int]] = defaultdict(list)
+        self.comparisons = 0
+
+    def add(self, records: Iterable[dict]) -> List[int]:
+        """Merge ``records`` into the index; return the positions of new or updated references."""
+
+        records = list(records)
+        base = len(self.references)
+        titles = [normalize_title(record.get("title", "")) for record in records]
+        # Union-find over existing references (ids < base) and incoming records; the
+        # root is always the smallest id, i.e. the earliest reference or record.
+        parent: Dict[int, int] = {}
+
+        def find(node: int) -> int:
+            root = node
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while parent.get(node, node) != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        def union(a: int, b: int) -> None:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+        dois = dict(self._dois)
+        for position, record in enumerate(records):
+            doi = normalize_doi(record.get("doi"))
+            if doi:
+                if doi in dois:
+                    union(base + position, dois[doi])
+                else:
+                    dois[doi] = base + position
+
+        incoming: Dict[str, List[int]] = defaultdict(list)
+        for position, title in enumerate(titles):
+            for key in blocking_keys(title):
+                incoming[key].append(position)
+        for key, positions in incoming.items():
+            members = self._blocks.get(key, [])
+            if len(members) + len(positions) > self.max_block_size:
+                continue
+            ids = members + [base + position for position in positions]
+            choices = [self._titles[member] for member in members] + [titles[position] for position in positions]
+            queries = [titles[position] for position in positions]
+            for position, columns in zip(positions, self._similar(queries, choices)):
+                for column in columns:
+                    if ids[column] != base + position:
+                        union(base + position, ids[column])
+
+        touched: Dict[int, None] = {}
+        created: Dict[int, int] = {}
+        for position, record in enumerate(records):
+            root = find(base + position)
+            if root < base:
+                target = root
+            elif root in created:
+                target = created[root]
+            else:
+                target = created[root] = self._insert(record, titles[position])
+                touched[target] = None
+                continue
+            reference = self.references[target]
+            had_doi = reference.doi
+            merge_record(reference, record)
+            if reference.doi and not had_doi and normalize_doi(reference.doi) not in self._dois:
+                self._dois[normalize_doi(reference.doi)] = target
+            touched[target] = None
+        return list(touched)
+
+    def _similar(self, queries: List[str], choices: List[str]) -> List[List[int]]:
+        """For each query, the columns of ``choices`` scoring above the threshold."""
+
+        self.comparisons += len(queries) * len(choices)
+        if _HAS_NUMPY:
+            scores = process.cdist(queries, choices, scorer=fuzz.ratio, score_cutoff=self.threshold)
+            return [[int(column) for column in (row > self.threshold).nonzero()[0]] for row in scores]
+        matches = (
+            process.extract(query, choices, scorer=fuzz.ratio, score_cutoff=self.threshold, limit=None) for query in queries
+        )
+        return [[column for _, score, column in row if score > self.threshold] for row in matches]
+
+    def _insert(self, record: dict, title: str) -> int:
+        position = len(self.references)
+        self.references.append(self.to_reference(record))
+        self._titles.append(title)
+        doi = normalize_doi(record.get("doi"))
+        if doi and doi not in self._dois:
+            self._dois[doi] = position
+        for key in blocking_keys(title):
+            self._blocks[key].append(position)
+        return position
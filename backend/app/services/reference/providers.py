@@ -7,6 +7,9 @@ from typing import Any, Dict, List
 import httpx
 
 from ...config import get_settings
+from ..http_pool import HttpClientPool, get_http_pool
+
+REQUEST_TIMEOUT = 10.0
 
 
 @dataclass
@@ -17,6 +20,15 @@ class ProviderResult:
 
 class BaseProvider:
     name = "base"
+    base_url = ""
+    # Sustained request rate the API allows (see each provider's published limits).
+    requests_per_second = 5.0
+
+    def __init__(self, pool: HttpClientPool | None = None) -> None:
+        self.pool = pool
+
+    def client(self) -> httpx.AsyncClient:
+        return (self.pool or get_http_pool()).client(self.base_url)
 
     async def search(self, query: str) -> ProviderResult:
         raise NotImplementedError
@@ -24,16 +36,21 @@ class BaseProvider:
 
 class CrossrefProvider(BaseProvider):
     name = "crossref"
+    base_url = "https://api.crossref.org"
+
+    @property
+    def requests_per_second(self) -> float:  # type: ignore[override]
+        # Requests identifying a contact address are served from the faster "polite" pool.
+        return 10.0 if get_settings().crossref_mailto else 5.0
 
     async def search(self, query: str) -> ProviderResult:
         settings = get_settings()
         params = {"query": query, "rows": 5}
         if settings.crossref_mailto:
             params["mailto"] = settings.crossref_mailto
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get("https://api.crossref.org/works", params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self.client().get(f"{self.base_url}/works", params=params, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
         records = []
         for item in data.get("message", {}).get("items", []):
             records.append(
@@ -51,14 +68,17 @@ class CrossrefProvider(BaseProvider):
 
 class OpenAlexProvider(BaseProvider):
     name = "openalex"
+    requests_per_second = 10.0
+
+    @property
+    def base_url(self) -> str:  # type: ignore[override]
+        return get_settings().openalex_base.rstrip("/")
 
     async def search(self, query: str) -> ProviderResult:
-        settings = get_settings()
         params = {"search": query, "per-page": 5}
-        async with httpx.AsyncClient(timeout=10, base_url=settings.openalex_base) as client:
-            resp = await client.get("/works", params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self.client().get(f"{self.base_url}/works", params=params, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
         records = []
         for item in data.get("results", []):
             records.append(
@@ -76,42 +96,59 @@ class OpenAlexProvider(BaseProvider):
 
 class PubMedProvider(BaseProvider):
     name = "pubmed"
+    base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+    @property
+    def requests_per_second(self) -> float:  # type: ignore[override]
+        # E-utilities allow 3 requests per second, 10 with an API key; a search makes two.
+        return (10.0 if get_settings().ncbi_api_key else 3.0) / 2
 
     async def search(self, query: str) -> ProviderResult:
+        api_key = get_settings().ncbi_api_key
         params = {"db": "pubmed", "term": query, "retmode": "json", "retmax": 5}
-        async with httpx.AsyncClient(timeout=10, base_url="https://eutils.ncbi.nlm.nih.gov/entrez/eutils") as client:
-            ids_resp = await client.get("/esearch.fcgi", params=params)
-            ids_resp.raise_for_status()
-            ids = ids_resp.json().get("esearchresult", {}).get("idlist", [])
-            records: list[dict[str, Any]] = []
-            if ids:
-                summary_resp = await client.get("/esummary.fcgi", params={"db": "pubmed", "id": ",".join(ids), "retmode": "json"})
-                summary_resp.raise_for_status()
-                data = summary_resp.json().get("result", {})
-                for identifier in ids:
-                    item = data.get(identifier, {})
-                    records.append(
-                        {
-                            "title": item.get("title"),
-                            "authors": [a.get("name") for a in item.get("authors", [])],
-                            "year": int(item.get("pubdate", "0")[:4]) if item.get("pubdate") else None,
-                            "doi": item.get("elocationid"),
-                            "url": f"https://pubmed.ncbi.nlm.nih.gov/{identifier}/",
-                            "source": self.name,
-                        }
-                    )
+        if api_key:
+            params["api_key"] = api_key
+        client = self.client()
+        ids_resp = await client.get(f"{self.base_url}/esearch.fcgi", params=params, timeout=REQUEST_TIMEOUT)
+        ids_resp.raise_for_status()
+        ids = ids_resp.json().get("esearchresult", {}).get("idlist", [])
+        records: list[dict[str, Any]] = []
+        if ids:
+            summary_params = {"db": "pubmed", "id": ",".join(ids), "retmode": "json"}
+            if api_key:
+                summary_params["api_key"] = api_key
+            summary_resp = await client.get(f"{self.base_url}/esummary.fcgi", params=summary_params, timeout=REQUEST_TIMEOUT)
+            summary_resp.raise_for_status()
+            data = summary_resp.json().get("result", {})
+            for identifier in ids:
+                item = data.get(identifier, {})
+                records.append(
+                    {
+                        "title": item.get("title"),
+                        "authors": [a.get("name") for a in item.get("authors", [])],
+                        "year": int(item.get("pubdate", "0")[:4]) if item.get("pubdate") else None,
+                        "doi": item.get("elocationid"),
+                        "url": f"https://pubmed.ncbi.nlm.nih.gov/{identifier}/",
+                        "source": self.name,
+                    }
+                )
         return ProviderResult(source=self.name, records=records)
 
 
 class ArxivProvider(BaseProvider):
     name = "arxiv"
+    # arXiv asks API clients for no more than one request every three seconds.
+    requests_per_second = 1 / 3
+
+    @property
+    def base_url(self) -> str:  # type: ignore[override]
+        return get_settings().arxiv_base.rstrip("/")
 
     async def search(self, query: str) -> ProviderResult:
         params = {"search_query": query, "start": 0, "max_results": 5}
-        async with httpx.AsyncClient(timeout=10, base_url="http://export.arxiv.org/api") as client:
-            resp = await client.get("/query", params=params)
-            resp.raise_for_status()
-            text = resp.text
+        resp = await self.client().get(f"{self.base_url}/query", params=params, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        text = resp.text
         records = []
         for entry in text.split("<entry>")[1:]:
             title = entry.split("<title>")[1].split("</title>")[0].strip()
@@ -0,0 +1,287 @@
+"""Rate limiting, retries and circuit breaking for reference providers.
+
+Every provider call goes through the :class:`ProviderGuard` registered for its name:
+
+* a token bucket refilled at the provider's published request rate (overridable
+  with ``REFERENCE_RATE_LIMITS``) delays calls instead of tripping the API's limit;
+* 429, 5xx and transport errors are retried with full-jitter exponential backoff,
+  honouring ``Retry-After`` when the API sends one;
+* after ``REFERENCE_BREAKER_FAILURES`` consecutive failed calls the circuit opens and
+  the provider is skipped for ``REFERENCE_BREAKER_RESET_SECONDS``, after which a
+  single trial call decides whether it closes again.
+
+Guards are process-wide so concurrent searches share one budget per API; their
+counters appear under ``reference_providers`` in ``/api/jobs/stats``.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+import httpx
+
+from ...config import Settings, get_settings
+
+T = TypeVar("T")
+Clock = Callable[[], float]
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float | None = None, clock: Clock = time.monotonic) -> None:
+        self.rate = max(rate, 1e-6)
+        self.burst = max(burst if burst is not None else self.rate, 1.0)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self.total_wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the seconds waited."""
+
+        # Reserve the token before sleeping: a negative balance is the queue of callers
+        # ahead, so waits stay FIFO without a lock tied to one event loop.
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        delay = -self._tokens / self.rate
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._tokens += 1
+            raise
+        self.total_wait_seconds += delay
+        return delay
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60.0, clock: Clock = time.monotonic) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._trial or self.clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def abandon_trial(self) -> None:
+        """Forget a trial call that was cancelled before it could succeed or fail."""
+
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._trial = False
+
+
+def _retry_after(error: Exception) -> float | None:
+    if isinstance(error, httpx.HTTPStatusError):
+        value = error.response.headers.get("retry-after")
+        try:
+            return max(float(value), 0.0) if value is not None else None
+        except ValueError:
+            return None  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class ProviderGuard:
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float | None = None,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 10.0,
+        breaker: CircuitBreaker | None = None,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.max_retries = max(max_retries, 0)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.calls = 0
+        self.attempts = 0
+        self.successes = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.short_circuited = 0
+        self.total_latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt))
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run ``operation`` within the provider's rate limit, retrying transient failures."""
+
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise ProviderUnavailableError(f"{self.name} circuit open after {self.breaker.failures} failures")
+        self.calls += 1
+        try:
+            return await self._attempt(operation)
+        except asyncio.CancelledError:
+            # Cancellation says nothing about the provider's health.
+            self.breaker.abandon_trial()
+            raise
+
+    async def _attempt(self, operation: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            self.attempts += 1
+            started = time.perf_counter()
+            try:
+                result = await operation()
+            except Exception as error:
+                self._observe(time.perf_counter() - started)
+                if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+                    self.rate_limited += 1
+                if attempt < self.max_retries and is_retryable(error):
+                    self.retries += 1
+                    await asyncio.sleep(self.backoff(attempt, error))
+                    attempt += 1
+                    continue
+                self.errors += 1
+                self.breaker.record_failure()
+                raise
+            self._observe(time.perf_counter() - started)
+            self.successes += 1
+            self.breaker.record_success()
+            return result
+
+    def _observe(self, seconds: float) -> None:
+        self.total_latency_seconds += seconds
+        self.max_latency_seconds = max(self.max_latency_seconds, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": self.bucket.rate,
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "short_circuited": self.short_circuited,
+            "circuit": self.breaker.state,
+            "avg_latency_seconds": self.total_latency_seconds / self.attempts if self.attempts else 0.0,
+            "max_latency_seconds": self.max_latency_seconds,
+            "throttled_seconds": self.bucket.total_wait_seconds,
+        }
+
+
+def parse_rates(spec: str | None) -> Dict[str, float]:
+    """Parse ``"crossref=5,arxiv=0.33"`` into ``{"crossref": 5.0, "arxiv": 0.33}``."""
+
+    rates: Dict[str, float] = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            rates[name.strip().lower()] = float(value)
+    return rates
+
+
+class ProviderGuards:
+    def __init__(
+        self,
+        overrides: Dict[str, float] | None = None,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 10.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+    ) -> None:
+        self.overrides = overrides or {}
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._guards: Dict[str, ProviderGuard] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "ProviderGuards":
+        settings = settings or get_settings()
+        return cls(
+            parse_rates(settings.reference_rate_limits),
+            max_retries=settings.reference_max_retries,
+            backoff_seconds=settings.reference_retry_backoff_seconds,
+            max_backoff_seconds=settings.reference_retry_max_backoff_seconds,
+            failure_threshold=settings.reference_breaker_failures,
+            reset_seconds=settings.reference_breaker_reset_seconds,
+        )
+
+    def get(self, name: str, rate: float) -> ProviderGuard:
+        key = name.lower()
+        guard = self._guards.get(key)
+        if guard is None:
+            guard = self._guards[key] = ProviderGuard(
+                key,
+                self.overrides.get(key, rate),
+                max_retries=self.max_retries,
+                backoff_seconds=self.backoff_seconds,
+                max_backoff_seconds=self.max_backoff_seconds,
+                breaker=CircuitBreaker(self.failure_threshold, self.reset_seconds),
+            )
+        return guard
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: guard.stats() for name, guard in self._guards.items()}
+
+
+@lru_cache(maxsize=1)
+def get_provider_guards() -> ProviderGuards:
+    """Return the process-wide guards shared by every :class:`ReferenceRetriever`."""
+
+    return ProviderGuards.from_settings()
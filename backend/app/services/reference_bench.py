@@ -0,0 +1,117 @@
+"""Benchmark fuzzy merging of provider records.
+
+Usage::
+
+    python -m backend.app.services.reference_bench --records 10000 --legacy 2000
+
+Synthetic records are generated as distinct titles plus near-duplicates (typos,
+case changes, another provider's copy with or without a DOI). The blocking
+:class:`ReferenceIndex` merges all of them; ``--legacy N`` also times the former
+compare-against-everything loop on the first ``N`` records for comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Sequence
+
+from rapidfuzz import fuzz
+
+from .reference.dedup import ReferenceIndex
+from .reference_retriever import ReferenceRetriever
+
+_SYLLABLES = "ba co de fi gu ha ki lo mu ne po ra si tu ve xo ya ze".split()
+
+
+def _vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5))))
+    return sorted(words)
+
+
+def synthetic_records(count: int, duplicate_rate: float = 0.4, seed: int = 7) -> List[dict]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, 5000)
+    originals: List[dict] = []
+    records: List[dict] = []
+    while len(records) < count:
+        if originals and rng.random() < duplicate_rate:
+            source = rng.choice(originals)
+            title = source["title"]
+            if rng.random() < 0.5:
+                position = rng.randrange(len(title))
+                title = title[:position] + rng.choice("abcdefghij") + title[position + 1 :]
+            records.append({**source, "title": title.upper() if rng.random() < 0.1 else title, "source": "openalex"})
+            if rng.random() < 0.5:
+                records[-1]["doi"] = None
+            continue
+        number = len(originals)
+        title = " ".join(rng.sample(vocabulary, rng.randint(5, 10))) + f" study {number}"
+        record = {
+            "title": title,
+            "authors": [f"Author {number}"],
+            "year": 2000 + number % 24,
+            "doi": f"10.1000/{number}",
+            "source": "crossref",
+        }
+        originals.append(record)
+        records.append(record)
+    return records
+
+
+def legacy_merge(records: List[dict]) -> int:
+    """Size of the result of the former quadratic merge, kept for comparison."""
+
+    merged: List[dict] = []
+    for record in records:
+        title = record.get("title", "").lower()
+        if not any(fuzz.ratio(existing.get("title", "").lower(), title) > 85 for existing in merged):
+            merged.append(record)
+    return len(merged)
+
+
+def run_benchmark(count: int, legacy: int) -> Dict[str, float]:
+    records = synthetic_records(count)
+    index = ReferenceIndex(ReferenceRetriever._record_to_reference)
+    started = time.perf_counter()
+    index.add(records)
+    report: Dict[str, float] = {
+        "records": len(records),
+        "references": len(index.references),
+        "comparisons": index.comparisons,
+        "seconds": time.perf_counter() - started,
+    }
+    if legacy:
+        subset = records[:legacy]
+        started = time.perf_counter()
+        legacy_merge(subset)
+        report["legacy_records"] = len(subset)
+        report["legacy_seconds"] = time.perf_counter() - started
+        started = time.perf_counter()
+        ReferenceIndex(ReferenceRetriever._record_to_reference).add(subset)
+        report["blocked_seconds_on_legacy_subset"] = time.perf_counter() - started
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time blocking fuzzy merge of provider records")
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--legacy", type=int, default=0, help="Also time the quadratic merge on this many records")
+    args = parser.parse_args(argv)
+    report = run_benchmark(args.records, args.legacy)
+    print(
+        f"merged {report['records']} records into {report['references']} references in {report['seconds']:.2f}s "
+        f"({report['comparisons']} title comparisons)"
+    )
+    if "legacy_seconds" in report:
+        print(
+            f"first {report['legacy_records']} records: quadratic={report['legacy_seconds']:.2f}s  "
+            f"blocked={report['blocked_seconds_on_legacy_subset']:.2f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    raise SystemExit(main())
@@ -1,62 +1,274 @@
-"""Unified reference retrieval across multiple providers."""
+"""Unified reference retrieval across multiple providers.
+
+:meth:`ReferenceRetriever.stream` queries every provider at once and yields a
+:class:`RetrievalUpdate` as each one responds, merging its records into the running
+deduplicated result; providers still pending at the deadline are cancelled and the
+stream's :meth:`~RetrievalStream.result` reports which sources completed.
+:meth:`~ReferenceRetriever.search` collects a stream. Besides it, :meth:`search_slots`
+searches once per citation slot: slot queries are built from their ``query_terms``,
+near-identical queries are searched once, and provider calls run concurrently
+under a global cap and a per-provider cap.
+
+Both go through :class:`ReferenceCache` when one is configured: a fresh cached
+response is served without a network call, and in offline mode a query that is not
+cached yields no records for that provider. Network calls are paced, retried and
+circuit-broken per provider by :mod:`.reference.resilience`; a provider that still
+fails only loses its own records.
+"""
 from __future__ import annotations
 
 import asyncio
-import hashlib
-from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Callable
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Sequence
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
-from ..models.core import Reference
+from ..config import get_settings
+from ..models.core import CitationSlot, Reference
+from .reference.cache import ReferenceCache, get_reference_cache
+from .reference.dedup import ReferenceIndex, normalize_title
 from .reference.providers import DEFAULT_PROVIDERS, BaseProvider, ProviderResult
+from .reference.resilience import ProviderGuards, get_provider_guards
+
+logger = logging.getLogger(__name__)
 
 ProviderFactory = Callable[[], BaseProvider]
+SEARCHABLE_STATUSES = ("pending", "confirmed")
 
 
 @dataclass
 class RetrievalResult:
     references: List[Reference]
+    errors: Dict[str, str] = field(default_factory=dict)
+    completed: List[str] = field(default_factory=list)
+    cancelled: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RetrievalUpdate:
+    source: str
+    records: int
+    added: List[Reference]
+    total: int
+    error: str | None = None
+
+
+def describe_update(update: RetrievalUpdate) -> str:
+    if update.error is not None:
+        return f"{update.source} unavailable: {update.error[:120]}"
+    return f"{update.source}: {update.records} records, {len(update.added)} new or updated references ({update.total} so far)"
+
+
+@dataclass
+class SlotQuery:
+    query: str
+    slots: List[int] = field(default_factory=list)
+
+
+@dataclass
+class SlotSearchResult:
+    references: List[Reference]
+    candidates: Dict[int, List[Reference]]
+    queries: List[SlotQuery]
+
+
+SlotResultCallback = Callable[[SlotQuery, List[Reference]], None]
+
+
+def slot_query(slot: CitationSlot) -> str:
+    terms = " ".join(term for term in slot.query_terms if term).strip() or slot.sentence
+    return " ".join(terms.split())[:200]
+
+
+def group_slot_queries(slots: Sequence[CitationSlot], similarity: float) -> List[SlotQuery]:
+    """One query per distinct (or near-identical, by token order-insensitive ratio) slot query."""
+
+    groups: List[SlotQuery] = []
+    normalized: List[str] = []
+    for position, slot in enumerate(slots):
+        if not slot.need_citation or slot.status not in SEARCHABLE_STATUSES:
+            continue
+        query = slot_query(slot)
+        key = normalize_title(query)
+        if not key:
+            continue
+        match = process.extractOne(key, normalized, scorer=fuzz.token_sort_ratio, score_cutoff=similarity) if normalized else None
+        if match:
+            groups[match[2]].slots.append(position)
+        else:
+            normalized.append(key)
+            groups.append(SlotQuery(query=query, slots=[position]))
+    return groups
+
+
+class RetrievalStream:
+    """Async iterator over provider responses for one query; see :meth:`ReferenceRetriever.stream`."""
+
+    def __init__(self, retriever: "ReferenceRetriever", query: str, deadline: float | None) -> None:
+        self.retriever = retriever
+        self.query = query
+        self.deadline = deadline
+        self.index = ReferenceIndex(retriever._record_to_reference)
+        self.completed: List[str] = []
+        self.errors: Dict[str, str] = {}
+        self.cancelled: List[str] = []
+        self._updates = self._run()
+
+    def __aiter__(self) -> "RetrievalStream":
+        return self
+
+    async def __anext__(self) -> RetrievalUpdate:
+        return await self._updates.__anext__()
+
+    async def aclose(self) -> None:
+        """Stop early; providers that have not answered are cancelled."""
+
+        await self._updates.aclose()
+
+    def result(self) -> RetrievalResult:
+        return RetrievalResult(
+            references=self.index.references,
+            errors=dict(self.errors),
+            completed=list(self.completed),
+            cancelled=list(self.cancelled),
+        )
+
+    async def _run(self) -> AsyncIterator[RetrievalUpdate]:
+        loop = asyncio.get_running_loop()
+        instances = self.retriever._instances
+        order = {id(provider): position for position, provider in enumerate(instances)}
+        pending: Dict[asyncio.Future, BaseProvider] = {
+            asyncio.ensure_future(self.retriever._search(provider, self.query)): provider for provider in instances
+        }
+        expires = loop.time() + self.deadline if self.deadline else None
+        try:
+            while pending:
+                timeout = None if expires is None else max(expires - loop.time(), 0.0)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                # Merge simultaneous answers in provider order so results stay deterministic.
+                for task in sorted(done, key=lambda task: order[id(pending[task])]):
+                    provider = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        logger.warning("%s search failed for %r: %s", provider.name, self.query, error)
+                        self.errors[provider.name] = str(error) or type(error).__name__
+                        yield RetrievalUpdate(provider.name, 0, [], len(self.index.references), self.errors[provider.name])
+                        continue
+                    result: ProviderResult = task.result()
+                    added = [self.index.references[position] for position in self.index.add(result.records)]
+                    self.completed.append(provider.name)
+                    yield RetrievalUpdate(provider.name, len(result.records), added, len(self.index.references))
+        finally:
+            for task, provider in pending.items():
+                task.cancel()
+                self.cancelled.append(provider.name)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
 
 class ReferenceRetriever:
-    def __init__(self, providers: Sequence[ProviderFactory] | None = None) -> None:
+    def __init__(
+        self,
+        providers: Sequence[ProviderFactory] | None = None,
+        cache: ReferenceCache | None = None,
+        offline: bool | None = None,
+        guards: ProviderGuards | None = None,
+    ) -> None:
         self.providers: Sequence[ProviderFactory] = providers or [provider for provider in DEFAULT_PROVIDERS]
+        # Providers are stateless apart from their pooled HTTP client; build them once, not per search.
+        self._instances: List[BaseProvider] = [factory() for factory in self.providers]
+        # Cached responses and rate budgets are keyed by provider name, so injected
+        # providers only use an explicit cache and explicit guards.
+        self.cache = cache if cache is not None or providers is not None else get_reference_cache()
+        self.guards = guards if guards is not None or providers is not None else get_provider_guards()
+        self.offline = get_settings().reference_offline if offline is None else offline
 
-    async def search(self, query: str) -> RetrievalResult:
-        tasks = [factory().search(query) for factory in self.providers]
-        results: list[ProviderResult] = await asyncio.gather(*tasks, return_exceptions=False)
-        merged = self._merge(results)
-        return RetrievalResult(references=merged)
-
-    def _merge(self, results: Iterable[ProviderResult]) -> List[Reference]:
-        merged: dict[str, Reference] = {}
-        for result in results:
-            for record in result.records:
-                key = self._make_key(record)
-                similarity_key = next((k for k, ref in merged.items() if fuzz.ratio(ref.title.lower(), record.get("title", "").lower()) > 85), None)
-                target_key = similarity_key or key
-                existing = merged.get(target_key)
-                reference = self._record_to_reference(record)
-                if existing:
-                    scores = [s for s in (existing.score, record.get("score")) if s is not None]
-                    if scores:
-                        existing.score = max(scores)
-                    existing.source = ",".join(sorted(set(filter(None, [existing.source, record.get("source")]))))
-                    if record.get("doi") and not existing.doi:
-                        existing.doi = record.get("doi")
-                    if record.get("url") and not existing.url:
-                        existing.url = record.get("url")
-                else:
-                    merged[target_key] = reference
-        return list(merged.values())
+    async def _search(self, provider: BaseProvider, query: str) -> ProviderResult:
+        if self.cache is not None:
+            # Offline, an expired entry is still better than no answer at all.
+            records = self.cache.get_query(provider.name, query, allow_stale=self.offline)
+            if records is not None:
+                return ProviderResult(source=provider.name, records=records)
+            if self.offline:
+                self.cache.record_offline_miss()
+                return ProviderResult(source=provider.name, records=[])
+        elif self.offline:
+            return ProviderResult(source=provider.name, records=[])
+        if self.guards is not None:
+            guard = self.guards.get(provider.name, provider.requests_per_second)
+            result = await guard.call(lambda: provider.search(query))
+        else:
+            result = await provider.search(query)
+        if self.cache is not None:
+            self.cache.put_query(provider.name, query, result.records)
+            return ProviderResult(source=result.source, records=self.cache.enrich(result.records))
+        return result
 
-    @staticmethod
-    def _make_key(record: dict) -> str:
-        title = record.get("title", "")
-        doi = record.get("doi")
-        base = doi or title
-        return hashlib.sha256(base.encode("utf-8")).hexdigest()
+    def stream(self, query: str, deadline: float | None = None) -> RetrievalStream:
+        """Yield merged results as each provider responds, for at most ``deadline`` seconds.
+
+        ``deadline`` defaults to ``REFERENCE_SEARCH_DEADLINE_SECONDS``; ``0`` waits for
+        every provider.
+        """
+
+        if deadline is None:
+            deadline = get_settings().reference_search_deadline_seconds
+        return RetrievalStream(self, query, deadline)
+
+    async def search(self, query: str, deadline: float | None = None) -> RetrievalResult:
+        stream = self.stream(query, deadline)
+        async for _ in stream:
+            pass
+        return stream.result()
+
+    async def search_slots(
+        self,
+        slots: Sequence[CitationSlot],
+        on_result: SlotResultCallback | None = None,
+        max_concurrency: int | None = None,
+        per_provider: int | None = None,
+    ) -> SlotSearchResult:
+        """Search references for every pending or confirmed slot that needs a citation.
+
+        ``on_result`` is called as each query resolves with the references it found;
+        a provider failing for one query only drops that provider's records for it.
+        """
+
+        settings = get_settings()
+        queries = group_slot_queries(slots, settings.reference_query_similarity)
+        overall = asyncio.Semaphore(max_concurrency or settings.reference_max_concurrency)
+        provider_caps = [
+            asyncio.Semaphore(per_provider or settings.reference_provider_concurrency) for _ in self._instances
+        ]
+        index = ReferenceIndex(self._record_to_reference)
+        candidates: Dict[int, List[Reference]] = {}
+
+        async def _call(position: int, provider: BaseProvider, query: str) -> ProviderResult:
+            # Wait for the provider's own cap first so a busy provider does not hold global slots.
+            async with provider_caps[position]:
+                async with overall:
+                    return await self._search(provider, query)
+
+        async def _resolve(group: SlotQuery) -> None:
+            calls = (_call(position, provider, group.query) for position, provider in enumerate(self._instances))
+            results = await asyncio.gather(*calls, return_exceptions=True)
+            touched: Dict[int, None] = {}
+            for provider, result in zip(self._instances, results):
+                if isinstance(result, Exception):
+                    logger.warning("%s search failed for %r: %s", provider.name, group.query, result)
+                    continue
+                touched.update(dict.fromkeys(index.add(result.records)))
+            found = [index.references[position] for position in touched]
+            for slot_position in group.slots:
+                candidates[slot_position] = found
+            if on_result is not None:
+                on_result(group, found)
+
+        await asyncio.gather(*(_resolve(group) for group in queries))
+        return SlotSearchResult(references=index.references, candidates=candidates, queries=queries)
 
     @staticmethod
     def _record_to_reference(record: dict) -> Reference:
@@ -1,9 +1,16 @@
 """Runtime singletons for shared services."""
 from __future__ import annotations
 
+from ..config import get_settings
+from .compile_cache import CompileCache
+from .compile_scheduler import CompileScheduler
 from .jobs import JobManager
-from .storage import JobRepository
+from .storage import create_job_repository
+from .templates.formats import PreambleFormatStore
 
-job_manager = JobManager(JobRepository())
+job_manager = JobManager(create_job_repository())
+compile_scheduler = CompileScheduler(job_manager, get_settings().compile_max_concurrency)
+compile_cache = CompileCache()
+preamble_formats = PreambleFormatStore()
 
-__all__ = ["job_manager"]
+__all__ = ["compile_cache", "compile_scheduler", "job_manager", "preamble_formats"]
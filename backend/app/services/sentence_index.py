@@ -0,0 +1,209 @@
+"""Offset-aware sentence segmentation for Markdown manuscripts.
+
+:func:`build_sentence_index` makes one linear pass over the text, jumping over the
+spans that must never be split (fenced code, inline code, inline and display math)
+and ignoring full stops after common abbreviations ("e.g.", "et al.", "Fig."), runs
+of initials and before lowercase continuations. Headings are not sentences; they
+set the section that the following sentences belong to. Every sentence keeps its
+character and UTF-8 byte offsets so callers can edit the text in place instead of
+searching for it again.
+"""
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+ABBREVIATIONS = frozenset(
+    {
+        "al", "approx", "ca", "cf", "ch", "co", "dept", "dr", "e.g", "eq", "eqs", "etc", "fig", "figs", "i.e",
+        "inc", "jr", "ltd", "mr", "mrs", "ms", "no", "nos", "p", "pp", "prof", "ref", "refs", "resp", "sec",
+        "secs", "sr", "st", "tab", "univ", "viz", "vol", "vs",
+    }
+)
+
+_TOKENS = re.compile(
+    r"(?P<fence>^[ \t]*(?:```|~~~)[^\n]*)"
+    r"|(?P<heading>^\#{1,6}[ \t]+(?P<title>[^\n]*?)[ \t#]*$)"
+    r"|(?P<paragraph>\n[ \t]*\n)"
+    r"|(?P<code>`+)"
+    r"|(?P<display>(?<!\\)\$\$|\\\[)"
+    r"|(?P<inline>(?<!\\)\$|\\\()"
+    r"|(?P<end>[.!?]+[)\]\"'”’]*(?=\s|$))",
+    re.MULTILINE,
+)
+_CLOSERS = {"$$": "$$", "\\[": "\\]", "$": "$", "\\(": "\\)"}
+_BLOCK_END = re.compile(r"\n[ \t]*\n|\n\#{1,6}[ \t]")
+# Pandoc's tex_math_dollars: the closing ``$`` follows a non-space and precedes no digit.
+_DOLLAR_CLOSE = re.compile(r"(?<=[^\s\\])\$(?!\d)")
+_WORD_BEFORE = re.compile(r"[\w.]+$")
+_INITIAL_NEXT = re.compile(r"\s+[A-Z]\.")
+_INITIAL_BEFORE = re.compile(r"(?:^|\s)[A-Z]\.\s+$")
+_NEXT_CHAR = re.compile(r"\s*(\S)")
+
+
+@dataclass(frozen=True)
+class Sentence:
+    index: int
+    text: str
+    start: int
+    end: int
+    byte_start: int
+    byte_end: int
+    section: str | None
+    section_index: int
+
+
+class SentenceIndex:
+    def __init__(self, text: str, sentences: List[Sentence]) -> None:
+        self.text = text
+        self.sentences = sentences
+        self._starts = [sentence.start for sentence in sentences]
+        self._by_text: Dict[str, List[Sentence]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def __iter__(self) -> Iterator[Sentence]:
+        return iter(self.sentences)
+
+    def at(self, offset: int) -> Sentence | None:
+        """The sentence containing character ``offset``, if any."""
+
+        position = bisect.bisect_right(self._starts, offset) - 1
+        if position >= 0 and offset < self.sentences[position].end:
+            return self.sentences[position]
+        return None
+
+    def find(self, text: str) -> List[Sentence]:
+        """Every sentence whose text is exactly ``text`` (ignoring surrounding whitespace)."""
+
+        if self._by_text is None:
+            self._by_text = {}
+            for sentence in self.sentences:
+                self._by_text.setdefault(sentence.text, []).append(sentence)
+        return self._by_text.get(text.strip(), [])
+
+    def in_section(self, section_index: int) -> List[Sentence]:
+        return [sentence for sentence in self.sentences if sentence.section_index == section_index]
+
+
+def _block_end(text: str, start: int) -> int:
+    """Offset where the paragraph containing ``start`` ends (blank line or heading)."""
+
+    found = _BLOCK_END.search(text, start)
+    return found.start() if found else len(text)
+
+
+def _closing(text: str, match: re.Match) -> int:
+    """Offset just past the delimiter closing the span ``match`` opens, or ``-1``.
+
+    Spans never run past the end of their paragraph; an opener without a closer
+    there (a currency ``$``, a stray backtick) is a literal character.
+    """
+
+    opener, start = match.group(), match.end()
+    limit = _block_end(text, start)
+    if opener == "$":
+        if start >= limit or text[start].isspace():
+            return -1
+        found = _DOLLAR_CLOSE.search(text, start, limit)
+        return found.end() if found else -1
+    if opener.startswith("`"):
+        found = re.compile(rf"(?<!`){re.escape(opener)}(?!`)").search(text, start, limit)
+        return found.end() if found else -1
+    closer = _CLOSERS[opener]
+    found = text.find(closer, start, limit)
+    return -1 if found < 0 else found + len(closer)
+
+
+def _is_abbreviation(text: str, match: re.Match) -> bool:
+    if match.group() != ".":
+        return False
+    word = _WORD_BEFORE.search(text, max(0, match.start() - 16), match.start())
+    if word and word.group().lower() in ABBREVIATIONS:
+        return True
+    # Runs of initials ("J. R. Smith"); a lone capital may just be a variable ending the sentence.
+    if word and re.fullmatch(r"[A-Z]", word.group()):
+        if _INITIAL_NEXT.match(text, match.end()) or _INITIAL_BEFORE.search(text, max(0, word.start() - 8), word.start()):
+            return True
+    # "... etc. and more" or "approx. three": the next word continues the sentence.
+    following = _NEXT_CHAR.match(text, match.end())
+    return bool(following and following.group(1).islower())
+
+
+def build_sentence_index(text: str) -> SentenceIndex:
+    sentences: List[Sentence] = []
+    section: str | None = None
+    section_index = 0
+    segment = 0
+    byte_cursor: Tuple[int, int] = (0, 0)
+
+    def _byte(offset: int) -> int:
+        # Offsets are requested in increasing order, so this stays linear overall.
+        nonlocal byte_cursor
+        char_at, byte_at = byte_cursor
+        byte_at += len(text[char_at:offset].encode("utf-8"))
+        byte_cursor = (offset, byte_at)
+        return byte_at
+
+    def _close(end: int) -> None:
+        raw = text[segment:end]
+        stripped = raw.strip()
+        if not stripped:
+            return
+        start = segment + len(raw) - len(raw.lstrip())
+        stop = start + len(stripped)
+        sentences.append(
+            Sentence(
+                index=len(sentences),
+                text=stripped,
+                start=start,
+                end=stop,
+                byte_start=_byte(start),
+                byte_end=_byte(stop),
+                section=section,
+                section_index=section_index,
+            )
+        )
+
+    pos = 0
+    while True:
+        match = _TOKENS.search(text, pos)
+        if match is None:
+            break
+        kind = match.lastgroup if match.lastgroup != "title" else "heading"
+        if kind == "fence":
+            _close(match.start())
+            fence = match.group().strip()[:3]
+            closing = re.compile(rf"^[ \t]*{re.escape(fence)}[^\n]*$", re.MULTILINE).search(text, match.end())
+            pos = segment = closing.end() if closing else len(text)
+        elif kind == "heading":
+            _close(match.start())
+            section = match.group("title").strip() or None
+            section_index += 1
+            pos = segment = match.end()
+        elif kind == "paragraph":
+            _close(match.start())
+            pos = segment = match.end()
+        elif kind in ("code", "display", "inline"):
+            closing = _closing(text, match)
+            pos = closing if closing >= 0 else match.end()
+        elif _is_abbreviation(text, match):
+            pos = match.end()
+        else:
+            _close(match.end())
+            pos = segment = match.end()
+        if pos == match.start():
+            pos += 1
+    _close(len(text))
+    return SentenceIndex(text, sentences)
+
+
+@lru_cache(maxsize=16)
+def get_sentence_index(text: str) -> SentenceIndex:
+    """Cached :func:`build_sentence_index`; the text itself is the manuscript version key."""
+
+    return build_sentence_index(text)
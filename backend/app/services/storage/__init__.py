@@ -0,0 +1,37 @@
+"""Pluggable storage backends for projects and jobs."""
+from __future__ import annotations
+
+from ...config import get_settings
+from .base import BaseJobRepository, BaseProjectRepository
+from .json_store import JobRepository, ProjectRepository
+from .sqlite import SQLiteJobRepository, SQLiteProjectRepository
+
+
+def create_project_repository() -> BaseProjectRepository:
+    """Instantiate the project repository selected by ``STORAGE_BACKEND``."""
+
+    backend = (get_settings().storage_backend or "json").lower()
+    if backend == "sqlite":
+        return SQLiteProjectRepository()
+    return ProjectRepository()
+
+
+def create_job_repository() -> BaseJobRepository:
+    """Instantiate the job repository selected by ``STORAGE_BACKEND``."""
+
+    backend = (get_settings().storage_backend or "json").lower()
+    if backend == "sqlite":
+        return SQLiteJobRepository()
+    return JobRepository()
+
+
+__all__ = [
+    "BaseJobRepository",
+    "BaseProjectRepository",
+    "JobRepository",
+    "ProjectRepository",
+    "SQLiteJobRepository",
+    "SQLiteProjectRepository",
+    "create_job_repository",
+    "create_project_repository",
+]
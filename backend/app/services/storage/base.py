@@ -0,0 +1,102 @@
+"""Storage backend interfaces for projects and jobs."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from ...models.core import CompileJob, JobLogEntry, JobStatus, PipelineStage, Project, ProjectStatus
+from ...utils.id import generate_id
+
+
+class BaseProjectRepository:
+    """Interface shared by all project storage backends."""
+
+    def save(self, project: Project) -> Project:
+        raise NotImplementedError
+
+    def get(self, project_id: str) -> Project | None:
+        raise NotImplementedError
+
+    def list_projects(
+        self,
+        status: ProjectStatus | None = None,
+        template_id: str | None = None,
+        created_after: datetime | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[Project]:
+        """Yield projects ordered by ``created_at`` (newest first)."""
+
+        raise NotImplementedError
+
+    def count(self, status: ProjectStatus | None = None, template_id: str | None = None) -> int:
+        raise NotImplementedError
+
+
+class BaseJobRepository:
+    """Interface shared by all job storage backends.
+
+    The job status document and the job log are stored separately: status updates
+    rewrite a small document, while log lines go to an append-only segment addressed
+    by sequence number so that appends and tail/range reads stay O(lines touched).
+    """
+
+    def create(self, project_id: str, stage: PipelineStage) -> CompileJob:
+        job_id = generate_id("job")
+        now = datetime.utcnow()
+        job = CompileJob(
+            id=job_id,
+            project_id=project_id,
+            stage=stage,
+            status=JobStatus.queued,
+            created_at=now,
+            updated_at=now,
+        )
+        self.save(job)
+        return job
+
+    def save(self, job: CompileJob) -> CompileJob:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> CompileJob | None:
+        raise NotImplementedError
+
+    def list_jobs(
+        self,
+        project_id: str | None = None,
+        status: JobStatus | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[CompileJob]:
+        """Yield jobs ordered by ``created_at`` (newest first)."""
+
+        raise NotImplementedError
+
+    def append_log(self, job_id: str, message: str) -> int:
+        """Append one line to the job log and return its sequence number."""
+
+        raise NotImplementedError
+
+    def read_logs(self, job_id: str, after_seq: int = 0, limit: int | None = None) -> List[JobLogEntry]:
+        """Return log entries with ``seq > after_seq`` in order, at most ``limit`` of them."""
+
+        raise NotImplementedError
+
+    def log_count(self, job_id: str) -> int:
+        raise NotImplementedError
+
+    def tail_logs(self, job_id: str, count: int) -> List[JobLogEntry]:
+        return self.read_logs(job_id, after_seq=max(self.log_count(job_id) - count, 0))
+
+    def mark_status(self, job_id: str, status: JobStatus, error: str | None = None, result: Dict | None = None) -> CompileJob:
+        job = self.get(job_id)
+        if not job:
+            raise KeyError(job_id)
+        job.status = status
+        job.updated_at = datetime.utcnow()
+        if error:
+            job.error = error
+        if result is not None:
+            job.result = result
+        self.save(job)
+        return job
@@ -0,0 +1,188 @@
+"""Simple JSON-file based storage for projects and jobs."""
+from __future__ import annotations
+
+import io
+import json
+import struct
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterable, List
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from ...config import project_storage_root
+from ...models.core import CompileJob, JobLogEntry, JobStatus, Project, ProjectStatus
+from .base import BaseJobRepository, BaseProjectRepository
+
+
+class ProjectRepository(BaseProjectRepository):
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or project_storage_root()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _project_path(self, project_id: str) -> Path:
+        return self.root / f"{project_id}.json"
+
+    def save(self, project: Project) -> Project:
+        path = self._project_path(project.id)
+        data = json.loads(project.json())
+        path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+        return project
+
+    def get(self, project_id: str) -> Project | None:
+        path = self._project_path(project_id)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return Project.parse_obj(data)
+
+    def _iter_all(self) -> Iterable[Project]:
+        for path in self.root.glob("proj_*.json"):
+            yield Project.parse_obj(json.loads(path.read_text(encoding="utf-8")))
+
+    def list_projects(
+        self,
+        status: ProjectStatus | None = None,
+        template_id: str | None = None,
+        created_after: datetime | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[Project]:
+        projects = [
+            project
+            for project in self._iter_all()
+            if (status is None or project.status == status)
+            and (template_id is None or project.template_id == template_id)
+            and (created_after is None or project.created_at > created_after)
+        ]
+        projects.sort(key=lambda project: project.created_at, reverse=True)
+        stop = offset + limit if limit is not None else None
+        return iter(islice(projects, offset, stop))
+
+    def count(self, status: ProjectStatus | None = None, template_id: str | None = None) -> int:
+        return sum(1 for _ in self.list_projects(status=status, template_id=template_id))
+
+
+# Each ``<job>.idx`` entry is the byte offset of the matching line in ``<job>.log``.
+_OFFSET = struct.Struct("<Q")
+
+
+class JobRepository(BaseJobRepository):
+    """Job status documents in ``<job>.json`` plus an append-only NDJSON log segment.
+
+    Log lines are written to ``<job>.log`` with a fixed-width offset index in
+    ``<job>.idx`` so that a range or tail read seeks straight to the first
+    requested record instead of scanning the whole history.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = (root or project_storage_root()) / "jobs"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._log_lock = threading.Lock()
+
+    def _job_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.json"
+
+    def _log_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.log"
+
+    def _index_path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.idx"
+
+    def save(self, job: CompileJob) -> CompileJob:
+        data = json.loads(job.json())
+        self._job_path(job.id).write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+        return job
+
+    def get(self, job_id: str) -> CompileJob | None:
+        path = self._job_path(job_id)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return CompileJob.parse_obj(data)
+
+    def list_jobs(
+        self,
+        project_id: str | None = None,
+        status: JobStatus | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[CompileJob]:
+        jobs = [
+            job
+            for job in (CompileJob.parse_obj(json.loads(path.read_text(encoding="utf-8"))) for path in self.root.glob("job_*.json"))
+            if (project_id is None or job.project_id == project_id) and (status is None or job.status == status)
+        ]
+        jobs.sort(key=lambda job: job.created_at, reverse=True)
+        stop = offset + limit if limit is not None else None
+        return iter(islice(jobs, offset, stop))
+
+    def append_log(self, job_id: str, message: str) -> int:
+        if not self._job_path(job_id).exists():
+            raise KeyError(job_id)
+        with self._log_lock, self._index_path(job_id).open("ab") as index, self._log_path(job_id).open("ab") as log:
+            if fcntl is not None:
+                fcntl.flock(index.fileno(), fcntl.LOCK_EX)
+            # Another process may have appended between open() and acquiring the lock.
+            index.seek(0, io.SEEK_END)
+            log.seek(0, io.SEEK_END)
+            if index.tell() == 0:
+                # First segment write: carry over lines embedded in an older status document.
+                for entry in self._legacy_logs(job_id):
+                    self._write_record(index, log, json.loads(entry.json()))
+            seq = index.tell() // _OFFSET.size + 1
+            self._write_record(index, log, {"seq": seq, "timestamp": datetime.utcnow().isoformat(), "message": message})
+            log.flush()
+        return seq
+
+    @staticmethod
+    def _write_record(index: BinaryIO, log: BinaryIO, record: dict) -> None:
+        index.write(_OFFSET.pack(log.tell()))
+        log.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def log_count(self, job_id: str) -> int:
+        index_path = self._index_path(job_id)
+        if not index_path.exists():
+            return len(self._legacy_logs(job_id))
+        return index_path.stat().st_size // _OFFSET.size
+
+    def read_logs(self, job_id: str, after_seq: int = 0, limit: int | None = None) -> List[JobLogEntry]:
+        index_path = self._index_path(job_id)
+        if not index_path.exists():
+            entries = self._legacy_logs(job_id)[after_seq:]
+            return entries[:limit] if limit is not None else entries
+        after_seq = max(after_seq, 0)
+        with index_path.open("rb") as index:
+            index.seek(after_seq * _OFFSET.size)
+            chunk = index.read(_OFFSET.size)
+        if len(chunk) < _OFFSET.size:
+            return []
+        (offset,) = _OFFSET.unpack(chunk)
+        entries: List[JobLogEntry] = []
+        with self._log_path(job_id).open("rb") as log:
+            log.seek(offset)
+            for line in log:
+                if limit is not None and len(entries) >= limit:
+                    break
+                if not line.endswith(b"\n"):
+                    break  # partially written record
+                entries.append(JobLogEntry.parse_raw(line))
+        return entries
+
+    def _legacy_logs(self, job_id: str) -> List[JobLogEntry]:
+        """Logs embedded in status documents written before log segments existed."""
+
+        path = self._job_path(job_id)
+        if not path.exists():
+            return []
+        data = json.loads(path.read_text(encoding="utf-8"))
+        timestamp = data.get("updated_at") or data.get("created_at")
+        return [
+            JobLogEntry(seq=index, timestamp=timestamp, message=message)
+            for index, message in enumerate(data.get("logs") or [], start=1)
+        ]
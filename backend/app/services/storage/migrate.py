@@ -0,0 +1,109 @@
+"""One-shot import of the JSON storage tree into the SQLite backend.
+
+Usage::
+
+    python -m backend.app.services.storage.migrate --source /data/.manuweaver --target /data/.manuweaver/manuweaver.db
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence
+
+from ...config import project_storage_root
+from ...models.core import CompileJob, Project
+from .json_store import JobRepository
+from .sqlite import (
+    INSERT_JOB_LOG,
+    UPSERT_JOB,
+    UPSERT_PROJECT,
+    default_database_path,
+    job_row,
+    open_database,
+    project_row,
+    sortable_timestamp,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MigrationReport:
+    projects: int = 0
+    jobs: int = 0
+    log_lines: int = 0
+    failures: List[str] | None = None
+
+
+def migrate_json_to_sqlite(source: Path | None = None, target: Path | None = None, batch_size: int = 500) -> MigrationReport:
+    """Copy every ``proj_*.json`` and ``jobs/job_*.json`` document, plus job logs, into SQLite.
+
+    Existing rows with the same id are overwritten, so the import can be re-run safely.
+    """
+
+    source = source or project_storage_root()
+    db = open_database(target or default_database_path())
+    report = MigrationReport(failures=[])
+
+    def _flush(sql: str, rows: list) -> None:
+        if not rows:
+            return
+        with db.transaction() as conn:
+            conn.executemany(sql, rows)
+        rows.clear()
+
+    rows: list = []
+    for path in sorted(source.glob("proj_*.json")):
+        try:
+            rows.append(project_row(Project.parse_obj(json.loads(path.read_text(encoding="utf-8")))))
+        except Exception as exc:  # pragma: no cover - corrupt documents are reported, not fatal
+            report.failures.append(f"{path}: {exc}")
+            continue
+        report.projects += 1
+        if len(rows) >= batch_size:
+            _flush(UPSERT_PROJECT, rows)
+    _flush(UPSERT_PROJECT, rows)
+
+    json_jobs = JobRepository(source)
+    for path in sorted(json_jobs.root.glob("job_*.json")):
+        try:
+            job = CompileJob.parse_obj(json.loads(path.read_text(encoding="utf-8")))
+            entries = json_jobs.read_logs(job.id)
+        except Exception as exc:  # pragma: no cover - corrupt documents are reported, not fatal
+            report.failures.append(f"{path}: {exc}")
+            continue
+        job.logs = []
+        with db.transaction() as conn:
+            conn.execute(UPSERT_JOB, job_row(job))
+            conn.execute("DELETE FROM job_logs WHERE job_id = ?", (job.id,))
+            conn.executemany(
+                INSERT_JOB_LOG,
+                [(job.id, entry.seq, sortable_timestamp(entry.timestamp), entry.message) for entry in entries],
+            )
+        report.jobs += 1
+        report.log_lines += len(entries)
+
+    logger.info(
+        "Migrated %s projects, %s jobs and %s log lines into %s", report.projects, report.jobs, report.log_lines, db.path
+    )
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import the JSON project store into SQLite")
+    parser.add_argument("--source", type=Path, default=None, help="JSON storage root (defaults to STORAGE_ROOT)")
+    parser.add_argument("--target", type=Path, default=None, help="SQLite database path (defaults to SQLITE_PATH)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    report = migrate_json_to_sqlite(args.source, args.target, batch_size=args.batch_size)
+    print(f"projects={report.projects} jobs={report.jobs} log_lines={report.log_lines} failures={len(report.failures or [])}")
+    for failure in report.failures or []:
+        print(f"  failed: {failure}")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+"""Embedded SQLite storage backend for projects and jobs."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+from ...config import get_settings, project_storage_root
+from ...models.core import CompileJob, JobLogEntry, JobStatus, Project, ProjectStatus
+from .base import BaseJobRepository, BaseProjectRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    template_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_projects_created ON projects (created_at);
+CREATE INDEX IF NOT EXISTS ix_projects_status_created ON projects (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_projects_template_created ON projects (template_id, created_at);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_created ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_project_created ON jobs (project_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at);
+
+CREATE TABLE IF NOT EXISTS job_logs (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+
+UPSERT_PROJECT = """
+INSERT INTO projects (id, status, template_id, created_at, data) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    status = excluded.status,
+    template_id = excluded.template_id,
+    created_at = excluded.created_at,
+    data = excluded.data
+"""
+
+UPSERT_JOB = """
+INSERT INTO jobs (id, project_id, stage, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    project_id = excluded.project_id,
+    stage = excluded.stage,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at,
+    data = excluded.data
+"""
+
+
+INSERT_JOB_LOG = "INSERT INTO job_logs (job_id, seq, created_at, message) VALUES (?, ?, ?, ?)"
+
+
+def sortable_timestamp(value: datetime) -> str:
+    # Fixed-width ISO timestamps keep lexicographic and chronological order identical.
+    return value.isoformat(timespec="microseconds")
+
+
+def project_row(project: Project) -> Tuple[Any, ...]:
+    return (project.id, project.status.value, project.template_id, sortable_timestamp(project.created_at), project.json())
+
+
+def job_row(job: CompileJob) -> Tuple[Any, ...]:
+    return (
+        job.id,
+        job.project_id,
+        job.stage.value,
+        job.status.value,
+        sortable_timestamp(job.created_at),
+        sortable_timestamp(job.updated_at),
+        job.json(),
+    )
+
+
+def default_database_path() -> Path:
+    settings = get_settings()
+    if settings.sqlite_path:
+        return Path(settings.sqlite_path)
+    return project_storage_root(settings) / "manuweaver.db"
+
+
+class SQLiteDatabase:
+    """Thread-safe wrapper around a single WAL-mode SQLite connection."""
+
+    def __init__(self, path: Path, schema: str = SCHEMA) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(schema)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Tuple[Any, ...] | None:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=8)
+def open_database(path: Path, schema: str = SCHEMA) -> SQLiteDatabase:
+    """Return a shared database handle for ``path``."""
+
+    return SQLiteDatabase(path, schema)
+
+
+def _page(sql: str, params: List[Any], limit: int | None, offset: int) -> Tuple[str, List[Any]]:
+    if limit is not None or offset:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+    return sql, params
+
+
+class SQLiteProjectRepository(BaseProjectRepository):
+    def __init__(self, path: Path | None = None) -> None:
+        self.db = open_database(path or default_database_path())
+
+    def save(self, project: Project) -> Project:
+        self.db.execute(UPSERT_PROJECT, project_row(project))
+        return project
+
+    def get(self, project_id: str) -> Project | None:
+        row = self.db.fetchone("SELECT data FROM projects WHERE id = ?", (project_id,))
+        if not row:
+            return None
+        return Project.parse_raw(row[0])
+
+    @staticmethod
+    def _filters(
+        status: ProjectStatus | None,
+        template_id: str | None,
+        created_after: datetime | None = None,
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(ProjectStatus(status).value)
+        if template_id is not None:
+            clauses.append("template_id = ?")
+            params.append(template_id)
+        if created_after is not None:
+            clauses.append("created_at > ?")
+            params.append(sortable_timestamp(created_after))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def list_projects(
+        self,
+        status: ProjectStatus | None = None,
+        template_id: str | None = None,
+        created_after: datetime | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[Project]:
+        where, params = self._filters(status, template_id, created_after)
+        sql, params = _page(f"SELECT data FROM projects{where} ORDER BY created_at DESC", params, limit, offset)
+        for (data,) in self.db.fetchall(sql, params):
+            yield Project.parse_raw(data)
+
+    def count(self, status: ProjectStatus | None = None, template_id: str | None = None) -> int:
+        where, params = self._filters(status, template_id)
+        row = self.db.fetchone(f"SELECT COUNT(*) FROM projects{where}", params)
+        return int(row[0]) if row else 0
+
+
+class SQLiteJobRepository(BaseJobRepository):
+    def __init__(self, path: Path | None = None) -> None:
+        self.db = open_database(path or default_database_path())
+
+    def save(self, job: CompileJob) -> CompileJob:
+        self.db.execute(UPSERT_JOB, job_row(job))
+        return job
+
+    def get(self, job_id: str) -> CompileJob | None:
+        row = self.db.fetchone("SELECT data FROM jobs WHERE id = ?", (job_id,))
+        if not row:
+            return None
+        return CompileJob.parse_raw(row[0])
+
+    def list_jobs(
+        self,
+        project_id: str | None = None,
+        status: JobStatus | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterable[CompileJob]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if project_id is not None:
+            clauses.append("project_id = ?")
+            params.append(project_id)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(JobStatus(status).value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql, params = _page(f"SELECT data FROM jobs{where} ORDER BY created_at DESC", params, limit, offset)
+        for (data,) in self.db.fetchall(sql, params):
+            yield CompileJob.parse_raw(data)
+
+    def append_log(self, job_id: str, message: str) -> int:
+        with self.db.transaction() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                raise KeyError(job_id)
+            (last,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM job_logs WHERE job_id = ?", (job_id,)).fetchone()
+            seq = int(last) + 1
+            conn.execute(INSERT_JOB_LOG, (job_id, seq, sortable_timestamp(datetime.utcnow()), message))
+        return seq
+
+    def log_count(self, job_id: str) -> int:
+        row = self.db.fetchone("SELECT COALESCE(MAX(seq), 0) FROM job_logs WHERE job_id = ?", (job_id,))
+        return int(row[0]) if row else 0
+
+    def read_logs(self, job_id: str, after_seq: int = 0, limit: int | None = None) -> List[JobLogEntry]:
+        sql, params = _page(
+            "SELECT seq, created_at, message FROM job_logs WHERE job_id = ? AND seq > ? ORDER BY seq",
+            [job_id, after_seq],
+            limit,
+            0,
+        )
+        return [JobLogEntry(seq=seq, timestamp=created_at, message=message) for seq, created_at, message in self.db.fetchall(sql, params)]
@@ -1,25 +1,190 @@
-"""Structure analysis using LLM prompts with deterministic fallback."""
+"""Structure analysis using LLM prompts with deterministic fallback.
+
+Manuscripts longer than ``LLM_CHUNK_TOKENS`` are analyzed map-reduce style: the
+Markdown is split on headings (or paragraphs, for oversized sections), the chunks
+are analyzed concurrently (at most ``LLM_MAX_CONCURRENCY`` at a time), a chunk
+whose request fails or whose reply does not parse falls back to its headings, and
+the partial results are merged into one normalized document with unique figure,
+table and equation labels.
+"""
 from __future__ import annotations
 
+import asyncio
+import re
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
 
 from .llm.client import LLMClient
+from .llm.streaming import ItemCallback
+from ..config import get_settings
 from ..constants.prompts import analysis_prompt_v1
 
+ProgressCallback = Callable[[str], None]
+
+CHARS_PER_TOKEN = 4
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_LABEL_PREFIXES = {"figures": "fig", "tables": "tab", "equations": "eq"}
+
 
 @dataclass
 class StructureResult:
     normalized: Dict[str, Any]
 
 
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    """Split a block that exceeds the budget on paragraphs, then hard-wrap what is left."""
+
+    pieces: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", block):
+        while len(paragraph) > max_chars:
+            room = max_chars - len(current) - 2 if current else max_chars
+            if room < max_chars // 4:
+                pieces.append(current)
+                current, room = "", max_chars
+            # Cut at a word boundary and keep a short lead-in (such as the heading) attached.
+            cut = paragraph.rfind(" ", 0, room)
+            cut = cut if cut > 0 else room
+            head, paragraph = paragraph[:cut], paragraph[cut:].lstrip()
+            pieces.append(f"{current}\n\n{head}" if current else head)
+            current = ""
+        if current and len(current) + 2 + len(paragraph) > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_markdown(markdown: str, max_tokens: int) -> List[str]:
+    """Split ``markdown`` into chunks of at most ``max_tokens`` (estimated), on headings where possible."""
+
+    max_chars = max(max_tokens, 1) * CHARS_PER_TOKEN
+    sections: List[str] = []
+    current: List[str] = []
+    for line in markdown.splitlines():
+        if _HEADING.match(line) and current:
+            sections.append("\n".join(current).strip("\n"))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip("\n"))
+
+    chunks: List[str] = []
+    buffer = ""
+    for section in filter(None, sections):
+        parts = _split_oversized(section, max_chars) if len(section) > max_chars else [section]
+        for part in parts:
+            candidate = f"{buffer}\n\n{part}" if buffer else part
+            if len(candidate) > max_chars and buffer:
+                chunks.append(buffer)
+                candidate = part
+            buffer = candidate
+    if buffer:
+        chunks.append(buffer)
+    return chunks or [markdown]
+
+
+def heading_sections(markdown: str) -> List[Dict[str, Any]]:
+    """Deterministic sections for a chunk the model could not structure."""
+
+    sections: List[Dict[str, Any]] = []
+    name, lines = "Body", []
+    for line in markdown.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            if "\n".join(lines).strip():
+                sections.append({"name": name, "content": "\n".join(lines).strip(), "citations": []})
+            name, lines = match.group(2), []
+        else:
+            lines.append(line)
+    if "\n".join(lines).strip() or not sections:
+        sections.append({"name": name, "content": "\n".join(lines).strip(), "citations": []})
+    return sections
+
+
+def merge_chunks(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduce per-chunk results, in document order, into one normalized document."""
+
+    merged: Dict[str, Any] = {"title": None, "sections": [], "figures": [], "tables": [], "equations": []}
+    used_labels: set[str] = set()
+    for index, part in enumerate(parts, start=1):
+        renames: Dict[str, str] = {}
+        for key, prefix in _LABEL_PREFIXES.items():
+            for position, item in enumerate(part.get(key) or [], start=1):
+                item = dict(item)
+                label = item.get("label") or f"{prefix}:chunk{index}-{position}"
+                unique = label
+                suffix = 2
+                while unique in used_labels:
+                    unique = f"{label}-{suffix}"
+                    suffix += 1
+                if unique != label and item.get("label"):
+                    renames[label] = unique
+                item["label"] = unique
+                used_labels.add(unique)
+                merged[key].append(item)
+        for section in part.get("sections") or []:
+            section = dict(section)
+            content = section.get("content") or ""
+            for old, new in renames.items():
+                content = re.sub(rf"(?<![\w:-]){re.escape(old)}(?![\w:-])", new, content)
+            section["content"] = content
+            merged["sections"].append(section)
+        for key, value in part.items():
+            if key == "title":
+                if not merged["title"] and value and value != "Untitled Manuscript":
+                    merged["title"] = value
+            elif key == "sections" or key in _LABEL_PREFIXES:
+                continue
+            elif isinstance(value, list):
+                existing = merged.setdefault(key, [])
+                existing.extend(item for item in value if item not in existing)
+            elif value and not merged.get(key):
+                merged[key] = value
+    merged["title"] = merged["title"] or "Untitled Manuscript"
+    return merged
+
+
+def _section_reporter(on_progress: ProgressCallback | None, prefix: str = "") -> ItemCallback | None:
+    """Report each section as soon as the streamed reply completes it."""
+
+    if on_progress is None:
+        return None
+
+    def _on_item(key: str | None, item: Any) -> None:
+        if key == "sections" and isinstance(item, dict):
+            on_progress(f"{prefix}Section parsed: {item.get('name') or 'untitled'}")
+
+    return _on_item
+
+
 class StructureAnalyzer:
-    def __init__(self, client: LLMClient | None = None) -> None:
+    def __init__(
+        self,
+        client: LLMClient | None = None,
+        chunk_tokens: int | None = None,
+        max_concurrent_chunks: int | None = None,
+    ) -> None:
+        settings = get_settings()
         self.client = client or LLMClient()
+        self.chunk_tokens = chunk_tokens if chunk_tokens is not None else settings.llm_chunk_tokens
+        # The LLM limiter rejects callers beyond its waiting queue, so the fan-out is bounded here.
+        self.max_concurrent_chunks = max(1, max_concurrent_chunks or settings.llm_max_concurrency)
 
-    async def analyze(self, markdown: str) -> StructureResult:
+    async def analyze(self, markdown: str, on_progress: ProgressCallback | None = None) -> StructureResult:
+        if self.chunk_tokens > 0 and estimate_tokens(markdown) > self.chunk_tokens:
+            return await self._analyze_chunked(markdown, on_progress)
         payload = analysis_prompt_v1.replace("{markdown}", markdown)
-        response = await self.client.complete_json(payload)
+        response = await self.client.complete_json(
+            payload, prompt_version="analysis_prompt_v1", on_item=_section_reporter(on_progress)
+        )
         if response:
             return StructureResult(normalized=response)
         # fallback minimal structure
@@ -33,3 +198,37 @@ class StructureAnalyzer:
                 "tables": [],
             }
         )
+
+    async def _analyze_chunked(self, markdown: str, on_progress: ProgressCallback | None) -> StructureResult:
+        chunks = split_markdown(markdown, self.chunk_tokens)
+        total = len(chunks)
+        report = on_progress or (lambda message: None)
+        report(f"Analyzing {total} chunks of up to ~{self.chunk_tokens} tokens")
+        done = 0
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+
+        async def _map(index: int, chunk: str) -> Dict[str, Any]:
+            nonlocal done
+            payload = analysis_prompt_v1.replace("{markdown}", chunk)
+            try:
+                async with semaphore:
+                    response = await self.client.complete_json(
+                        payload,
+                        prompt_version="analysis_prompt_v1",
+                        on_item=_section_reporter(on_progress, f"Chunk {index}/{total}: "),
+                    )
+            except Exception as exc:
+                done += 1
+                report(f"Chunk {index}/{total} failed ({exc}); using its headings ({done}/{total} done)")
+                return {"sections": heading_sections(chunk)}
+            done += 1
+            if isinstance(response, dict):
+                report(f"Chunk {index}/{total} analyzed ({done}/{total} done)")
+                return response
+            report(f"Chunk {index}/{total} could not be parsed; using its headings ({done}/{total} done)")
+            return {"sections": heading_sections(chunk)}
+
+        parts = await asyncio.gather(*(_map(index, chunk) for index, chunk in enumerate(chunks, start=1)))
+        merged = merge_chunks(list(parts))
+        report(f"Merged {total} chunks into {len(merged['sections'])} sections")
+        return StructureResult(normalized=merged)
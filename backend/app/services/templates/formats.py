@@ -0,0 +1,132 @@
+"""Precompiled preamble formats for templates.
+
+The static preamble of a template (``\\documentclass`` and the ``\\usepackage`` lines
+before the first Jinja expression) is dumped once into a ``.fmt`` file with
+``pdflatex -ini``. Builds whose ``main.tex`` starts with exactly that preamble load
+the format instead of re-reading the class and packages on every run.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from ...config import get_settings, project_storage_root
+from ..process_runner import CommandTimeoutError, run_command
+from .registry import TEMPLATES_DIR, TemplateMetadata, TemplateRegistry
+
+logger = logging.getLogger(__name__)
+
+_JINJA_MARKUP = re.compile(r"\{\{|\{%|\{#")
+
+
+@dataclass
+class PreambleFormat:
+    template_id: str
+    fmt_path: Path
+    preamble: str
+
+    def matches(self, source: str) -> bool:
+        return source.startswith(self.preamble)
+
+    def body(self, source: str) -> str:
+        """The part of ``source`` that still has to be typeset after loading the format."""
+
+        return source[len(self.preamble):]
+
+
+def extract_preamble(template_source: str) -> str | None:
+    """Leading lines of a template that render verbatim and precede ``\\begin{document}``."""
+
+    lines = []
+    for line in template_source.splitlines(keepends=True):
+        if _JINJA_MARKUP.search(line) or "\\begin{document}" in line:
+            break
+        lines.append(line)
+    preamble = "".join(lines)
+    if "\\documentclass" not in preamble:
+        return None
+    return preamble
+
+
+class PreambleFormatStore:
+    def __init__(self, root: Path | None = None, registry: TemplateRegistry | None = None, timeout: float | None = None) -> None:
+        settings = get_settings()
+        self.root = root or project_storage_root(settings) / "formats"
+        self.registry = registry
+        self.timeout = timeout if timeout is not None else settings.compile_timeout_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._failed: Set[Tuple[str, str]] = set()
+
+    def _paths(self, template_id: str) -> tuple[Path, Path]:
+        return self.root / f"{template_id}.fmt", self.root / f"{template_id}.preamble.tex"
+
+    def _template_preamble(self, metadata: TemplateMetadata) -> str | None:
+        source = TEMPLATES_DIR / metadata.assets_path / "main.tex.j2"
+        if not source.exists():
+            return None
+        return extract_preamble(source.read_text(encoding="utf-8"))
+
+    def get(self, template_id: str) -> PreambleFormat | None:
+        """Return a format that is already built for the template's current preamble."""
+
+        fmt_path, preamble_path = self._paths(template_id)
+        if not fmt_path.exists() or not preamble_path.exists():
+            return None
+        return PreambleFormat(template_id, fmt_path.resolve(), preamble_path.read_text(encoding="utf-8"))
+
+    async def ensure(self, template_id: str) -> PreambleFormat | None:
+        """Return the template's format, (re)building it if missing or out of date."""
+
+        registry = self.registry or TemplateRegistry()
+        metadata = registry.get(template_id)
+        if metadata is None or metadata.engine != "pdflatex":
+            return None
+        preamble = self._template_preamble(metadata)
+        if preamble is None:
+            return None
+        lock = self._locks.setdefault(template_id, asyncio.Lock())
+        async with lock:
+            existing = self.get(template_id)
+            if existing is not None and existing.preamble == preamble:
+                return existing
+            if (template_id, preamble) in self._failed:
+                return None
+            built = await self._build(metadata, preamble)
+            if built is None:
+                # Don't retry a failing dump on every compile; a changed preamble gets a new attempt.
+                self._failed.add((template_id, preamble))
+            return built
+
+    async def _build(self, metadata: TemplateMetadata, preamble: str) -> PreambleFormat | None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fmt_path, preamble_path = self._paths(metadata.identifier)
+        source_path = self.root / f"{metadata.identifier}.dump.tex"
+        source_path.write_text(preamble, encoding="utf-8")
+        command = [
+            "pdflatex",
+            "-ini",
+            "-interaction=nonstopmode",
+            "-halt-on-error",
+            f"-jobname={metadata.identifier}",
+            f"-output-directory={self.root.resolve()}",
+            f"&pdflatex {source_path.resolve()}\\dump",
+        ]
+        template_root = (TEMPLATES_DIR / metadata.assets_path).resolve()
+        try:
+            result = await run_command(command, cwd=template_root if template_root.is_dir() else None, timeout=self.timeout)
+        except (FileNotFoundError, CommandTimeoutError) as exc:
+            logger.warning("Could not build preamble format for %s: %s", metadata.identifier, exc)
+            return None
+        if result.returncode != 0 or not fmt_path.exists():
+            logger.warning("Could not build preamble format for %s:\n%s", metadata.identifier, result.tail())
+            return None
+        preamble_path.write_text(preamble, encoding="utf-8")
+        return PreambleFormat(metadata.identifier, fmt_path.resolve(), preamble)
+
+    def discard(self, template_id: str) -> None:
+        for path in self._paths(template_id):
+            path.unlink(missing_ok=True)
@@ -1,9 +1,14 @@
 """Celery application configuration."""
 from __future__ import annotations
 
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from ..config import get_settings
+from ..services.http_pool import get_http_pool
 
 settings = get_settings()
 
@@ -14,3 +19,37 @@ celery_app = Celery(
 )
 
 celery_app.conf.update(task_serializer="json", result_serializer="json", accept_content=["json"])
+
+T = TypeVar("T")
+
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the worker's long-lived event loop.
+
+    ``asyncio.run`` would create and close a loop per task, discarding the pooled HTTP
+    connections with it; reusing one loop keeps them alive across tasks.
+    """
+
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def _init_worker(**_kwargs: Any) -> None:
+    global _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    get_http_pool()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker(**_kwargs: Any) -> None:
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    _worker_loop.run_until_complete(get_http_pool().aclose())
+    _worker_loop.close()
+    _worker_loop = None
@@ -1,35 +1,108 @@
-"""Celery tasks for the manuscript pipeline."""
+"""Celery tasks for the manuscript pipeline.
+
+When a ``job_id`` is supplied the task reports progress through the shared
+:class:`JobManager`; with ``EVENT_BUS=redis`` those lines reach SSE subscribers on
+any API worker.
+"""
 from __future__ import annotations
 
-import asyncio
+from .celery_app import celery_app, run_async
+from ..models.core import JobStatus
+from ..services.bib_manager import BibManager
+from ..services.citation_detector import CitationDetector, describe_slot
+from ..services.reference_retriever import ReferenceRetriever, RetrievalResult, describe_update
+from ..services.runtime import job_manager
+from ..services.storage import create_project_repository
+
+
+def _emit(job_id: str | None, message: str) -> None:
+    if job_id:
+        job_manager.emit(job_id, message)
 
-from .celery_app import celery_app
-from ..services.citation_detector import CitationDetector
-from ..services.reference_retriever import ReferenceRetriever
-from ..services.storage import ProjectRepository
+
+def _finish(job_id: str | None, result: dict | None = None, error: str | None = None) -> None:
+    if not job_id:
+        return
+    status = JobStatus.failed if error else JobStatus.completed
+    job_manager.repository.mark_status(job_id, status, error=error, result=result)
+    job_manager.complete(job_id)
 
 
 @celery_app.task(name="pipeline.detect_citations")
-def detect_citations_task(project_id: str) -> dict:
-    repo = ProjectRepository()
+def detect_citations_task(project_id: str, job_id: str | None = None) -> dict:
+    repo = create_project_repository()
     project = repo.get(project_id)
     if not project:
+        _finish(job_id, error="Project not found")
         raise ValueError("Project not found")
-    detector = CitationDetector()
-    result = asyncio.run(detector.detect(project.manuscript.content))
-    project.citation_slots = result.slots
-    repo.save(project)
-    return {"count": len(result.slots)}
+    try:
+        detector = CitationDetector()
+        _emit(job_id, "Starting citation detection")
+        result = run_async(
+            detector.detect(
+                project.manuscript.content,
+                previous=project.citation_slots,
+                on_slot=lambda slot: _emit(job_id, describe_slot(slot)),
+            )
+        )
+        project.citation_slots = result.slots
+        repo.save(project)
+        _emit(
+            job_id,
+            f"Detected {len(result.slots)} candidate citations "
+            f"({result.reused} unchanged sentences reused, {result.decided_by_rules} decided by rules)",
+        )
+        summary = {"count": len(result.slots), "decided_by_rules": result.decided_by_rules, "reused": result.reused}
+        _finish(job_id, result=summary)
+        return summary
+    except Exception as exc:
+        _finish(job_id, error=str(exc))
+        raise
+
+
+async def _stream_references(retriever: ReferenceRetriever, query: str, job_id: str | None) -> RetrievalResult:
+    stream = retriever.stream(query)
+    async for update in stream:
+        _emit(job_id, describe_update(update))
+    return stream.result()
 
 
 @celery_app.task(name="pipeline.search_references")
-def search_references_task(project_id: str, query: str) -> dict:
-    repo = ProjectRepository()
+def search_references_task(project_id: str, query: str, job_id: str | None = None, mode: str = "title") -> dict:
+    repo = create_project_repository()
     project = repo.get(project_id)
     if not project:
+        _finish(job_id, error="Project not found")
         raise ValueError("Project not found")
-    retriever = ReferenceRetriever()
-    result = asyncio.run(retriever.search(query))
-    project.references = result.references
-    repo.save(project)
-    return {"count": len(result.references)}
+    try:
+        retriever = ReferenceRetriever()
+        if mode == "slots":
+            _emit(job_id, f"Searching references for {len(project.citation_slots)} citation slots")
+            slot_result = run_async(
+                retriever.search_slots(
+                    project.citation_slots,
+                    on_result=lambda group, found: _emit(
+                        job_id, f"{len(found)} candidates for {len(group.slots)} slot(s): {group.query[:80]}"
+                    ),
+                )
+            )
+            bib_manager = BibManager()
+            for position, found in slot_result.candidates.items():
+                keys = list(dict.fromkeys(bib_manager.normalize_key(reference) for reference in found))
+                project.citation_slots[position] = project.citation_slots[position].copy(update={"candidates": keys})
+            references = slot_result.references
+        else:
+            _emit(job_id, f"Searching references with query: {query[:80]}")
+            retrieval = run_async(_stream_references(retriever, query, job_id))
+            if retrieval.cancelled:
+                _emit(job_id, f"Deadline reached; cancelled {', '.join(retrieval.cancelled)}")
+            references = retrieval.references
+        project.references = references
+        repo.save(project)
+        _emit(job_id, f"Aggregated {len(references)} references")
+        summary = {"count": len(references)}
+        _finish(job_id, result=summary)
+        return summary
+    except Exception as exc:
+        _finish(job_id, error=str(exc))
+        raise
@@ -64,7 +64,7 @@ export default function ProjectPage({ params }: { params: { id: string } }) {
   const handleCompile = async () => {
     const response = await triggerCompile(projectId);
     setActiveJobId(response.job_id ?? null);
-    setMessage(`Compilation finished. PDF stored at ${response.pdf_path ?? 'pending'}.`);
+    setMessage('Compilation started. Follow the compiler output in the task log; the PDF appears under artifacts when done.');
     refreshArtifacts();
   };
 
@@ -34,9 +34,9 @@ export async function triggerCitationDetection(projectId: string) {
   );
 }
 
-export async function triggerReferenceSearch(projectId: string) {
+export async function triggerReferenceSearch(projectId: string, mode: 'title' | 'slots' = 'title') {
   return jsonFetch<{ project_id: string; references: Reference[]; job_id?: string }>(
-    `${API_BASE}/api/projects/${projectId}/search-refs`,
+    `${API_BASE}/api/projects/${projectId}/search-refs?mode=${mode}`,
     { method: 'POST' }
   );
 }
@@ -67,20 +67,51 @@ export async function fetchArtifacts(projectId: string) {
 
 export function streamJob(jobId: string, onMessage: (line: string) => void, signal?: AbortSignal) {
   const url = `${API_BASE}/api/jobs/${jobId}/stream`;
-  fetch(url, { signal }).then(async (res) => {
+  let lastEventId: string | undefined;
+  let retryMs = 3000;
+  let completed = false;
+
+  const connect = async (): Promise<void> => {
+    const res = await fetch(url, {
+      signal,
+      headers: lastEventId ? { 'Last-Event-ID': lastEventId } : undefined
+    });
     if (!res.body) return;
     const reader = res.body.getReader();
     const parser = createParser((event) => {
+      if (event.type === 'reconnect-interval') {
+        retryMs = event.value;
+        return;
+      }
       if (event.type === 'event' && event.data) {
-        if (event.data === '__COMPLETE__') return;
+        if (event.id) lastEventId = event.id;
+        if (event.data === '__COMPLETE__') {
+          completed = true;
+          return;
+        }
         onMessage(event.data);
       }
     });
+    const decoder = new TextDecoder();
     while (true) {
       const { done, value } = await reader.read();
       if (done) break;
-      const chunk = new TextDecoder().decode(value);
-      parser.feed(chunk);
+      parser.feed(decoder.decode(value, { stream: true }));
     }
-  });
+  };
+
+  const run = async () => {
+    // Reconnect after dropped connections; the server replays only events after Last-Event-ID.
+    while (!completed && !signal?.aborted) {
+      try {
+        await connect();
+      } catch (err) {
+        if (signal?.aborted) return;
+      }
+      if (!completed && !signal?.aborted) {
+        await new Promise((resolve) => setTimeout(resolve, retryMs));
+      }
+    }
+  };
+  void run();
 }
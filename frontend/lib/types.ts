@@ -21,6 +21,9 @@ export type CitationSlot = {
   query_terms: string[];
   confidence: number;
   status: string;
+  sentence_hash?: string | null;
+  offset?: number | null;
+  candidates?: string[];
 };
 
 export type Reference = {
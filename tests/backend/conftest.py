@@ -4,12 +4,21 @@ from pathlib import Path
 import pytest
 
 from backend.app import config
+from backend.app.services.llm import get_llm_cache
+from backend.app.services.reference.cache import get_reference_cache
+from backend.app.services.reference.resilience import get_provider_guards
 
 
 @pytest.fixture(autouse=True)
 def reset_settings(tmp_path: Path):
     config.get_settings.cache_clear()  # type: ignore[attr-defined]
+    get_llm_cache.cache_clear()
+    get_reference_cache.cache_clear()
+    get_provider_guards.cache_clear()
     os.environ["STORAGE_ROOT"] = str(tmp_path / "storage")
     yield
     config.get_settings.cache_clear()  # type: ignore[attr-defined]
+    get_llm_cache.cache_clear()
+    get_reference_cache.cache_clear()
+    get_provider_guards.cache_clear()
     os.environ.pop("STORAGE_ROOT", None)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.models.core import CitationSlot
+from backend.app.services.citation_detector import CitationDetector, make_batches
+
+
+def test_batches_carry_overlapping_context():
+    sentences = [f"S{index}." for index in range(7)]
+    batches = make_batches(sentences, size=3, overlap=1)
+    assert [batch.core for batch in batches] == [["S0.", "S1.", "S2."], ["S3.", "S4.", "S5."], ["S6."]]
+    assert [batch.context for batch in batches] == [[], ["S2."], ["S5."]]
+    assert make_batches(sentences, size=0, overlap=1)[0].core == sentences
+
+
+class BatchClient:
+    def __init__(self, fail_once=(), fail_always=(), raise_always=()):
+        self.fail_once = set(fail_once)
+        self.fail_always = set(fail_always)
+        self.raise_always = set(raise_always)
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def complete_json(self, prompt, prompt_version=None, use_cache=True, on_item=None):
+        sentences = json.loads(prompt.rsplit("Input:", 1)[1])
+        self.calls.append((sentences, use_cache))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        first = sentences[0]
+        if first in self.raise_always:
+            raise RuntimeError("transport error")
+        if first in self.fail_always:
+            return None
+        if first in self.fail_once:
+            self.fail_once.discard(first)
+            return "not a list"
+        return [
+            {"sentence": sentence, "need_citation": True, "reasons": ["llm"], "query_terms": [], "confidence": 0.9}
+            for sentence in sentences
+        ]
+
+
+@pytest.mark.asyncio
+async def test_batches_run_concurrently_and_merge_in_order():
+    client = BatchClient()
+    detector = CitationDetector(client=client, batch_sentences=2, batch_overlap=1)
+    text = " ".join(f"Sentence {index}." for index in range(6))
+    seen = []
+    result = await detector.detect(text, on_slot=seen.append)
+    assert [slot.sentence for slot in result.slots] == [f"Sentence {index}." for index in range(6)]
+    assert client.peak == 3
+    assert client.calls[1][0] == ["Sentence 1.", "Sentence 2.", "Sentence 3."]
+    assert sorted(slot.sentence for slot in seen) == sorted(slot.sentence for slot in result.slots)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_retries_then_falls_back_alone():
+    client = BatchClient(fail_once={"Our dataset is new."}, fail_always={"Sentence 2."})
+    detector = CitationDetector(client=client, batch_sentences=2, batch_overlap=0)
+    result = await detector.detect("Sentence 0. Sentence 1. Sentence 2. Sentence 3. Our dataset is new. Done.")
+    reasons = [slot.reasons for slot in result.slots]
+    assert reasons[:2] == [["llm"], ["llm"]]
+    assert reasons[2:4] == [["general statement"], ["general statement"]]
+    assert reasons[4:] == [["llm"], ["llm"]]
+    retried = [use_cache for sentences, use_cache in client.calls if sentences[0] == "Our dataset is new."]
+    assert retried == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_batch_whose_request_raises_falls_back_alone():
+    client = BatchClient(raise_always={"Sentence 2."})
+    detector = CitationDetector(client=client, batch_sentences=2, batch_overlap=0, max_concurrent_batches=2)
+    seen = []
+    result = await detector.detect(" ".join(f"Sentence {index}." for index in range(8)), on_slot=seen.append)
+    reasons = [slot.reasons for slot in result.slots]
+    assert reasons[2:4] == [["general statement"], ["general statement"]]
+    assert reasons[:2] == reasons[4:6] == reasons[6:] == [["llm"], ["llm"]]
+    assert [use_cache for sentences, use_cache in client.calls if sentences[0] == "Sentence 2."] == [True, False]
+    assert len(seen) == 8
+    assert client.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_rules_decide_obvious_sentences_without_the_llm():
+    client = BatchClient()
+    detector = CitationDetector(client=client, batch_sentences=10)
+    result = await detector.detect("Previous studies reported 12% gains. Models can memorize data. We present results in Section 4.")
+    assert [sentences for sentences, _ in client.calls] == [["Models can memorize data."]]
+    assert [slot.need_citation for slot in result.slots] == [True, True, False]
+    assert result.slots[1].reasons == ["llm"]
+    assert result.decided_by_rules == 2
+
+
+@pytest.mark.asyncio
+async def test_redetection_only_classifies_changed_sentences():
+    client = BatchClient()
+    detector = CitationDetector(client=client, batch_sentences=10)
+    first = await detector.detect("Alpha is large. Beta is small. Gamma is odd.")
+    first.slots[1] = first.slots[1].copy(update={"status": "confirmed"})
+    client.calls.clear()
+
+    edited = "Intro line here. Alpha is large.  Beta is small. Gamma is even."
+    second = await detector.detect(edited, previous=first.slots)
+    assert [sentences for sentences, _ in client.calls] == [["Intro line here.", "Gamma is even."]]
+    assert second.reused == 2
+    assert [slot.status for slot in second.slots] == ["pending", "pending", "confirmed", "pending"]
+    for slot in second.slots:
+        assert edited[slot.offset : slot.offset + len(slot.sentence)] == slot.sentence
+        assert slot.sentence_hash
+
+
+class SparseClient(BatchClient):
+    """Replies with sentence and need_citation only, streaming the items too."""
+
+    async def complete_json(self, prompt, prompt_version=None, use_cache=True, on_item=None):
+        sentences = json.loads(prompt.rsplit("Input:", 1)[1])
+        self.calls.append((sentences, use_cache))
+        items = [{"sentence": sentence, "need_citation": True} for sentence in sentences]
+        for item in items:
+            if on_item is not None:
+                on_item(None, item)
+        return items
+
+
+@pytest.mark.asyncio
+async def test_invalid_items_are_retried_then_fall_back_to_rules():
+    client = SparseClient()
+    detector = CitationDetector(client=client, batch_sentences=10)
+    seen = []
+    result = await detector.detect("Models can memorize data. Weights decay slowly.", on_slot=seen.append)
+    assert [use_cache for _, use_cache in client.calls] == [True, False]
+    assert [slot.reasons for slot in result.slots] == [["general statement"], ["general statement"]]
+    assert [slot.sentence for slot in seen] == ["Models can memorize data.", "Weights decay slowly."]
+
+
+@pytest.mark.asyncio
+async def test_redetection_keeps_status_of_slots_saved_without_hashes():
+    client = BatchClient()
+    detector = CitationDetector(client=client, batch_sentences=10)
+    legacy = [
+        {"sentence": "Alpha is large.", "need_citation": True, "reasons": [], "query_terms": [], "confidence": 0.8, "status": "confirmed"},
+        {"sentence": "Beta is small.", "need_citation": False, "reasons": [], "query_terms": [], "confidence": 0.8, "status": "rejected"},
+    ]
+    result = await detector.detect("Alpha is large. Beta  is small.", previous=[CitationSlot(**slot) for slot in legacy])
+    assert client.calls == []
+    assert [slot.status for slot in result.slots] == ["confirmed", "rejected"]
+    assert all(slot.sentence_hash for slot in result.slots)
+    assert result.reused == 2
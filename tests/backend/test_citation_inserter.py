@@ -0,0 +1,43 @@
+from backend.app.models.core import CitationSlot
+from backend.app.services.citation_bench import benchmark_insertion, synthetic_manuscript
+from backend.app.services.citation_inserter import CitationInserter
+
+
+def _slot(sentence, key, status="confirmed"):
+    return CitationSlot(sentence=sentence, need_citation=True, reasons=[key], query_terms=[], confidence=0.9, status=status)
+
+
+def test_each_slot_cites_one_occurrence_and_untouched_sections_are_shared():
+    normalized = {
+        "title": "Doc",
+        "sections": [
+            {"name": "A", "content": "Claims repeat. Other text. Claims repeat."},
+            {"name": "B", "content": "Nothing to cite here."},
+            {"name": "C", "content": "A claim inside a list item - spanning, oddly"},
+        ],
+    }
+    slots = [
+        _slot("Claims repeat.", "smith2020"),
+        _slot("spanning, oddly", "doe2021"),
+        _slot("Other text.", "skip", status="pending"),
+    ]
+    result = CitationInserter().apply(normalized, slots, [])
+    assert result["sections"][0]["content"] == "Claims repeat. \\citep{smith2020} Other text. Claims repeat."
+    assert result["sections"][2]["content"] == "A claim inside a list item - spanning, oddly \\citep{doe2021}"
+    assert result["sections"][1] is normalized["sections"][1]
+    assert normalized["sections"][0]["content"] == "Claims repeat. Other text. Claims repeat."
+
+
+def test_reapplying_does_not_duplicate_citations():
+    normalized = {"sections": [{"content": "A claim. Another claim."}]}
+    slots = [_slot("A claim.", "k1"), _slot("A claim.", "k1")]
+    once = CitationInserter().apply(normalized, slots[:1], [])
+    twice = CitationInserter().apply(once, slots, [])
+    assert twice["sections"][0]["content"] == "A claim. \\citep{k1} Another claim."
+
+
+def test_thousands_of_slots_are_all_inserted():
+    document, citations = synthetic_manuscript(sections=50, slots=2000)
+    result = CitationInserter().apply(document, citations, [])
+    assert sum(section["content"].count("\\citep{") for section in result["sections"]) == 2000
+    assert benchmark_insertion(sections=5, slots=50)["slots"] == 50
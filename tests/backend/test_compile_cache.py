@@ -0,0 +1,116 @@
+import os
+import sys
+
+import pytest
+
+from backend.app.models.core import CompileEngine, CompileOptions
+from backend.app.services.compile_cache import CompileCache
+from backend.app.services.latex_builder import AsyncLatexBuilder
+
+
+def _project(tmp_path):
+    workdir = tmp_path / "project"
+    workdir.mkdir()
+    (workdir / "main.tex").write_text("\\documentclass{article}", encoding="utf-8")
+    (workdir / "references.bib").write_text("@article{a, title={A}}", encoding="utf-8")
+    return workdir
+
+
+def test_key_changes_with_inputs_engine_and_options(tmp_path):
+    cache = CompileCache(tmp_path / "cache", max_bytes=1 << 20)
+    workdir = _project(tmp_path)
+    main_tex = workdir / "main.tex"
+    key = cache.key_for(workdir, main_tex, CompileEngine.latexmk)
+
+    (workdir / "main.pdf").write_bytes(b"%PDF-output")
+    (workdir / "main.aux").write_text("aux", encoding="utf-8")
+    assert cache.key_for(workdir, main_tex, CompileEngine.latexmk) == key
+
+    assert cache.key_for(workdir, main_tex, CompileEngine.tectonic) != key
+    options = CompileOptions(engine=CompileEngine.latexmk, font_engine="xelatex")
+    assert cache.key_for(workdir, main_tex, CompileEngine.latexmk, options) != key
+
+    (workdir / "references.bib").write_text("@article{b, title={B}}", encoding="utf-8")
+    assert cache.key_for(workdir, main_tex, CompileEngine.latexmk) != key
+
+
+def test_store_lookup_and_restore(tmp_path):
+    cache = CompileCache(tmp_path / "cache", max_bytes=1 << 20)
+    pdf = tmp_path / "built.pdf"
+    pdf.write_bytes(b"%PDF-1.5 data")
+    assert cache.lookup("k1") is None
+
+    cache.store("k1", pdf, ["Latexmk: done"])
+    entry = cache.lookup("k1")
+    assert entry is not None
+    assert cache.read_log(entry) == ["Latexmk: done"]
+    restored = cache.restore(entry, tmp_path / "restored.pdf")
+    assert restored.read_bytes() == b"%PDF-1.5 data"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = CompileCache(tmp_path / "cache", max_bytes=2500)
+    for name in ("a", "b", "c"):
+        pdf = tmp_path / f"{name}.pdf"
+        pdf.write_bytes(name.encode() * 1000)
+        cache.store(name, pdf, [])
+        os.utime(cache._entry_path(name), (0, {"a": 10, "b": 20, "c": 30}[name]))
+    assert cache.peek("a") is None
+
+    cache.lookup("b")  # refreshes b, so c is now the oldest
+    pdf = tmp_path / "d.pdf"
+    pdf.write_bytes(b"d" * 1000)
+    cache.store("d", pdf, [])
+    assert cache.peek("b") is not None
+    assert cache.peek("c") is None
+    assert cache.size_bytes() <= 2500
+
+
+def test_shared_objects_survive_eviction_of_one_entry(tmp_path):
+    cache = CompileCache(tmp_path / "cache", max_bytes=1500)
+    pdf = tmp_path / "same.pdf"
+    pdf.write_bytes(b"x" * 1000)
+    cache.store("old", pdf, [])
+    os.utime(cache._entry_path("old"), (0, 0))
+    cache.store("new", pdf, [])
+    other = tmp_path / "other.pdf"
+    other.write_bytes(b"y" * 600)
+    cache.store("other", other, [])
+    assert cache.peek("other") is not None
+    assert cache.size_bytes() <= 1500
+
+
+@pytest.mark.asyncio
+async def test_builder_skips_compiler_when_inputs_are_unchanged(tmp_path, monkeypatch):
+    workdir = _project(tmp_path)
+    script = "open('main.pdf', 'wb').write(b'%PDF-built'); print('compiled')"
+    runs = []
+
+    def build_command(main_tex, engine):
+        runs.append(engine)
+        return [sys.executable, "-c", script]
+
+    monkeypatch.setattr(AsyncLatexBuilder, "build_command", staticmethod(build_command))
+    builder = AsyncLatexBuilder(workdir, timeout=30, cache=CompileCache(tmp_path / "cache"))
+    main_tex = workdir / "main.tex"
+
+    first: list[str] = []
+    await builder.compile_async(main_tex, CompileEngine.latexmk, on_output=first.append)
+    assert first[0] == "compiled"
+    assert await builder.probe_cache(main_tex, CompileEngine.latexmk) is not None
+    text = main_tex.read_text(encoding="utf-8")
+    assert await builder.probe_cache(main_tex, CompileEngine.latexmk, main_text=text) is not None
+    assert await builder.probe_cache(main_tex, CompileEngine.latexmk, main_text=text + "%") is None
+
+    (workdir / "main.pdf").unlink()
+    second: list[str] = []
+    pdf_path = await builder.compile_async(main_tex, CompileEngine.latexmk, on_output=second.append)
+    assert len(runs) == 1
+    assert pdf_path.read_bytes() == b"%PDF-built"
+    assert "reusing cached PDF" in second[0]
+
+    main_tex.write_text("\\documentclass{report}", encoding="utf-8")
+    await builder.compile_async(main_tex, CompileEngine.latexmk)
+    assert len(runs) == 2
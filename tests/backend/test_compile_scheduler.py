@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+from backend.app.models.core import JobStatus
+from backend.app.services.compile_scheduler import CompileScheduler
+from backend.app.services.events import InMemoryEventBus
+from backend.app.services.jobs import JobManager
+from backend.app.services.storage import JobRepository
+
+
+def _messages(manager: JobManager, job_id: str) -> list[str]:
+    return [entry.message for entry in manager.repository.read_logs(job_id)]
+
+
+async def _wait_finished(manager: JobManager, *job_ids: str) -> None:
+    for _ in range(200):
+        if all(manager.repository.get(job_id).status == JobStatus.completed for job_id in job_ids):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("jobs did not finish")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrency_and_honours_priority(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    scheduler = CompileScheduler(manager, max_concurrency=1)
+    gate = asyncio.Event()
+    order: list[str] = []
+    active = 0
+    peak = 0
+
+    def make_handler(name: str):
+        async def handler(job):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            order.append(name)
+            await gate.wait()
+            active -= 1
+            return {"name": name}
+
+        return handler
+
+    first, _ = await scheduler.submit("proj_a", make_handler("a"))
+    await asyncio.sleep(0.01)
+    low, _ = await scheduler.submit("proj_b", make_handler("b"))
+    high, _ = await scheduler.submit("proj_c", make_handler("c"), priority=5)
+    await asyncio.sleep(0.01)
+    assert scheduler.stats()["waiting"] == 2
+
+    gate.set()
+    await _wait_finished(manager, first.id, low.id, high.id)
+    assert order == ["a", "c", "b"]
+    assert peak == 1
+    assert any(msg.startswith("Queued for compilation: position 2 of 2") for msg in _messages(manager, low.id))
+    assert any(msg.startswith("Compile slot acquired after waiting") for msg in _messages(manager, low.id))
+    assert scheduler.stats() == {"running": 0, "waiting": 0, "max_concurrency": 1, "oldest_wait_seconds": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_request_joins_queued_job(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    scheduler = CompileScheduler(manager, max_concurrency=1)
+    gate = asyncio.Event()
+    runs: list[str] = []
+
+    async def handler(job):
+        runs.append(job.project_id)
+        await gate.wait()
+        return None
+
+    running, _ = await scheduler.submit("proj_a", handler)
+    await asyncio.sleep(0.01)
+    queued, joined_first = await scheduler.submit("proj_b", handler)
+    duplicate, joined_second = await scheduler.submit("proj_b", handler)
+    assert (joined_first, joined_second) == (False, True)
+    assert duplicate.id == queued.id
+
+    gate.set()
+    await _wait_finished(manager, running.id, queued.id)
+    assert runs == ["proj_a", "proj_b"]
+    assert "Another compile request for this project joined the queued job" in _messages(manager, queued.id)
+
+
+@pytest.mark.asyncio
+async def test_one_compile_per_project_and_options_must_match_to_join(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    scheduler = CompileScheduler(manager, max_concurrency=3)
+    gate = asyncio.Event()
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(job):
+        active[job.project_id] = active.get(job.project_id, 0) + 1
+        peak[job.project_id] = max(peak.get(job.project_id, 0), active[job.project_id])
+        await gate.wait()
+        active[job.project_id] -= 1
+        return None
+
+    running, _ = await scheduler.submit("proj_a", handler, options_key="draft")
+    await asyncio.sleep(0.01)
+    waiting, joined_running = await scheduler.submit("proj_a", handler, options_key="draft")
+    other_options, joined_other = await scheduler.submit("proj_a", handler, options_key="final")
+    same_options, joined_same = await scheduler.submit("proj_a", handler, options_key="final")
+    await asyncio.sleep(0.01)
+    assert (joined_running, joined_other, joined_same) == (False, False, True)
+    assert waiting.id != running.id and same_options.id == other_options.id
+    assert scheduler.stats()["running"] == 1 and scheduler.stats()["waiting"] == 2
+
+    gate.set()
+    await _wait_finished(manager, running.id, waiting.id, other_options.id)
+    assert peak == {"proj_a": 1}
+
+
+@pytest.mark.asyncio
+async def test_slotless_jobs_only_wait_for_their_project(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    scheduler = CompileScheduler(manager, max_concurrency=1)
+    gate = asyncio.Event()
+    restored: list[str] = []
+
+    async def blocking(job):
+        await gate.wait()
+        return None
+
+    async def restore(job):
+        restored.append(job.project_id)
+        return None
+
+    busy, _ = await scheduler.submit("proj_a", blocking)
+    await asyncio.sleep(0.01)
+    cached, _ = await scheduler.submit("proj_b", restore, needs_slot=False)
+    await _wait_finished(manager, cached.id)
+    assert restored == ["proj_b"]
+
+    behind, _ = await scheduler.submit("proj_a", restore, needs_slot=False)
+    await asyncio.sleep(0.05)
+    assert restored == ["proj_b"]
+    gate.set()
+    await _wait_finished(manager, busy.id, behind.id)
+    assert restored == ["proj_b", "proj_a"]
+
+
+@pytest.mark.asyncio
+async def test_slotless_job_takes_a_build_slot_when_it_must_build(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    scheduler = CompileScheduler(manager, max_concurrency=1)
+    gate = asyncio.Event()
+    built: list[str] = []
+
+    async def blocking(job):
+        await gate.wait()
+        return None
+
+    async def cache_miss(job):
+        async with scheduler.build_slot(job):
+            built.append(job.project_id)
+            assert scheduler.stats()["running"] == 1
+        return None
+
+    busy, _ = await scheduler.submit("proj_a", blocking)
+    await asyncio.sleep(0.01)
+    missed, _ = await scheduler.submit("proj_b", cache_miss, needs_slot=False)
+    await asyncio.sleep(0.05)
+    assert built == []  # the slot is taken by proj_a
+    assert scheduler.stats()["waiting"] == 1
+
+    # The project stays held while the job waits for its slot.
+    follower, _ = await scheduler.submit("proj_b", cache_miss, options_key="other", needs_slot=False)
+    gate.set()
+    await _wait_finished(manager, busy.id, missed.id, follower.id)
+    assert built == ["proj_b", "proj_b"]
+    assert any(msg.startswith("Compile slot acquired after waiting") for msg in _messages(manager, missed.id))
+    assert scheduler.stats()["running"] == 0
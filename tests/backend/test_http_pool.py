@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.app.services.http_pool import HttpClientPool
+from backend.app.services.reference.providers import CrossrefProvider
+
+respx = pytest.importorskip("respx")
+
+
+@pytest.mark.asyncio
+async def test_one_client_per_origin_is_reused():
+    pool = HttpClientPool(max_connections_per_host=4, max_keepalive_per_host=2)
+    first = pool.client("https://api.crossref.org/works")
+    assert pool.client("https://api.crossref.org/other?x=1") is first
+    assert pool.client("https://api.openalex.org/works") is not first
+    assert pool.stats()["origins"] == ["https://api.crossref.org", "https://api.openalex.org"]
+
+    await pool.aclose()
+    assert first.is_closed
+    assert pool.client("https://api.crossref.org/works") is not first
+
+
+def test_clients_are_not_shared_across_event_loops():
+    pool = HttpClientPool()
+
+    async def borrow():
+        return pool.client("https://api.crossref.org")
+
+    first = asyncio.run(borrow())
+    second = asyncio.run(borrow())
+    assert first is not second
+    assert pool.created == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_provider_requests_share_pooled_client(respx_mock):
+    route = respx_mock.get("https://api.crossref.org/works").mock(
+        return_value=httpx.Response(200, json={"message": {"items": [{"title": ["Pooled"], "DOI": "10.1/x"}]}})
+    )
+    pool = HttpClientPool()
+    provider = CrossrefProvider(pool=pool)
+    first = await provider.search("pooled")
+    await provider.search("pooled again")
+    assert first.records[0]["title"] == "Pooled"
+    assert route.call_count == 2
+    assert pool.created == 1
+    await pool.aclose()
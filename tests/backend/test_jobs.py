@@ -0,0 +1,322 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from backend.app.api.routes.jobs import format_sse
+from backend.app.models.core import JobStatus, PipelineStage
+from backend.app.services.events import COMPLETE_SENTINEL, InMemoryEventBus, JobEvent
+from backend.app.services.jobs import JobManager
+from backend.app.services.storage import JobRepository
+
+
+async def _collect(manager: JobManager, job_id: str, **kwargs) -> list[str]:
+    return [event.message async for event in manager.stream(job_id, **kwargs) if event is not None]
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_history_then_follows_live_events(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    release = asyncio.Event()
+
+    async def handler(job):
+        manager.emit(job.id, "first")
+        await release.wait()
+        manager.emit(job.id, "second")
+        return {"ok": True}
+
+    job = await manager.run_task("proj_1", PipelineStage.compile, handler)
+    await asyncio.sleep(0)
+    reader = asyncio.create_task(_collect(manager, job.id))
+    await asyncio.sleep(0.01)
+    release.set()
+    lines = await asyncio.wait_for(reader, timeout=1)
+    assert lines == ["first", "second", COMPLETE_SENTINEL]
+    assert manager.repository.get(job.id).status == JobStatus.completed
+
+
+@pytest.mark.asyncio
+async def test_events_from_another_worker_reach_subscribers(tmp_path):
+    # Two managers sharing storage and a bus stand in for two worker processes.
+    bus = InMemoryEventBus()
+    api_worker = JobManager(JobRepository(tmp_path), bus)
+    task_worker = JobManager(JobRepository(tmp_path), bus)
+    job = task_worker.repository.create(project_id="proj_1", stage=PipelineStage.reference_search)
+    task_worker.repository.mark_status(job.id, JobStatus.running)
+
+    reader = asyncio.create_task(_collect(api_worker, job.id))
+    await asyncio.sleep(0.01)
+    task_worker.emit(job.id, "Searching references")
+    task_worker.repository.mark_status(job.id, JobStatus.completed)
+    task_worker.complete(job.id)
+
+    assert await asyncio.wait_for(reader, timeout=1) == ["Searching references", COMPLETE_SENTINEL]
+    assert bus._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_of_finished_or_unknown_job_terminates(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    assert await asyncio.wait_for(_collect(manager, "job_missing"), timeout=1) == [COMPLETE_SENTINEL]
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_after_last_event_id(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    job = manager.repository.create(project_id="proj_1", stage=PipelineStage.compile)
+    for n in range(5):
+        manager.emit(job.id, f"line {n}")
+    manager.repository.mark_status(job.id, JobStatus.completed)
+
+    events = [event async for event in manager.stream(job.id, after_seq=3, replay_batch=1)]
+    assert [(event.seq, event.message) for event in events] == [(4, "line 3"), (5, "line 4"), (None, COMPLETE_SENTINEL)]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_heartbeats_while_idle(tmp_path):
+    manager = JobManager(JobRepository(tmp_path), InMemoryEventBus())
+    job = manager.repository.create(project_id="proj_1", stage=PipelineStage.compile)
+    manager.repository.mark_status(job.id, JobStatus.running)
+
+    stream = manager.stream(job.id, heartbeat=0.01)
+    assert await asyncio.wait_for(stream.__anext__(), timeout=1) is None
+    manager.emit(job.id, "late line")
+    event = await asyncio.wait_for(stream.__anext__(), timeout=1)
+    assert (event.seq, event.message) == (1, "late line")
+    await stream.aclose()
+
+
+def test_format_sse_includes_event_id_and_splits_lines():
+    assert format_sse(JobEvent(job_id="job_1", message="a\nb", seq=7)) == "id: 7\ndata: a\ndata: b\n\n"
+    assert format_sse(JobEvent(job_id="job_1", message=COMPLETE_SENTINEL)) == f"data: {COMPLETE_SENTINEL}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_coalesces_overflow_into_skipped_marker():
+    bus = InMemoryEventBus(buffer_size=2, overflow_policy="coalesce")
+    subscription = await bus.subscribe("job_1")
+    for seq in range(1, 6):
+        bus.publish(JobEvent(job_id="job_1", message=f"line {seq}", seq=seq))
+    bus.publish(JobEvent(job_id="job_1", message=COMPLETE_SENTINEL))
+
+    assert bus.stats()["max_depth"] == 3
+    received = [(await subscription.get(timeout=0)).message for _ in range(4)]
+    assert received == ["... 3 log lines skipped (slow consumer) ...", "line 4", "line 5", COMPLETE_SENTINEL]
+    assert bus.stats()["dropped_events"] == 3
+
+
+@pytest.mark.asyncio
+async def test_memory_bus_drop_oldest_and_evicts_on_disconnect():
+    bus = InMemoryEventBus(buffer_size=2, overflow_policy="drop_oldest")
+    first = await bus.subscribe("job_1")
+    second = await bus.subscribe("job_1")
+    for seq in range(1, 4):
+        bus.publish(JobEvent(job_id="job_1", message=f"line {seq}", seq=seq))
+
+    assert bus.stats()["subscribers"] == 2
+    assert bus.stats()["buffered_events"] == 4
+    assert [(await first.get(timeout=0)).seq for _ in range(2)] == [2, 3]
+    assert await first.get(timeout=0) is None
+
+    await first.close()
+    await second.close()
+    assert bus.stats()["jobs"] == 0
+    assert bus._subscribers == {}
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis stream commands used by :class:`RedisEventBus`."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[str, dict]]] = {}
+        self.ttls: dict[str, int] = {}
+        self.counter = 0
+        self.closed = False
+        self.sync_writes = 0
+        self.async_writes = 0
+        self.fail_async = False
+
+    # synchronous client
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.counter += 1
+        entry_id = f"{self.counter}-0"
+        entries = self.streams.setdefault(key, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[: len(entries) - maxlen]
+        return entry_id
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def close(self):
+        self.closed = True
+
+    # asyncio client
+    def async_pipeline(self, transaction=True):
+        return FakePipeline(self, asynchronous=True)
+
+    async def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+    async def xread(self, streams, block=None, count=None):
+        (key, last_id), = streams.items()
+        deadline = asyncio.get_running_loop().time() + (block or 0) / 1000
+        while True:
+            newer = [entry for entry in self.streams.get(key, []) if _entry_seq(entry[0]) > _entry_seq(last_id)]
+            if newer:
+                return [(key, newer[:count])]
+            if block is None or (block and asyncio.get_running_loop().time() >= deadline):
+                return []
+            await asyncio.sleep(0.005)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _entry_seq(entry_id: str) -> int:
+    return int(entry_id.split("-")[0])
+
+
+class FakePipeline:
+    def __init__(self, redis, asynchronous=False):
+        self.redis = redis
+        self.asynchronous = asynchronous
+        self.calls = []
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append(lambda: self.redis.xadd(*args, **kwargs))
+
+    def expire(self, *args):
+        self.calls.append(lambda: self.redis.expire(*args))
+
+    def execute(self):
+        if not self.asynchronous:
+            self.redis.sync_writes += 1
+            return [call() for call in self.calls]
+        return self._execute_async()
+
+    async def _execute_async(self):
+        await asyncio.sleep(0)
+        if self.redis.fail_async:
+            raise ConnectionError("redis unreachable")
+        self.redis.async_writes += 1
+        return [call() for call in self.calls]
+
+
+class FakeAsyncRedis:
+    """The asyncio client view of a :class:`FakeRedis`."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def pipeline(self, transaction=True):
+        return self.redis.async_pipeline(transaction)
+
+    def __getattr__(self, name):
+        return getattr(self.redis, name)
+
+
+def _redis_bus(**kwargs):
+    from backend.app.services.events import RedisEventBus
+
+    fake = FakeRedis()
+    return RedisEventBus("redis://fake", sync_client=fake, async_client=FakeAsyncRedis(fake), **kwargs), fake
+
+
+def test_redis_bus_publish_appends_expires_and_trims():
+    bus, fake = _redis_bus(stream_maxlen=3, ttl_seconds=60)
+    for number in range(5):
+        bus.publish(JobEvent(job_id="job1", message=f"line {number}", seq=number + 1))
+    bus.publish(JobEvent(job_id="job1", message=COMPLETE_SENTINEL))
+
+    entries = fake.streams["manuweaver:jobs:job1:events"]
+    assert [fields["message"] for _, fields in entries] == ["line 3", "line 4", COMPLETE_SENTINEL]
+    assert entries[0][1]["seq"] == "4" and entries[-1][1]["seq"] == ""
+    assert fake.ttls["manuweaver:jobs:job1:events"] == 60
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_subscribers_read_only_new_events_in_order():
+    bus, fake = _redis_bus()
+    bus.publish(JobEvent(job_id="job1", message="before subscribe", seq=1))
+    subscription = await bus.subscribe("job1")
+    assert await subscription.get(timeout=0.01) is None
+
+    bus.publish(JobEvent(job_id="job1", message="first", seq=2))
+    bus.publish(JobEvent(job_id="job1", message="second", seq=3))
+    bus.publish(JobEvent(job_id="other", message="elsewhere", seq=1))
+    first = await subscription.get(timeout=1)
+    assert (first.job_id, first.message, first.seq) == ("job1", "first", 2)
+    assert bus.stats()["buffered_events"] == 1
+    second = await subscription.get(timeout=1)
+    assert (second.message, second.seq) == ("second", 3)
+
+    waiter = asyncio.create_task(subscription.get())
+    await asyncio.sleep(0.02)
+    bus.publish(JobEvent(job_id="job1", message=COMPLETE_SENTINEL))
+    assert (await asyncio.wait_for(waiter, 1)).message == COMPLETE_SENTINEL
+
+    assert bus.stats()["subscribers"] == 1
+    await subscription.close()
+    assert bus.stats()["subscribers"] == 0
+    await bus.close()
+    assert fake.closed
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_publishes_from_the_event_loop_without_blocking_it():
+    bus, fake = _redis_bus(outbox_size=3)
+    for number in range(5):
+        bus.publish(JobEvent(job_id="job1", message=f"line {number}", seq=number + 1))
+    bus.publish(JobEvent(job_id="job1", message=COMPLETE_SENTINEL))
+    assert fake.sync_writes == 0 and "manuweaver:jobs:job1:events" not in fake.streams
+
+    await bus.flush()
+    entries = fake.streams["manuweaver:jobs:job1:events"]
+    assert [fields["message"] for _, fields in entries] == ["line 1", "line 2", COMPLETE_SENTINEL]
+    assert (fake.sync_writes, fake.async_writes) == (0, 1)
+    assert bus.stats()["dropped_events"] == 3
+
+    fake.fail_async = True
+    bus.publish(JobEvent(job_id="job1", message="lost", seq=6))
+    await bus.flush()
+    assert bus.stats()["dropped_events"] == 4 and bus.stats()["outbox"] == 0
+
+
+def test_pipeline_task_failure_marks_job_failed(tmp_path, monkeypatch):
+    pytest.importorskip("celery")
+    from backend.app.models.core import Manuscript, Project
+    from backend.app.tasks import pipeline
+
+    manager = JobManager(JobRepository(tmp_path / "jobs"), InMemoryEventBus())
+    project = Project(
+        id="proj_fail",
+        template_id="default",
+        created_at=datetime.utcnow(),
+        manuscript=Manuscript(filename="m.md", content="Claims. More claims."),
+    )
+
+    class Repo:
+        def get(self, project_id):
+            return project
+
+        def save(self, project):
+            pass
+
+    async def boom(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(pipeline, "job_manager", manager)
+    monkeypatch.setattr(pipeline, "create_project_repository", lambda: Repo())
+    monkeypatch.setattr(pipeline.CitationDetector, "detect", boom)
+    job = manager.repository.create(project_id=project.id, stage=PipelineStage.citation_detection)
+    manager.repository.mark_status(job.id, JobStatus.running)
+    with pytest.raises(RuntimeError):
+        pipeline.detect_citations_task.run(project.id, job.id)
+    stored = manager.repository.get(job.id)
+    assert stored.status == JobStatus.failed
+    assert stored.error == "model unavailable"
@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+from backend.app.models.core import CompileEngine, CompileOptions
+from backend.app.services.latex_builder import AsyncLatexBuilder
+from backend.app.services.templates.formats import PreambleFormat, extract_preamble
+
+TEMPLATE = """\\documentclass[journal]{IEEEtran}
+\\usepackage{amsmath}
+
+\\title{ {{ doc.title }} }
+\\begin{document}
+\\maketitle
+\\end{document}
+"""
+
+
+def test_extract_preamble_stops_at_first_jinja_line():
+    preamble = extract_preamble(TEMPLATE)
+    assert preamble == "\\documentclass[journal]{IEEEtran}\n\\usepackage{amsmath}\n\n"
+    assert extract_preamble("{% if x %}\\documentclass{article}{% endif %}") is None
+
+
+def test_incremental_plan_uses_build_dir_and_format(tmp_path):
+    fmt_path = tmp_path / "IEEEtran.fmt"
+    fmt_path.write_bytes(b"fmt")
+    preamble = extract_preamble(TEMPLATE)
+    fmt = PreambleFormat("IEEEtran", fmt_path, preamble)
+    main_tex = tmp_path / "main.tex"
+    main_tex.write_text(preamble + "\\title{ Paper }\n\\begin{document}\n\\end{document}\n", encoding="utf-8")
+    builder = AsyncLatexBuilder(tmp_path, incremental=True)
+
+    usable = builder._usable_format(main_tex, CompileEngine.latexmk, fmt)
+    command, built_pdf = builder._plan(main_tex, CompileEngine.latexmk, usable)
+    assert "-outdir=build" in command
+    assert "-jobname=main" in command
+    assert f"-pdflatex=pdflatex -fmt={tmp_path / 'IEEEtran'} %O %S" in command
+    assert command[-1] == "build/main.body.tex"
+    assert (tmp_path / "build" / "main.body.tex").read_text(encoding="utf-8").startswith("\\title{ Paper }")
+    assert built_pdf == tmp_path / "build" / "main.pdf"
+
+    main_tex.write_text("\\documentclass{article}\n\\begin{document}\\end{document}\n", encoding="utf-8")
+    assert builder._usable_format(main_tex, CompileEngine.latexmk, fmt) is None
+    assert builder._usable_format(main_tex, CompileEngine.tectonic, fmt) is None
+
+
+@pytest.mark.asyncio
+async def test_incremental_build_keeps_state_and_publishes_pdf(tmp_path, monkeypatch):
+    (tmp_path / "main.tex").write_text("\\documentclass{article}", encoding="utf-8")
+    script = (
+        "import pathlib; build = pathlib.Path('build'); aux = build / 'main.aux';"
+        "runs = int(aux.read_text()) + 1 if aux.exists() else 1; aux.write_text(str(runs));"
+        "(build / 'main.pdf').write_bytes(b'%PDF run ' + str(runs).encode()); print('pass', runs)"
+    )
+    monkeypatch.setattr(AsyncLatexBuilder, "incremental_command", lambda self, *args: [sys.executable, "-c", script])
+    builder = AsyncLatexBuilder(tmp_path, incremental=True)
+
+    lines: list[str] = []
+    await builder.compile_async(tmp_path / "main.tex", CompileEngine.latexmk, on_output=lines.append)
+    pdf_path = await builder.compile_async(tmp_path / "main.tex", CompileEngine.latexmk, on_output=lines.append)
+
+    assert pdf_path == tmp_path / "main.pdf"
+    assert pdf_path.read_bytes() == b"%PDF run 2"
+    assert lines[0] == "pass 1" and lines[2] == "pass 2"
+    assert lines[-1].startswith("Build finished in") and "(incremental)" in lines[-1]
+
+
+@pytest.mark.asyncio
+async def test_in_place_build_removes_intermediates_unless_asked_to_keep_them(tmp_path, monkeypatch):
+    (tmp_path / "main.tex").write_text("\\documentclass{article}", encoding="utf-8")
+    script = "import pathlib; [pathlib.Path('main' + s).write_bytes(b'x') for s in ('.aux', '.log', '.fls', '.pdf')]"
+    monkeypatch.setattr(AsyncLatexBuilder, "build_command", staticmethod(lambda main_tex, engine: [sys.executable, "-c", script]))
+    builder = AsyncLatexBuilder(tmp_path)
+
+    await builder.compile_async(tmp_path / "main.tex", CompileEngine.latexmk)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["main.pdf", "main.tex"]
+
+    await builder.compile_async(tmp_path / "main.tex", CompileEngine.latexmk, options=CompileOptions(clean_intermediate=False))
+    assert (tmp_path / "main.aux").exists() and (tmp_path / "main.log").exists()
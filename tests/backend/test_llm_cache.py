@@ -0,0 +1,89 @@
+import json
+import os
+
+import httpx
+import pytest
+
+from backend.app.config import Settings
+from backend.app.services.llm.cache import LLMResponseCache
+from backend.app.services.llm.client import LLMClient
+
+respx = pytest.importorskip("respx")
+
+
+def test_key_depends_on_provider_model_version_and_prompt():
+    key = LLMResponseCache.key_for("ollama", "llama3", "analysis_prompt_v1", "prompt")
+    assert key == LLMResponseCache.key_for("ollama", "llama3", "analysis_prompt_v1", "prompt")
+    assert key != LLMResponseCache.key_for("lmstudio", "llama3", "analysis_prompt_v1", "prompt")
+    assert key != LLMResponseCache.key_for("ollama", "mistral", "analysis_prompt_v1", "prompt")
+    assert key != LLMResponseCache.key_for("ollama", "llama3", "analysis_prompt_v2", "prompt")
+    assert key != LLMResponseCache.key_for("ollama", "llama3", "analysis_prompt_v1", "prompt!")
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMResponseCache(tmp_path, ttl_seconds=60)
+    cache.put("k" * 64, "reply")
+    assert cache.get("k" * 64) == "reply"
+
+    path = cache._path("k" * 64)
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["created_at"] -= 120
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    assert cache.get("k" * 64) is None
+    assert not path.exists()
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(tmp_path, max_bytes=450)
+    for index, name in enumerate(("a", "b", "c")):
+        cache.put(name * 64, "x" * 100)
+        os.utime(cache._path(name * 64), (0, index))
+    cache.get("a" * 64)
+    cache.put("d" * 64, "x" * 100)
+    assert cache.get("a" * 64) is not None
+    assert cache.get("b" * 64) is None
+    assert cache.size_bytes() <= 450
+    assert cache.stats()["evicted"] >= 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_client_reuses_cached_reply_unless_bypassed(respx_mock, tmp_path):
+    route = respx_mock.post("http://ollama.test/api/generate").mock(
+        return_value=httpx.Response(200, json={"response": '{"title": "Cached"}'})
+    )
+    settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test", ollama_model="llama3")
+    cache = LLMResponseCache(tmp_path)
+    client = LLMClient(settings=settings, cache=cache)
+
+    first = await client.complete_json("same prompt", prompt_version="analysis_prompt_v1")
+    second = await client.complete_json("same prompt", prompt_version="analysis_prompt_v1")
+    assert first == second == {"title": "Cached"}
+    assert route.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+    await client.complete_json("same prompt", prompt_version="analysis_prompt_v1", use_cache=False)
+    await client.complete_json("same prompt", prompt_version="citation_need_prompt_v1")
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_unparseable_replies_are_not_cached(respx_mock, tmp_path):
+    route = respx_mock.post("http://ollama.test/api/generate").mock(
+        side_effect=[
+            httpx.Response(200, json={"response": "Sorry, I cannot answer that."}),
+            httpx.Response(200, json={"response": '{"title": "Fixed"}'}),
+        ]
+    )
+    settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test", ollama_model="llama3")
+    cache = LLMResponseCache(tmp_path)
+    client = LLMClient(settings=settings, cache=cache)
+
+    assert await client.complete_json("prompt", prompt_version="analysis_prompt_v1") is None
+    assert cache.size_bytes() == 0
+    assert await client.complete_json("prompt", prompt_version="analysis_prompt_v1") == {"title": "Fixed"}
+    assert route.call_count == 2
+    assert await client.complete_json("prompt", prompt_version="analysis_prompt_v1") == {"title": "Fixed"}
+    assert route.call_count == 2
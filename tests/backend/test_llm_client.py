@@ -20,7 +20,7 @@ async def test_stub_provider_returns_none():
 async def test_ollama_provider_parses_response(respx_mock):
     settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test", ollama_model="llama3")
     respx_mock.post("http://ollama.test/api/generate").mock(
-        return_value=httpx.Response(200, json={"response": "```json\\n{\\"foo\\": 1}\\n```"})
+        return_value=httpx.Response(200, json={"response": "```json\n{\"foo\": 1}\n```"})
     )
     client = LLMClient(settings=settings)
     result = await client.complete_json("{}")
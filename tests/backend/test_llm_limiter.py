@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from backend.app.config import Settings
+from backend.app.services.llm.client import LLMClient
+from backend.app.services.llm.limiter import ConcurrencyLimiter, LimiterRegistry, LLMQueueFullError, parse_overrides
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_concurrency_and_records_waits():
+    limiter = ConcurrencyLimiter(max_concurrency=2, max_waiting=10)
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with limiter.slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(work() for _ in range(6)))
+    stats = limiter.stats()
+    assert peak == 2
+    assert stats["completed"] == 6
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_wait_queue_is_full():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_waiting=1)
+    gate = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await gate.wait()
+
+    holder = asyncio.create_task(hold())
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(LLMQueueFullError):
+        await limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+    gate.set()
+    await asyncio.gather(holder, queued)
+    assert limiter.active == 0
+
+
+def test_registry_keys_limits_by_provider_and_model():
+    registry = LimiterRegistry(max_concurrency=4, overrides=parse_overrides("ollama:llama3=2, lmstudio=1"))
+    assert registry.get("ollama", "llama3").max_concurrency == 2
+    assert registry.get("ollama", "mistral").max_concurrency == 4
+    assert registry.get("lmstudio", "qwen").max_concurrency == 1
+    assert registry.get("Ollama", "LLAMA3") is registry.get("ollama", "llama3")
+    assert set(registry.stats()) == {"ollama:llama3", "ollama:mistral", "lmstudio:qwen"}
+
+
+@pytest.mark.asyncio
+async def test_llm_client_calls_overlap_up_to_the_limit():
+    class SlowClient(LLMClient):
+        active = 0
+        peak = 0
+
+        async def _call_ollama(self, prompt: str) -> str:
+            SlowClient.active += 1
+            SlowClient.peak = max(SlowClient.peak, SlowClient.active)
+            await asyncio.sleep(0.01)
+            SlowClient.active -= 1
+            return '{"ok": true}'
+
+    settings = Settings(llm_provider="ollama", ollama_model="llama3")
+    client = SlowClient(settings=settings, limiters=LimiterRegistry(max_concurrency=3))
+    results = await asyncio.gather(*(client.complete_json(f"prompt {index}") for index in range(8)))
+    assert results == [{"ok": True}] * 8
+    assert SlowClient.peak == 3
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from backend.app.config import Settings
+from backend.app.services.llm.client import LLMClient
+from backend.app.services.llm.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+    gate = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+    gate = asyncio.Event()
+
+    async def work():
+        await gate.wait()
+        return 42
+
+    leaving = asyncio.create_task(flights.run("key", work))
+    staying = asyncio.create_task(flights.run("key", work))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leaving
+    gate.set()
+    assert await staying == 42
+
+
+@pytest.mark.asyncio
+async def test_shared_call_is_cancelled_when_last_waiter_leaves():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flights.run("key", work))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_new_caller_does_not_join_a_call_that_is_being_cancelled():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    unwinding = asyncio.Event()
+
+    async def slow_to_cancel():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            unwinding.set()
+            await asyncio.sleep(0.05)  # e.g. closing an HTTP response
+            raise
+
+    async def work():
+        return "fresh"
+
+    waiter = asyncio.create_task(flights.run("key", slow_to_cancel))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await unwinding.wait()
+    assert await flights.run("key", work) == "fresh"
+    assert flights.stats()["started"] == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_client_coalesces_duplicate_prompts(tmp_path):
+    calls = 0
+
+    class CountingClient(LLMClient):
+        async def _call_ollama(self, prompt: str) -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return '{"sections": []}'
+
+    settings = Settings(llm_provider="ollama", llm_cache_enabled=False)
+    client = CountingClient(settings=settings, flights=SingleFlight())
+    results = await asyncio.gather(*(client.complete_json("same", prompt_version="analysis_prompt_v1") for _ in range(4)))
+    assert results == [{"sections": []}] * 4
+    assert calls == 1
@@ -0,0 +1,144 @@
+import json
+
+import httpx
+import pytest
+
+from backend.app.config import Settings
+from backend.app.services.citation_detector import CitationDetector
+from backend.app.services.llm.cache import LLMResponseCache
+from backend.app.services.llm.client import LLMClient
+from backend.app.services.llm.singleflight import SingleFlight
+from backend.app.services.llm.streaming import IncrementalJSONParser, StreamingJSONError
+
+respx = pytest.importorskip("respx")
+
+
+def _feed_all(parser, fragments):
+    items = []
+    for fragment in fragments:
+        items.extend(parser.feed(fragment))
+    return items
+
+
+def test_parser_reports_elements_split_across_fragments():
+    text = 'Here you go:\n```json\n{"title": "T", "sections": [{"name": "Intro", "content": "a]b"}, {"name": "Methods"}], "tags": [1, 2]}\n```'
+    parser = IncrementalJSONParser()
+    items = _feed_all(parser, [text[index : index + 7] for index in range(0, len(text), 7)])
+    assert items == [
+        ("sections", {"name": "Intro", "content": "a]b"}),
+        ("sections", {"name": "Methods"}),
+        ("tags", 1),
+        ("tags", 2),
+    ]
+    assert parser.finished
+
+
+def test_parser_reports_top_level_array_elements_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('[{"sentence": "A."}, {"sent') == [(None, {"sentence": "A."})]
+    assert parser.feed('ence": "B."}]') == [(None, {"sentence": "B."})]
+
+
+def test_parser_rejects_malformed_structure():
+    parser = IncrementalJSONParser()
+    with pytest.raises(StreamingJSONError):
+        _feed_all(parser, ['[{"a": 1]', "}"])
+    with pytest.raises(StreamingJSONError):
+        IncrementalJSONParser().feed("[{\"a\": nope}, ")
+
+
+def test_parser_restarts_inside_a_fence_after_prose_brackets():
+    text = 'Options [1]:\n```json\n[{"sentence": "A."}]\n```\nDone.'
+    parser = IncrementalJSONParser()
+    items = _feed_all(parser, [text[index : index + 4] for index in range(0, len(text), 4)])
+    assert items == [(None, 1), (None, {"sentence": "A."})]
+    assert parser.finished
+
+
+def _ndjson(text: str, size: int = 5) -> bytes:
+    lines = [json.dumps({"response": text[index : index + size], "done": False}) for index in range(0, len(text), size)]
+    lines.append(json.dumps({"response": "", "done": True}))
+    return "\n".join(lines).encode()
+
+
+def _sse(text: str, size: int = 5) -> bytes:
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": text[index : index + size]}}]})
+        for index in range(0, len(text), size)
+    ]
+    events.append("data: [DONE]")
+    return "\n\n".join(events).encode()
+
+
+SLOTS = [
+    {"sentence": "A study found X.", "need_citation": True, "reasons": ["claim"], "query_terms": ["study"], "confidence": 0.9},
+    {"sentence": "We like it.", "need_citation": False, "reasons": [], "query_terms": [], "confidence": 0.1},
+]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_ollama_stream_delivers_slots_before_the_result(respx_mock, tmp_path):
+    route = respx_mock.post("http://ollama.test/api/generate").mock(
+        return_value=httpx.Response(200, content=_ndjson(json.dumps(SLOTS)))
+    )
+    settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test")
+    client = LLMClient(settings=settings, cache=LLMResponseCache(tmp_path), flights=SingleFlight())
+    seen = []
+    result = await CitationDetector(client).detect("A study found X. We like it.", on_slot=seen.append)
+    assert [slot.sentence for slot in seen] == ["A study found X.", "We like it."]
+    assert [slot.sentence for slot in result.slots] == ["A study found X.", "We like it."]
+    assert json.loads(route.calls[0].request.content)["stream"] is True
+
+    # A cached reply replays the same elements without another request.
+    replayed = []
+    await CitationDetector(client).detect("A study found X. We like it.", on_slot=replayed.append)
+    assert len(replayed) == 2 and route.call_count == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_lmstudio_stream_reports_sections(respx_mock):
+    reply = {"title": "Paper", "sections": [{"name": "Intro", "content": "x"}, {"name": "Results", "content": "y"}]}
+    respx_mock.post("http://lmstudio.test/v1/chat/completions").mock(
+        return_value=httpx.Response(200, content=_sse(json.dumps(reply)))
+    )
+    settings = Settings(llm_provider="lmstudio", lmstudio_base_url="http://lmstudio.test/v1", llm_cache_enabled=False)
+    client = LLMClient(settings=settings, flights=SingleFlight())
+    items = []
+    result = await client.complete_json("prompt", on_item=lambda key, item: items.append((key, item["name"])))
+    assert result == reply
+    assert items == [("sections", "Intro"), ("sections", "Results")]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_malformed_stream_is_aborted_and_not_cached(respx_mock, tmp_path):
+    respx_mock.post("http://ollama.test/api/generate").mock(
+        return_value=httpx.Response(200, content=_ndjson('[{"sentence": "A."}, {"sentence": }]'))
+    )
+    settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test")
+    cache = LLMResponseCache(tmp_path)
+    client = LLMClient(settings=settings, cache=cache, flights=SingleFlight())
+    items = []
+    assert await client.complete_json("prompt", on_item=lambda key, item: items.append(item)) is None
+    assert items == [{"sentence": "A."}]
+    assert cache.size_bytes() == 0
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_prose_before_a_fenced_reply_falls_back_to_the_full_parse(respx_mock, tmp_path):
+    reply = "Sure [see below]:\n```json\n" + json.dumps(SLOTS) + "\n```"
+    route = respx_mock.post("http://ollama.test/api/generate").mock(
+        return_value=httpx.Response(200, content=_ndjson(reply))
+    )
+    settings = Settings(llm_provider="ollama", ollama_base_url="http://ollama.test")
+    client = LLMClient(settings=settings, cache=LLMResponseCache(tmp_path), flights=SingleFlight())
+    items = []
+    assert await client.complete_json("prompt", on_item=lambda key, item: items.append(item)) == SLOTS
+    assert items == SLOTS
+
+    replayed = []
+    assert await client.complete_json("prompt", on_item=lambda key, item: replayed.append(item)) == SLOTS
+    assert replayed == SLOTS and route.call_count == 1
@@ -0,0 +1,56 @@
+import asyncio
+import sys
+
+import pytest
+
+from backend.app.models.core import CompileEngine
+from backend.app.services.latex_builder import AsyncLatexBuilder, LatexCompilationError
+from backend.app.services.process_runner import CommandTimeoutError, run_command
+
+
+@pytest.mark.asyncio
+async def test_run_command_streams_lines_without_blocking_loop():
+    script = "import sys, time\nfor i in range(3):\n    print(f'pass {i}', flush=True)\n    time.sleep(0.05)\nprint('warn', file=sys.stderr)"
+    lines: list[str] = []
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    background = asyncio.create_task(ticker())
+    result = await run_command([sys.executable, "-c", script], on_line=lines.append, timeout=10)
+    background.cancel()
+    assert result.returncode == 0
+    assert lines == ["pass 0", "pass 1", "pass 2", "warn"]
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_run_command_timeout_kills_process():
+    with pytest.raises(CommandTimeoutError):
+        await run_command([sys.executable, "-c", "print('start', flush=True); import time; time.sleep(30)"], timeout=0.3, on_line=lambda line: None)
+
+
+@pytest.mark.asyncio
+async def test_run_command_cancellation_propagates():
+    task = asyncio.create_task(run_command([sys.executable, "-c", "import time; time.sleep(30)"]))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_async_latex_builder_reports_compiler_output(tmp_path, monkeypatch):
+    main_tex = tmp_path / "main.tex"
+    main_tex.write_text("\\documentclass{article}", encoding="utf-8")
+    failing = [sys.executable, "-c", "import sys; print('! Undefined control sequence.'); sys.exit(1)"]
+    monkeypatch.setattr(AsyncLatexBuilder, "build_command", staticmethod(lambda main_tex, engine: failing))
+    seen: list[str] = []
+    builder = AsyncLatexBuilder(tmp_path, timeout=10)
+    with pytest.raises(LatexCompilationError, match="Undefined control sequence"):
+        await builder.compile_async(main_tex, CompileEngine.latexmk, on_output=seen.append)
+    assert seen == ["! Undefined control sequence."]
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from backend.app import config
+from backend.app.services.reference.cache import ReferenceCache, get_reference_cache
+from backend.app.services.reference.providers import BaseProvider, ProviderResult
+from backend.app.services.reference_retriever import ReferenceRetriever
+
+
+class CountingProvider(BaseProvider):
+    def __init__(self, name, records):
+        self.name = name
+        self.records = records
+        self.calls = 0
+
+    async def search(self, query: str):
+        self.calls += 1
+        return ProviderResult(source=self.name, records=self.records)
+
+
+FULL = {
+    "title": "Sample Research",
+    "authors": ["Alice Smith"],
+    "year": 2021,
+    "doi": "10.1000/Sample",
+    "url": "https://doi.org/10.1000/sample",
+    "source": "crossref",
+}
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_skip_the_provider_until_they_expire(tmp_path):
+    cache = ReferenceCache(tmp_path / "refs.db", ttl_seconds=60)
+    provider = CountingProvider("crossref", [FULL])
+    retriever = ReferenceRetriever(providers=[lambda: provider], cache=cache)
+
+    first = await retriever.search("Sample  research")
+    second = await retriever.search("sample research")
+    assert provider.calls == 1
+    assert [ref.doi for ref in second.references] == [ref.doi for ref in first.references] == ["10.1000/Sample"]
+
+    cache.db.execute("UPDATE provider_queries SET created_at = ?", (time.time() - 120,))
+    await retriever.search("sample research")
+    assert provider.calls == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["expired"] == 1
+    assert stats["queries"] == 1
+    assert stats["dois"] == 1
+
+
+@pytest.mark.asyncio
+async def test_doi_metadata_from_one_provider_completes_another(tmp_path):
+    cache = ReferenceCache(tmp_path / "refs.db")
+    await ReferenceRetriever(providers=[lambda: CountingProvider("crossref", [FULL])], cache=cache).search("sample")
+
+    sparse = {"title": "Sample Research", "doi": "https://doi.org/10.1000/sample", "source": "openalex"}
+    result = await ReferenceRetriever(providers=[lambda: CountingProvider("openalex", [sparse])], cache=cache).search(
+        "another query"
+    )
+    reference = result.references[0]
+    assert reference.authors == ["Alice Smith"]
+    assert reference.year == 2021
+    assert cache.get_doi("10.1000/SAMPLE")["sources"] == ["crossref", "openalex"]
+    assert cache.stats()["doi_enrichments"] == 1
+
+
+@pytest.mark.asyncio
+async def test_offline_mode_answers_from_the_cache_only(tmp_path):
+    cache = ReferenceCache(tmp_path / "refs.db")
+    cache.put_query("crossref", "sample research", [FULL])
+    provider = CountingProvider("crossref", [FULL])
+    retriever = ReferenceRetriever(providers=[lambda: provider], cache=cache, offline=True)
+
+    cached = await retriever.search("Sample Research")
+    missing = await retriever.search("unseen query")
+    assert provider.calls == 0
+    assert len(cached.references) == 1
+    assert missing.references == []
+    assert cache.stats()["offline_misses"] == 1
+
+    cache.db.execute("UPDATE provider_queries SET created_at = ?", (time.time() - 30 * 24 * 3600,))
+    stale = await retriever.search("sample research")
+    assert [ref.doi for ref in stale.references] == ["10.1000/Sample"]
+    assert provider.calls == 0
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_reference_cache_follows_settings(monkeypatch, tmp_path):
+    cache = get_reference_cache()
+    assert cache is not None
+    assert cache.db.path == tmp_path / "storage" / "reference-cache.db"
+
+    monkeypatch.setenv("REFERENCE_CACHE_ENABLED", "false")
+    config.get_settings.cache_clear()
+    get_reference_cache.cache_clear()
+    assert get_reference_cache() is None
+    assert ReferenceRetriever().cache is None
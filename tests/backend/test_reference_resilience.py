@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+from backend.app.services.http_pool import HttpClientPool
+from backend.app.services.reference.providers import CrossrefProvider, OpenAlexProvider
+from backend.app.services.reference.resilience import CircuitBreaker, ProviderGuards, TokenBucket
+from backend.app.services.reference_retriever import ReferenceRetriever
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """Serves scripted ``(status, headers, body)`` replies per path, then ``default``."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.scripts = {}
+        self.defaults = {}
+        self.hits = {}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reply(self, path):
+        self.hits[path] = self.hits.get(path, 0) + 1
+        script = self.scripts.get(path)
+        return script.popleft() if script else self.defaults.get(path, (404, {}, {}))
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802 - http.server naming
+        status, headers, body = self.server.reply(urlsplit(self.path).path)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in {"Content-Type": "application/json", **headers}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeProviderServer()
+    thread = threading.Thread(target=fake.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(CrossrefProvider, "base_url", fake.url + "/crossref")
+    monkeypatch.setenv("OPENALEX_BASE", fake.url + "/openalex")
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+def crossref_items(title, doi):
+    return {"message": {"items": [{"title": [title], "DOI": doi, "author": [{"family": "Smith"}]}]}}
+
+
+def openalex_results(title, doi):
+    return {"results": [{"title": title, "doi": doi, "authorships": [], "publication_year": 2020}]}
+
+
+def guards(**overrides):
+    options = {"max_retries": 3, "backoff_seconds": 0.01, "max_backoff_seconds": 0.05, "failure_threshold": 2}
+    return ProviderGuards({"crossref": 100, "openalex": 100}, **{**options, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_and_failing_requests_are_retried(server):
+    server.scripts["/crossref/works"] = deque(
+        [(429, {"Retry-After": "0"}, {}), (503, {}, {}), (200, {}, crossref_items("Retried Paper", "10.1/retried"))]
+    )
+    pool = HttpClientPool()
+    registry = guards()
+    retriever = ReferenceRetriever(providers=[lambda: CrossrefProvider(pool=pool)], guards=registry)
+
+    result = await retriever.search("retried")
+    await pool.aclose()
+
+    assert [ref.title for ref in result.references] == ["Retried Paper"]
+    assert result.errors == {}
+    stats = registry.stats()["crossref"]
+    assert (stats["calls"], stats["attempts"], stats["retries"], stats["rate_limited"], stats["errors"]) == (1, 3, 2, 1, 0)
+    assert stats["circuit"] == "closed"
+    assert stats["avg_latency_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_failing_provider_keeps_other_results_and_trips_its_breaker(server):
+    server.defaults["/crossref/works"] = (500, {}, {})
+    server.defaults["/openalex/works"] = (200, {}, openalex_results("Healthy Paper", "10.1/healthy"))
+    pool = HttpClientPool()
+    registry = guards(max_retries=1)
+    retriever = ReferenceRetriever(
+        providers=[lambda: CrossrefProvider(pool=pool), lambda: OpenAlexProvider(pool=pool)], guards=registry
+    )
+
+    first = await retriever.search("q1")
+    await retriever.search("q2")
+    hits_when_opened = server.hits["/crossref/works"]
+    third = await retriever.search("q3")
+    await pool.aclose()
+
+    for result in (first, third):
+        assert [ref.title for ref in result.references] == ["Healthy Paper"]
+        assert "crossref" in result.errors
+    assert hits_when_opened == 4  # two calls, each retried once
+    assert server.hits["/crossref/works"] == hits_when_opened
+    stats = registry.stats()
+    assert stats["crossref"]["circuit"] == "open"
+    assert stats["crossref"]["errors"] == 2
+    assert stats["crossref"]["short_circuited"] == 1
+    assert stats["openalex"]["successes"] == 3
+
+
+def test_circuit_breaker_allows_one_trial_after_reset():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial in flight
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_requests_at_its_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+    started = time.monotonic()
+    waits = await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+    elapsed = time.monotonic() - started
+    assert waits[0] == 0.0
+    assert waits == sorted(waits)
+    assert elapsed >= 5 / 50 * 0.9
@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 
-from backend.app.models.core import Reference
+from backend.app.models.core import CitationSlot, Reference
+from backend.app.services.reference.dedup import ReferenceIndex
 from backend.app.services.reference.providers import ProviderResult, BaseProvider
+from backend.app.services.reference_bench import legacy_merge, synthetic_records
 from backend.app.services.reference_retriever import ReferenceRetriever
 
 
@@ -44,3 +48,132 @@ async def test_reference_retriever_deduplicates():
     assert ref.doi == "10.1000/sample"
     assert "crossref" in ref.source
     assert "openalex" in ref.source
+
+
+def test_reference_index_merges_by_doi_and_similar_titles():
+    index = ReferenceIndex(ReferenceRetriever._record_to_reference)
+    index.add(
+        [
+            {"title": "Graph Neural Networks for Molecules", "doi": "10.1/GNN", "source": "crossref"},
+            {"title": "A Survey of Sparse Attention", "source": "arxiv"},
+            {"title": "GNNs (journal version)", "doi": "https://doi.org/10.1/gnn", "source": "openalex"},
+        ]
+    )
+    touched = index.add([{"title": "A survey of sparse atention", "doi": "10.2/sparse", "source": "pubmed"}])
+    assert [ref.title for ref in index.references] == ["Graph Neural Networks for Molecules", "A Survey of Sparse Attention"]
+    assert index.references[0].source == "crossref,openalex"
+    assert touched == [1] and index.references[1].doi == "10.2/sparse"
+
+
+def test_blocking_merge_matches_quadratic_merge_with_fewer_comparisons():
+    records = synthetic_records(1500)
+    index = ReferenceIndex(ReferenceRetriever._record_to_reference)
+    index.add(records)
+    assert len(index.references) == legacy_merge(records)
+    assert index.comparisons < len(records) ** 2 / 20
+
+
+class SlowProvider(BaseProvider):
+    active = 0
+    peak = 0
+    queries: list = []
+
+    def __init__(self, name):
+        self.name = name
+
+    async def search(self, query: str):
+        SlowProvider.active += 1
+        SlowProvider.peak = max(SlowProvider.peak, SlowProvider.active)
+        SlowProvider.queries.append((self.name, query))
+        await asyncio.sleep(0.01)
+        SlowProvider.active -= 1
+        if self.name == "flaky" and "beta" in query:
+            raise RuntimeError("provider down")
+        return ProviderResult(source=self.name, records=[{"title": f"Paper on {query}", "authors": ["Ann Lee"], "year": 2020, "source": self.name}])
+
+
+def _slot(terms, status="pending", need=True):
+    return CitationSlot(sentence=" ".join(terms) + ".", need_citation=need, reasons=[], query_terms=terms, confidence=0.5, status=status)
+
+
+@pytest.mark.asyncio
+async def test_slot_search_dedupes_queries_caps_fanout_and_attaches_candidates():
+    slots = [
+        _slot(["alpha", "graphs"]),
+        _slot(["graphs", "alpha"], status="confirmed"),
+        _slot(["beta", "kernels"]),
+        _slot(["gamma", "flows"], status="rejected"),
+        _slot(["delta", "nets"], need=False),
+        _slot(["epsilon", "trees"]),
+    ]
+    SlowProvider.peak, SlowProvider.queries = 0, []
+    retriever = ReferenceRetriever(providers=[lambda: SlowProvider("steady"), lambda: SlowProvider("flaky")])
+    resolved = []
+    result = await retriever.search_slots(
+        slots, on_result=lambda group, found: resolved.append(group.slots), max_concurrency=3, per_provider=1
+    )
+    assert sorted(resolved) == [[0, 1], [2], [5]]
+    assert len(SlowProvider.queries) == 6
+    assert SlowProvider.peak <= 2
+    assert set(result.candidates) == {0, 1, 2, 5}
+    assert result.candidates[0] is result.candidates[1]
+    assert [ref.source for ref in result.candidates[2]] == ["steady"]
+    assert [ref.source for ref in result.candidates[5]] == ["flaky,steady"]
+
+
+class DelayedProvider(BaseProvider):
+    def __init__(self, name, delay, records):
+        self.name = name
+        self.delay = delay
+        self.records = records
+        self.cancelled = False
+
+    async def search(self, query: str):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return ProviderResult(source=self.name, records=self.records)
+
+
+@pytest.mark.asyncio
+async def test_stream_merges_as_providers_respond_and_cancels_at_deadline():
+    paper = {"title": "Streaming Retrieval", "authors": ["Ann Lee"], "year": 2022, "source": "fast"}
+    fast = DelayedProvider("fast", 0, [paper])
+    medium = DelayedProvider(
+        "medium", 0.05, [{**paper, "doi": "10.1/stream", "source": "medium"}, {"title": "Other Work", "source": "medium"}]
+    )
+    slow = DelayedProvider("slow", 5, [{"title": "Never Seen", "source": "slow"}])
+    retriever = ReferenceRetriever(providers=[lambda: slow, lambda: medium, lambda: fast])
+
+    stream = retriever.stream("streaming", deadline=0.3)
+    updates = [update async for update in stream]
+    result = stream.result()
+
+    assert [(update.source, update.records, update.total) for update in updates] == [("fast", 1, 1), ("medium", 2, 2)]
+    assert [ref.title for ref in updates[1].added] == ["Streaming Retrieval", "Other Work"]
+    assert updates[1].added[0].doi == "10.1/stream"
+    assert result.completed == ["fast", "medium"]
+    assert result.cancelled == ["slow"] and slow.cancelled
+    assert [ref.title for ref in result.references] == ["Streaming Retrieval", "Other Work"]
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_failures_and_closing_early_cancels_providers():
+    class BrokenProvider(BaseProvider):
+        name = "broken"
+
+        async def search(self, query: str):
+            raise RuntimeError("offline")
+
+    slow = DelayedProvider("slow", 5, [])
+    retriever = ReferenceRetriever(providers=[BrokenProvider, lambda: slow])
+    stream = retriever.stream("anything", deadline=0)
+    first = await stream.__anext__()
+    assert (first.source, first.error) == ("broken", "offline")
+    await stream.aclose()
+    result = stream.result()
+    assert slow.cancelled
+    assert result.errors == {"broken": "offline"}
+    assert result.completed == [] and result.cancelled == ["slow"]
@@ -0,0 +1,70 @@
+from backend.app.services.sentence_index import build_sentence_index, get_sentence_index
+
+MANUSCRIPT = """# Introduction
+
+Deep models work well, e.g. on ImageNet. Smith et al. report a 3.5% gain (see Fig. 2). Energy is $E = m c^2. X$ here.
+As J. R. Smith noted, `x. Y` is code! Results improve approx. three times.
+
+```python
+a = 1. B = 2.
+```
+
+## Méthodes
+
+Café résumé. The end
+"""
+
+
+def test_segmentation_respects_abbreviations_math_and_code():
+    index = build_sentence_index(MANUSCRIPT)
+    assert [sentence.text for sentence in index] == [
+        "Deep models work well, e.g. on ImageNet.",
+        "Smith et al. report a 3.5% gain (see Fig. 2).",
+        "Energy is $E = m c^2. X$ here.",
+        "As J. R. Smith noted, `x. Y` is code!",
+        "Results improve approx. three times.",
+        "Café résumé.",
+        "The end",
+    ]
+
+
+def test_sentences_carry_offsets_and_sections():
+    index = build_sentence_index(MANUSCRIPT)
+    encoded = MANUSCRIPT.encode("utf-8")
+    for sentence in index:
+        assert MANUSCRIPT[sentence.start : sentence.end] == sentence.text
+        assert encoded[sentence.byte_start : sentence.byte_end].decode("utf-8") == sentence.text
+    assert {sentence.section for sentence in index.in_section(1)} == {"Introduction"}
+    assert [sentence.text for sentence in index.in_section(2)] == ["Café résumé.", "The end"]
+    offset = MANUSCRIPT.index("3.5%")
+    assert index.at(offset).text.startswith("Smith et al.")
+    assert index.at(MANUSCRIPT.index("a = 1")) is None
+
+
+def test_index_is_cached_per_text_and_finds_repeats():
+    text = "Same claim. Other. Same claim."
+    index = get_sentence_index(text)
+    assert get_sentence_index(text) is index
+    assert [sentence.start for sentence in index.find("Same claim.")] == [0, 19]
+    assert index.find("Missing.") == []
+
+
+def test_unpaired_dollars_and_backticks_are_literal():
+    texts = [sentence.text for sentence in build_sentence_index("The grant was US$5 million. Another sentence here. Third one.")]
+    assert texts == ["The grant was US$5 million.", "Another sentence here.", "Third one."]
+    texts = [sentence.text for sentence in build_sentence_index("Prices rose from US$5 to US$10. Next one. Done.")]
+    assert texts == ["Prices rose from US$5 to US$10.", "Next one.", "Done."]
+    texts = [sentence.text for sentence in build_sentence_index("Use the ` key. Next sentence. Last.")]
+    assert texts == ["Use the ` key.", "Next sentence.", "Last."]
+
+
+def test_inline_spans_stop_at_paragraphs_and_headings():
+    text = "Costs are $ high. Then `x.\n\n# Methods\n\nWe use `y`. Done $a.\n## Results\nFinal $b. c$ text."
+    index = build_sentence_index(text)
+    assert [(sentence.text, sentence.section) for sentence in index] == [
+        ("Costs are $ high.", None),
+        ("Then `x.", None),
+        ("We use `y`.", "Methods"),
+        ("Done $a.", "Methods"),
+        ("Final $b. c$ text.", "Results"),
+    ]
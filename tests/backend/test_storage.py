@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from backend.app.models.core import JobStatus, Manuscript, PipelineStage, Project, ProjectStatus
+from backend.app.services.storage import JobRepository, ProjectRepository, SQLiteJobRepository, SQLiteProjectRepository
+from backend.app.services.storage.migrate import migrate_json_to_sqlite
+
+
+def _project(index: int, template_id: str = "Generic-Article", status: ProjectStatus = ProjectStatus.pending) -> Project:
+    return Project(
+        id=f"proj_{index:04d}",
+        manuscript=Manuscript(content=f"# Paper {index}"),
+        template_id=template_id,
+        created_at=datetime(2024, 1, 1) + timedelta(minutes=index),
+        status=status,
+    )
+
+
+def test_sqlite_project_repository_filters_and_paginates(tmp_path):
+    repo = SQLiteProjectRepository(tmp_path / "store.db")
+    for index in range(10):
+        template = "IEEEtran" if index % 2 else "Generic-Article"
+        status = ProjectStatus.ready if index % 3 == 0 else ProjectStatus.pending
+        repo.save(_project(index, template, status))
+
+    assert repo.get("proj_0003").template_id == "IEEEtran"
+    assert repo.get("proj_9999") is None
+
+    page = list(repo.list_projects(limit=3, offset=2))
+    assert [p.id for p in page] == ["proj_0007", "proj_0006", "proj_0005"]
+    assert {p.template_id for p in repo.list_projects(template_id="IEEEtran")} == {"IEEEtran"}
+    assert repo.count(status=ProjectStatus.ready) == 4
+    assert repo.count(status=ProjectStatus.ready, template_id="IEEEtran") == 2
+
+    updated = repo.get("proj_0001")
+    updated.status = ProjectStatus.failed
+    repo.save(updated)
+    assert [p.id for p in repo.list_projects(status=ProjectStatus.failed)] == ["proj_0001"]
+
+
+def test_sqlite_job_repository_tracks_status_and_logs(tmp_path):
+    repo = SQLiteJobRepository(tmp_path / "store.db")
+    job = repo.create(project_id="proj_0001", stage=PipelineStage.compile)
+    assert [repo.append_log(job.id, f"pass {n}") for n in range(3)] == [1, 2, 3]
+    repo.mark_status(job.id, JobStatus.completed, result={"ok": True})
+    stored = repo.get(job.id)
+    assert stored.status == JobStatus.completed
+    assert [entry.message for entry in repo.read_logs(job.id, after_seq=1)] == ["pass 1", "pass 2"]
+    assert [entry.seq for entry in repo.tail_logs(job.id, 1)] == [3]
+    assert [j.id for j in repo.list_jobs(project_id="proj_0001", status=JobStatus.completed)] == [job.id]
+
+
+def test_json_job_log_segment_supports_range_and_tail(tmp_path):
+    repo = JobRepository(tmp_path)
+    job = repo.create(project_id="proj_0001", stage=PipelineStage.compile)
+    for n in range(50):
+        repo.append_log(job.id, f"line {n}")
+    repo.mark_status(job.id, JobStatus.running)
+
+    assert repo.log_count(job.id) == 50
+    assert repo.get(job.id).logs == []
+    window = repo.read_logs(job.id, after_seq=10, limit=3)
+    assert [(entry.seq, entry.message) for entry in window] == [(11, "line 10"), (12, "line 11"), (13, "line 12")]
+    assert [entry.message for entry in repo.tail_logs(job.id, 2)] == ["line 48", "line 49"]
+    assert repo.read_logs(job.id, after_seq=50) == []
+
+
+def test_json_job_log_reads_legacy_embedded_logs(tmp_path):
+    repo = JobRepository(tmp_path)
+    job = repo.create(project_id="proj_0001", stage=PipelineStage.compile)
+    job.logs = ["old 1", "old 2"]
+    repo.save(job)
+    assert [(entry.seq, entry.message) for entry in repo.read_logs(job.id)] == [(1, "old 1"), (2, "old 2")]
+
+    assert repo.append_log(job.id, "new 3") == 3
+    assert [(entry.seq, entry.message) for entry in repo.read_logs(job.id)] == [(1, "old 1"), (2, "old 2"), (3, "new 3")]
+    assert [entry.seq for entry in repo.read_logs(job.id, after_seq=1)] == [2, 3]
+    assert repo.log_count(job.id) == 3
+
+
+def test_migrate_json_tree_into_sqlite(tmp_path):
+    source = tmp_path / "json"
+    json_projects = ProjectRepository(source)
+    json_jobs = JobRepository(source)
+    for index in range(5):
+        json_projects.save(_project(index))
+    job = json_jobs.create(project_id="proj_0000", stage=PipelineStage.structure)
+    json_jobs.append_log(job.id, "Analyzing structure")
+
+    report = migrate_json_to_sqlite(source, tmp_path / "migrated.db", batch_size=2)
+    assert (report.projects, report.jobs, report.log_lines, report.failures) == (5, 1, 1, [])
+
+    projects = SQLiteProjectRepository(tmp_path / "migrated.db")
+    assert projects.count() == 5
+    jobs = SQLiteJobRepository(tmp_path / "migrated.db")
+    assert jobs.get(job.id).project_id == "proj_0000"
+    assert [entry.message for entry in jobs.read_logs(job.id)] == ["Analyzing structure"]
@@ -0,0 +1,84 @@
+import asyncio
+import re
+
+import pytest
+
+from backend.app.services.structure_analyzer import StructureAnalyzer, merge_chunks, split_markdown
+
+
+class FakeClient:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def complete_json(self, prompt, prompt_version=None, use_cache=True, on_item=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        body = prompt.rsplit("<md>", 1)[1]
+        heading = re.search(r"^#+\s+(.*)$", body, flags=re.MULTILINE)
+        name = heading.group(1) if heading else "Body"
+        if name == "Broken":
+            return None
+        if name == "Down":
+            raise RuntimeError("transport error")
+        if on_item is not None:
+            on_item("sections", {"name": name})
+        return {
+            "title": "Thesis" if name == "Intro" else None,
+            "sections": [{"name": name, "content": "See fig:overview.", "citations": []}],
+            "figures": [{"label": "fig:overview", "caption": name}],
+            "keywords": ["ml"],
+        }
+
+
+def _manuscript(*names):
+    return "\n\n".join(f"# {name}\n\n" + "text " * 60 for name in names)
+
+
+def test_split_markdown_respects_budget_and_headings():
+    markdown = _manuscript("Intro", "Methods", "Results")
+    chunks = split_markdown(markdown, max_tokens=100)
+    assert [chunk.splitlines()[0] for chunk in chunks] == ["# Intro", "# Methods", "# Results"]
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert split_markdown("short", max_tokens=100) == ["short"]
+
+
+def test_merge_keeps_labels_unique_and_rewrites_references():
+    part = {"sections": [{"name": "A", "content": "See fig:overview and fig:overview-detail."}], "figures": [{"label": "fig:overview"}]}
+    merged = merge_chunks([part, part, {"figures": [{"caption": "unlabeled"}]}])
+    assert [figure["label"] for figure in merged["figures"]] == ["fig:overview", "fig:overview-2", "fig:chunk3-1"]
+    assert merged["sections"][1]["content"] == "See fig:overview-2 and fig:overview-detail."
+    assert merged["title"] == "Untitled Manuscript"
+
+
+@pytest.mark.asyncio
+async def test_long_manuscripts_are_analyzed_in_concurrent_chunks():
+    client = FakeClient()
+    progress: list[str] = []
+    analyzer = StructureAnalyzer(client=client, chunk_tokens=100)
+    result = await analyzer.analyze(_manuscript("Intro", "Broken", "Results"), on_progress=progress.append)
+
+    normalized = result.normalized
+    assert client.peak > 1
+    assert normalized["title"] == "Thesis"
+    assert [section["name"] for section in normalized["sections"]] == ["Intro", "Broken", "Results"]
+    assert [figure["label"] for figure in normalized["figures"]] == ["fig:overview", "fig:overview-2"]
+    assert normalized["keywords"] == ["ml"]
+    assert progress[0] == "Analyzing 3 chunks of up to ~100 tokens"
+    assert any("Chunk 2/3 could not be parsed" in line for line in progress)
+    assert "Chunk 3/3: Section parsed: Results" in progress
+    assert progress[-1] == "Merged 3 chunks into 3 sections"
+
+
+@pytest.mark.asyncio
+async def test_failing_chunk_falls_back_to_headings_and_fan_out_is_bounded():
+    client = FakeClient()
+    progress: list[str] = []
+    analyzer = StructureAnalyzer(client=client, chunk_tokens=100, max_concurrent_chunks=2)
+    result = await analyzer.analyze(_manuscript("Intro", "Down", "Methods", "Results"), on_progress=progress.append)
+
+    assert [section["name"] for section in result.normalized["sections"]] == ["Intro", "Down", "Methods", "Results"]
+    assert any(line.startswith("Chunk 2/4 failed (transport error)") for line in progress)
+    assert client.peak == 2